@@ -0,0 +1,40 @@
+import os
+import statistics
+import time
+
+# Benchmark runs fully offline against the fake LLM and a throwaway cache
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ.setdefault("FAKE_LLM_LATENCY", "0.2")
+os.environ["LLM_CACHE_PATH"] = ":memory:"
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+from main import agent_executor, response_cache
+
+PROMPTS = [
+    "Analyze and summarize the following text: The quick brown fox jumps over the lazy dog.",
+    "Summarize the outflows of wallet 0x47666fab8bd0ac7003bce3f5c3585383f09486e2",
+    "Which wallets received the most ETH from the seed transaction?",
+]
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "5"))
+
+
+def run_round() -> list:
+    timings = []
+    for prompt in PROMPTS:
+        start = time.perf_counter()
+        agent_executor.invoke({"input": prompt, "chat_history": []})
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    agent_executor.verbose = False
+    cold = run_round()
+    warm = [t for _ in range(ROUNDS) for t in run_round()]
+
+    print("=== LLM cache benchmark ===")
+    print(f"Fake LLM latency: {os.environ['FAKE_LLM_LATENCY']}s, prompts: {len(PROMPTS)}, warm rounds: {ROUNDS}")
+    print(f"Cold mean: {statistics.mean(cold) * 1000:.1f} ms")
+    print(f"Warm mean: {statistics.mean(warm) * 1000:.1f} ms")
+    print(f"Speedup: {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+    print(f"Stats: {response_cache.stats()}")
@@ -0,0 +1,168 @@
+"""
+Address labels for known services (exchanges, mixers, bridges, routers) and
+sanctioned wallets.
+
+Labels are read from CSV files (address,category,name) or JSON files (a list
+of {"address", "category", "name"} objects, or an object keyed by address)
+and kept in a compact index: addresses are stored as 20 raw bytes and found
+through a dict keyed by their first 8 bytes as an integer, which is O(1) and
+much smaller than a dict of hex strings to label dicts. The source files are
+re-checked every few seconds and the index is rebuilt and swapped in when
+one of them changes, so a running crawl picks up new labels.
+"""
+import csv
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+BASE_DIR = Path(__file__).resolve().parent
+LABELS_PATH = BASE_DIR / "labels.csv"
+
+CATEGORIES = ("exchange", "mixer", "bridge", "router", "sanctioned")
+# Services pooling many users' funds: following their outflows leads to unrelated wallets
+TERMINAL_CATEGORIES = ("exchange", "mixer", "bridge", "router")
+
+_PREFIX_BYTES = 8
+
+def _address_bytes(address: str) -> Optional[bytes]:
+    text = address[2:] if address[:2] in ("0x", "0X") else address
+    if len(text) != 40:
+        return None
+    try:
+        return bytes.fromhex(text)
+    except ValueError:
+        return None
+
+def read_label_file(path: Union[str, Path]) -> Iterator[Tuple[str, str, str]]:
+    """
+    Read labels from a CSV or JSON file.
+
+    Args:
+        path (Union[str, Path]): File to read; ".json" files are parsed as JSON, anything else as CSV
+
+    Yields:
+        Tuple[str, str, str]: Address, category and name of every label
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path) as f:
+            data = json.load(f)
+        entries = [{"address": address, **entry} for address, entry in data.items()] if isinstance(data, dict) else data
+        for entry in entries:
+            yield entry["address"], entry["category"], entry.get("name", "")
+        return
+    with open(path, newline="") as f:
+        for row in csv.DictReader(line for line in f if not line.startswith("#")):
+            yield row["address"], row["category"], row.get("name") or ""
+
+class LabelStore:
+    """Hot-reloaded label index over one or more label files."""
+
+    def __init__(self, paths: Sequence[Union[str, Path]] = (LABELS_PATH,), check_interval: float = 5.0):
+        """
+        Args:
+            paths (Sequence[Union[str, Path]]): Label files, later files override earlier ones
+            check_interval (float): Seconds between checks of the files' modification times
+        """
+        self.paths = [Path(path) for path in paths]
+        self.check_interval = check_interval
+        self._mtimes: List[Optional[float]] = []
+        self._checked = 0.0
+        self.reload()
+
+    def _stat(self) -> List[Optional[float]]:
+        return [path.stat().st_mtime if path.exists() else None for path in self.paths]
+
+    def reload(self) -> int:
+        """
+        Rebuild the index from the label files.
+
+        Returns:
+            int: Number of labeled addresses
+        """
+        mtimes = self._stat()
+        rows: Dict[bytes, Tuple[int, str]] = {}
+        for path in self.paths:
+            if not path.exists():
+                continue
+            for address, category, name in read_label_file(path):
+                key = _address_bytes(address)
+                if key is None or category not in CATEGORIES:
+                    continue
+                rows[key] = (CATEGORIES.index(category), name)
+
+        slots: Dict[int, int] = {}
+        collisions: Dict[bytes, int] = {}
+        addresses: List[bytes] = []
+        categories = bytearray()
+        # Names repeat across a service's addresses and are interned
+        name_refs: List[int] = []
+        name_ids: Dict[str, int] = {}
+        for key, (category, name) in rows.items():
+            row = len(addresses)
+            addresses.append(key)
+            categories.append(category)
+            name_refs.append(name_ids.setdefault(name, len(name_ids)))
+            prefix = int.from_bytes(key[:_PREFIX_BYTES], "big")
+            if prefix in slots:
+                collisions[key] = row
+            else:
+                slots[prefix] = row
+        # Swapped as one tuple so concurrent lookups never see a half-built index
+        self._index = (slots, collisions, addresses, bytes(categories), name_refs, list(name_ids))
+        self._mtimes = mtimes
+        self._checked = time.monotonic()
+        return len(addresses)
+
+    def maybe_reload(self) -> bool:
+        """
+        Rebuild the index if a label file changed since it was built, checking at most every `check_interval` seconds.
+
+        Returns:
+            bool: Whether the index was rebuilt
+        """
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        if self._stat() == self._mtimes:
+            return False
+        self.reload()
+        return True
+
+    def get(self, address: Optional[str]) -> Optional[Dict[str, str]]:
+        """
+        Look up the label of an address.
+
+        Args:
+            address (Optional[str]): Hex address, any case
+
+        Returns:
+            Optional[Dict[str, str]]: {"category", "name"}, None if the address is not labeled
+        """
+        self.maybe_reload()
+        key = _address_bytes(address) if address else None
+        if key is None:
+            return None
+        slots, collisions, addresses, categories, name_refs, name_table = self._index
+        row = slots.get(int.from_bytes(key[:_PREFIX_BYTES], "big"))
+        if row is None or addresses[row] != key:
+            row = collisions.get(key)
+            if row is None:
+                return None
+        return {"category": CATEGORIES[categories[row]], "name": name_table[name_refs[row]]}
+
+    def __len__(self) -> int:
+        return len(self._index[2])
+
+_labels: Optional[LabelStore] = None
+
+def get_labels() -> LabelStore:
+    """Shared store over labels.csv plus the files listed in LABEL_FILES (separated by os.pathsep)."""
+    global _labels
+    if _labels is None:
+        extra = [path for path in os.getenv("LABEL_FILES", "").split(os.pathsep) if path]
+        _labels = LabelStore([LABELS_PATH, *extra])
+    return _labels
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel, SimpleChatModel
+from langchain_core.load import dumps, loads
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different prompts share one cache entry."""
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """
+    SQLite-backed exact-match cache for LLM responses.
+
+    Entries are grouped by namespace (e.g. "llm") and keyed on a
+    SHA-256 digest of their inputs. The cache keeps hit/miss counters per
+    namespace and evicts least recently used entries once `max_entries` is
+    exceeded. Entries older than `ttl` seconds are treated as misses.
+    """
+
+    def __init__(self, path: str = "llm_cache.sqlite", max_entries: int = 10000, ttl: Optional[float] = None):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): SQLite file path, ":memory:" for a process-local cache
+            max_entries (int): Maximum number of entries kept before LRU eviction
+            ttl (Optional[float]): Entry lifetime in seconds, None to keep entries forever
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(namespace: str, *parts: Any) -> str:
+        """Build a stable cache key from a namespace and JSON-serializable parts."""
+        payload = json.dumps([namespace, *parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, namespace: str, field: str) -> None:
+        counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        """
+        Look up a cached value.
+
+        Args:
+            namespace (str): Cache namespace
+            key (str): Key produced by `make_key`
+
+        Returns:
+            Optional[str]: The cached value, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                self._count(namespace, "misses")
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._count(namespace, "hits")
+            return row[0]
+
+    def put(self, namespace: str, key: str, value: str) -> None:
+        """
+        Store a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            namespace (str): Cache namespace
+            key (str): Key produced by `make_key`
+            value (str): Serialized value to store
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, namespace, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, value, now, now),
+            )
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """Remove all entries, or only those of one namespace."""
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM responses")
+            else:
+                self._conn.execute("DELETE FROM responses WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit-rate metrics for every namespace.
+
+        Returns:
+            Dict[str, Any]: Entry count, evictions and per-namespace hits, misses and hit rate
+        """
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            namespaces = {}
+            for namespace, counters in self._stats.items():
+                total = counters["hits"] + counters["misses"]
+                namespaces[namespace] = {
+                    **counters,
+                    "hit_rate": counters["hits"] / total if total else 0.0,
+                }
+        return {"entries": size, "evictions": self.evictions, "namespaces": namespaces}
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    LangChain cache adapter storing chat generations in a ResponseCache.
+
+    LangChain passes the serialized prompt and an `llm_string` describing the
+    model, its parameters and any bound functions, so identical prompts sent to
+    the same model with the same tools share one entry.
+    """
+
+    namespace = "llm"
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return self.cache.make_key(self.namespace, llm_string, normalize_text(prompt))
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        value = self.cache.get(self.namespace, self._key(prompt, llm_string))
+        if value is None:
+            return None
+        return [loads(generation) for generation in json.loads(value)]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = json.dumps([dumps(generation) for generation in return_val])
+        self.cache.put(self.namespace, self._key(prompt, llm_string), value)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear(self.namespace)
+
+
+class CachedChatModel(BaseChatModel):
+    """
+    Chat model wrapper that always goes through the LangChain LLM cache.
+
+    The agent executor streams from the model, and LangChain skips the cache for
+    models that implement streaming. This wrapper exposes only `_generate`, so
+    streaming falls back to a cached `invoke` while the wrapped model's
+    identifying parameters still take part in the cache key.
+    """
+
+    model: BaseChatModel
+
+    @property
+    def _llm_type(self) -> str:
+        return self.model._llm_type
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_type": self.model._llm_type, **self.model._identifying_params}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        return self.model._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+class FakeChatModel(SimpleChatModel):
+    """
+    Offline chat model that replays canned responses.
+
+    Used to benchmark cache behavior without calling the OpenAI API; `latency`
+    simulates the round trip of a real model call.
+    """
+
+    responses: List[str]
+    latency: float = 0.0
+    i: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"responses": self.responses}
+
+    def _call(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+              run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        response = self.responses[self.i % len(self.responses)]
+        self.i += 1
+        return response
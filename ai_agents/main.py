@@ -1,14 +1,19 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 from typing import Dict, List, Optional
 import asyncio
+import json
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentExecutor, create_openai_functions_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import Tool
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
+from langchain.schema import SystemMessage
+from langchain.globals import set_llm_cache
 import os
 from dotenv import load_dotenv
+from prometheus_client import Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from llm_cache import ResponseCache, SQLiteLLMCache, CachedChatModel, FakeChatModel
+from trace_index import TraceIndex
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +23,30 @@ app = FastAPI()
 # In-memory storage for agent states
 agent_states: Dict[str, Dict] = {}
 
+# Response cache behind the LLM; tools answer from the preloaded trace index and are not cached
+response_cache = ResponseCache(
+    path=os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite"),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+    ttl=float(os.getenv("LLM_CACHE_TTL")) if os.getenv("LLM_CACHE_TTL") else None
+)
+set_llm_cache(SQLiteLLMCache(response_cache))
+
+# Prometheus metrics, exposed on /metrics
+AGENT_INVOKE_SECONDS = Histogram(
+    "agent_invoke_seconds",
+    "Duration of one agent executor invocation",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+TOOL_CALL_SECONDS = Histogram(
+    "agent_tool_call_seconds",
+    "Duration of agent tool calls",
+    ["tool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+AGENT_TASKS_IN_PROGRESS = Gauge("agent_tasks_in_progress", "Agent tasks currently being processed")
+LLM_CACHE_ENTRIES = Gauge("agent_llm_cache_entries", "Entries in the LLM response cache")
+LLM_CACHE_ENTRIES.set_function(lambda: response_cache.stats()["entries"])
+
 class AgentRequest(BaseModel):
     workflow_id: str
     task: Optional[str] = None
@@ -29,48 +58,86 @@ class AgentState(BaseModel):
     current_agent: Optional[str] = None
     messages: List[Dict] = []
 
+# Preloaded trace the tools answer questions about
+trace_index = TraceIndex.load(os.getenv("TRACE_PATH", "all_transactions.json"))
+
 # Define tools for the agents
-def search_tool(query: str) -> str:
-    """Search for information about a topic."""
-    return f"Searching for information about: {query}"
+def wallet_volume_tool(wallet: str) -> str:
+    """Get inbound/outbound volume and transaction counts of a wallet."""
+    return json.dumps(trace_index.wallet_summary(wallet))
 
-def analyze_tool(data: str) -> str:
-    """Analyze the provided data."""
-    return f"Analyzing data: {data}"
+def tx_children_tool(tx_hash: str) -> str:
+    """Get the transactions that moved funds onward from a transaction."""
+    return json.dumps(trace_index.tx_children(tx_hash))
 
-def summarize_tool(text: str) -> str:
-    """Summarize the provided text."""
-    return f"Summarizing text: {text}"
+def wallet_path_tool(wallets: str) -> str:
+    """Find how funds moved between two wallets, given as 'source,target'."""
+    source, _, target = wallets.partition(",")
+    if not target:
+        return "Expected input in the form 'source_wallet,target_wallet'"
+    return json.dumps({"path": trace_index.path(source, target)})
+
+def top_destinations_tool(k: str) -> str:
+    """Get the wallets that received the most of a currency, given as 'k' or 'k,currency'."""
+    k, _, currency = k.partition(",")
+    try:
+        limit = max(1, min(int(k.strip() or 5), 50))
+    except ValueError:
+        limit = 5
+    return json.dumps(trace_index.top_destinations(limit, currency.strip().upper() or "ETH"))
+
+def timed_tool(name: str, func):
+    """Record the duration of every call of a tool function."""
+    histogram = TOOL_CALL_SECONDS.labels(name)
+    def wrapper(arg: str) -> str:
+        with histogram.time():
+            return func(arg)
+    return wrapper
 
 # Create tools
 tools = [
     Tool(
-        name="search",
-        func=search_tool,
-        description="Useful for searching for information about a topic"
+        name="wallet_volume",
+        func=timed_tool("wallet_volume", wallet_volume_tool),
+        description="Get the amounts received and sent by a wallet per currency and its transaction counts. Input: wallet address"
+    ),
+    Tool(
+        name="tx_children",
+        func=timed_tool("tx_children", tx_children_tool),
+        description="List the largest transfers that forwarded funds received in each transfer of a transaction. "
+                    "Input: transaction hash, or 'hash:log_index' for one token transfer"
     ),
     Tool(
-        name="analyze",
-        func=analyze_tool,
-        description="Useful for analyzing data"
+        name="wallet_path",
+        func=timed_tool("wallet_path", wallet_path_tool),
+        description="Find the chain of wallets funds took from one wallet to another. Input: 'source_wallet,target_wallet'"
     ),
     Tool(
-        name="summarize",
-        func=summarize_tool,
-        description="Useful for summarizing text"
+        name="top_destinations",
+        func=timed_tool("top_destinations", top_destinations_tool),
+        description="List the wallets that received the most of a currency in the trace. "
+                    "Input: number of wallets (default 5), optionally followed by a currency, e.g. '5,USDT' (default ETH)"
     )
 ]
 
 # Create the agent prompt
 prompt = ChatPromptTemplate.from_messages([
-    SystemMessage(content="You are a helpful AI agent that collaborates with other agents to complete tasks."),
+    SystemMessage(content="You are a helpful AI agent that collaborates with other agents to complete tasks. "
+                          "Use the tools to look up facts about the traced transactions instead of guessing."),
     MessagesPlaceholder(variable_name="chat_history"),
-    HumanMessage(content="{input}"),
+    ("human", "{input}"),
     MessagesPlaceholder(variable_name="agent_scratchpad"),
 ])
 
-# Create the agent
-llm = ChatOpenAI(temperature=0)
+# Create the agent. LLM_PROVIDER=fake swaps in an offline model for benchmarking.
+if os.getenv("LLM_PROVIDER", "openai") == "fake":
+    base_llm = FakeChatModel(
+        responses=["Done."],
+        latency=float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+    )
+else:
+    base_llm = ChatOpenAI(temperature=0)
+llm = CachedChatModel(model=base_llm)
 agent = create_openai_functions_agent(llm, tools, prompt)
 agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
 
@@ -90,6 +157,14 @@ async def start_agent(request: AgentRequest):
     
     return {"status": "success", "message": "Agent process started"}
 
+@app.get("/agent/cache/stats")
+async def get_cache_stats():
+    return response_cache.stats()
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/agent/{workflow_id}/status")
 async def get_agent_status(workflow_id: str):
     if workflow_id not in agent_states:
@@ -98,15 +173,21 @@ async def get_agent_status(workflow_id: str):
     return agent_states[workflow_id]
 
 async def process_agent_task(workflow_id: str):
+    with AGENT_TASKS_IN_PROGRESS.track_inprogress():
+        await run_agent_task(workflow_id)
+
+async def run_agent_task(workflow_id: str):
     try:
         state = agent_states[workflow_id]
         state["status"] = "processing"
         state["message"] = "Starting agent task processing"
         
         # Example task processing
-        result = agent_executor.invoke({
-            "input": "Analyze and summarize the following text: The quick brown fox jumps over the lazy dog."
-        })
+        with AGENT_INVOKE_SECONDS.time():
+            result = agent_executor.invoke({
+                "input": "Analyze and summarize the following text: The quick brown fox jumps over the lazy dog.",
+                "chat_history": []
+            })
         
         state["messages"].append({
             "role": "agent",
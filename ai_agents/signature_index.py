@@ -0,0 +1,406 @@
+"""
+Calldata decoding with a local 4-byte selector index.
+
+Function signatures are listed in signatures.txt. On first use they are
+compiled into signatures.idx, a sorted table of fixed-width entries
+(selector, offset and length of the signature text) followed by the text
+itself. The index is memory-mapped and searched by bisection, so startup cost
+does not grow with the number of signatures and several processes share the
+same pages. It is rebuilt whenever signatures.txt is newer.
+
+Decoding covers the method name and the head of the ABI encoding: static
+arguments (addresses, integers, booleans, fixed bytes, static tuples) and
+top-level strings such as THORChain memos. Dynamic arrays and raw bytes are
+left out; their content can be kept in a CalldataStore and fetched by
+reference when needed.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+BASE_DIR = Path(__file__).resolve().parent
+SIGNATURES_PATH = BASE_DIR / "signatures.txt"
+INDEX_PATH = BASE_DIR / "signatures.idx"
+
+_MAGIC = b"SIG1"
+_HEADER = struct.Struct(">4sI")
+# selector, offset into the string table, length of the signature text
+_ENTRY = struct.Struct(">4sIH")
+# Longest top-level string argument kept in decoded arguments
+MAX_STRING_ARG = 256
+
+# --- Keccak-256 -------------------------------------------------------------
+# Only needed when building the index, so a small pure-Python implementation
+# avoids a dependency on a native crypto package.
+
+_ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008
+]
+_ROTATIONS = [
+    [0, 36, 3, 41, 18], [1, 44, 10, 45, 2], [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56], [27, 20, 39, 8, 14]
+]
+_MASK = (1 << 64) - 1
+
+def _rotl(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (64 - shift))) & _MASK if shift else value
+
+def _keccak_f(state: List[List[int]]) -> List[List[int]]:
+    for constant in _ROUND_CONSTANTS:
+        c = [state[x][0] ^ state[x][1] ^ state[x][2] ^ state[x][3] ^ state[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotl(c[(x + 1) % 5], 1) for x in range(5)]
+        state = [[state[x][y] ^ d[x] for y in range(5)] for x in range(5)]
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                b[y][(2 * x + 3 * y) % 5] = _rotl(state[x][y], _ROTATIONS[x][y])
+        state = [[b[x][y] ^ (~b[(x + 1) % 5][y] & b[(x + 2) % 5][y]) for y in range(5)] for x in range(5)]
+        state[0][0] ^= constant
+    return state
+
+def keccak256(data: bytes) -> bytes:
+    """Keccak-256 as used by Ethereum (original padding, not SHA3-256)."""
+    rate = 136
+    padded = bytearray(data) + b"\x01"
+    padded += b"\x00" * (-len(padded) % rate)
+    padded[-1] |= 0x80
+    state = [[0] * 5 for _ in range(5)]
+    for start in range(0, len(padded), rate):
+        block = padded[start:start + rate]
+        for i in range(rate // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        state = _keccak_f(state)
+    return b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+
+# --- Signatures -------------------------------------------------------------
+
+# A parameter is (type, name); tuple types carry their components as a list
+Param = Tuple[Union[str, list], str]
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    if text[start:].strip():
+        parts.append(text[start:])
+    return parts
+
+def _parse_param(text: str) -> Param:
+    text = text.strip()
+    if text.startswith("("):
+        close = _matching_paren(text)
+        components = [_parse_param(part) for part in _split_top_level(text[1:close])]
+        rest = text[close + 1:].split()
+        suffix = rest[0] if rest and rest[0].startswith("[") else ""
+        name = rest[-1] if rest and not rest[-1].startswith("[") else ""
+        return (components if not suffix else (components, suffix)), name
+    pieces = text.split()
+    return pieces[0], pieces[1] if len(pieces) > 1 else ""
+
+def _matching_paren(text: str) -> int:
+    depth = 0
+    for i, char in enumerate(text):
+        depth += char == "("
+        depth -= char == ")"
+        if depth == 0:
+            return i
+    raise ValueError(f"Unbalanced parentheses in {text!r}")
+
+def parse_signature(signature: str) -> Tuple[str, List[Param]]:
+    """
+    Split a signature such as "transfer(address to,uint256 amount)" into its name and parameters.
+
+    Args:
+        signature (str): Function signature, parameter names optional
+
+    Returns:
+        Tuple[str, List[Param]]: Function name and (type, name) pairs
+    """
+    open_paren = signature.index("(")
+    body = signature[open_paren:].strip()
+    close = _matching_paren(body)
+    return signature[:open_paren].strip(), [_parse_param(part) for part in _split_top_level(body[1:close])]
+
+def _canonical_type(abi_type: Any) -> str:
+    if isinstance(abi_type, tuple):
+        components, suffix = abi_type
+        return _canonical_type(components) + suffix
+    if isinstance(abi_type, list):
+        return "(" + ",".join(_canonical_type(t) for t, _ in abi_type) + ")"
+    return abi_type
+
+def canonical_signature(signature: str) -> str:
+    """Signature with parameter names removed, the form selectors are computed from."""
+    name, params = parse_signature(signature)
+    return f"{name}(" + ",".join(_canonical_type(t) for t, _ in params) + ")"
+
+def selector_of(signature: str) -> bytes:
+    """First four bytes of the Keccak-256 hash of the canonical signature."""
+    return keccak256(canonical_signature(signature).encode())[:4]
+
+# --- Index ------------------------------------------------------------------
+
+def build_index(source: Path = SIGNATURES_PATH, index_path: Path = INDEX_PATH) -> int:
+    """
+    Compile a signature file into the binary index.
+
+    Signatures sharing a selector keep the first one listed.
+
+    Args:
+        source (Path): Text file with one signature per line, # starts a comment
+        index_path (Path): Index file to write
+
+    Returns:
+        int: Number of indexed selectors
+    """
+    entries: Dict[bytes, bytes] = {}
+    with open(source) as f:
+        for line in f:
+            signature = line.split("#", 1)[0].strip()
+            if signature:
+                entries.setdefault(selector_of(signature), signature.encode())
+
+    table, strings = bytearray(), bytearray()
+    for selector in sorted(entries):
+        text = entries[selector]
+        table += _ENTRY.pack(selector, len(strings), len(text))
+        strings += text
+
+    # Write to a private file next to the target and rename it, so readers never see a partial
+    # index and processes rebuilding at the same time never write into each other's file
+    with tempfile.NamedTemporaryFile(dir=index_path.parent, prefix=index_path.name, delete=False) as f:
+        try:
+            f.write(_HEADER.pack(_MAGIC, len(entries)) + table + strings)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, index_path)
+    return len(entries)
+
+class SignatureIndex:
+    """Memory-mapped selector index with binary search lookups."""
+
+    def __init__(self, index_path: Path = INDEX_PATH, source: Optional[Path] = SIGNATURES_PATH):
+        """
+        Args:
+            index_path (Path): Compiled index
+            source (Optional[Path]): Signature file the index is (re)built from when missing or older, None to never build
+        """
+        if source is not None and (
+            not index_path.exists() or index_path.stat().st_mtime < source.stat().st_mtime
+        ):
+            build_index(source, index_path)
+        with open(index_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{index_path} is not a signature index")
+        self._strings = _HEADER.size + self.count * _ENTRY.size
+        self._params: Dict[bytes, Tuple[str, List[Param]]] = {}
+
+    def lookup(self, selector: bytes) -> Optional[str]:
+        """
+        Find the signature of a 4-byte selector.
+
+        Args:
+            selector (bytes): Selector
+
+        Returns:
+            Optional[str]: Signature with parameter names, None if unknown
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            key, offset, length = _ENTRY.unpack_from(self._map, _HEADER.size + middle * _ENTRY.size)
+            if key == selector:
+                start = self._strings + offset
+                return self._map[start:start + length].decode()
+            if key < selector:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def parsed(self, selector: bytes) -> Optional[Tuple[str, List[Param]]]:
+        """Name and parameters of a selector, parsed once and cached."""
+        if selector not in self._params:
+            signature = self.lookup(selector)
+            if signature is None:
+                return None
+            self._params[selector] = parse_signature(signature)
+        return self._params[selector]
+
+    def close(self) -> None:
+        self._map.close()
+
+_index: Optional[SignatureIndex] = None
+
+def get_index() -> SignatureIndex:
+    """Shared index, opened on first use."""
+    global _index
+    if _index is None:
+        _index = SignatureIndex()
+    return _index
+
+# --- ABI decoding -----------------------------------------------------------
+
+def _is_dynamic(abi_type: Any) -> bool:
+    if isinstance(abi_type, tuple):
+        return True if abi_type[1].endswith("[]") else _is_dynamic(abi_type[0])
+    if isinstance(abi_type, list):
+        return any(_is_dynamic(t) for t, _ in abi_type)
+    return abi_type in ("string", "bytes") or abi_type.endswith("[]")
+
+def _head_size(abi_type: Any) -> int:
+    if isinstance(abi_type, list) and not _is_dynamic(abi_type):
+        return sum(_head_size(t) for t, _ in abi_type)
+    return 32
+
+def _word(data: bytes, offset: int) -> int:
+    if offset + 32 > len(data):
+        raise ValueError("calldata too short")
+    return int.from_bytes(data[offset:offset + 32], "big")
+
+def _decode_static(abi_type: str, data: bytes, offset: int) -> Any:
+    value = _word(data, offset)
+    if abi_type == "address":
+        return "0x" + data[offset + 12:offset + 32].hex()
+    if abi_type == "bool":
+        return bool(value)
+    if abi_type.startswith("int"):
+        bits = int(abi_type[3:] or 256)
+        value &= (1 << bits) - 1
+        return str(value - (1 << bits) if value >> (bits - 1) else value)
+    if abi_type.startswith("uint"):
+        # Decimal strings keep 256-bit values exact in JSON
+        return str(value)
+    if abi_type.startswith("bytes"):
+        return "0x" + data[offset:offset + int(abi_type[5:])].hex()
+    return None
+
+def _decode_params(params: List[Param], data: bytes, base: int) -> Dict[str, Any]:
+    args, position = {}, base
+    for index, (abi_type, name) in enumerate(params):
+        key = name or f"arg{index}"
+        if isinstance(abi_type, list) and not _is_dynamic(abi_type):
+            args[key] = _decode_params(abi_type, data, position)
+        elif abi_type == "string":
+            start = base + _word(data, position)
+            length = _word(data, start)
+            text = data[start + 32:start + 32 + min(length, MAX_STRING_ARG)]
+            args[key] = text.decode("utf-8", errors="replace")
+        elif not _is_dynamic(abi_type):
+            args[key] = _decode_static(abi_type, data, position)
+        position += _head_size(abi_type)
+    return {k: v for k, v in args.items() if v is not None}
+
+def _memo(data: bytes) -> Optional[str]:
+    # THORChain and similar bridges accept plain-text memos as calldata
+    try:
+        text = data.decode("ascii")
+    except UnicodeDecodeError:
+        return None
+    return text if text.isprintable() else None
+
+def decode_call(input_data: Optional[str], index: Optional[SignatureIndex] = None) -> Dict[str, Any]:
+    """
+    Decode the method and key arguments of transaction input.
+
+    Args:
+        input_data (Optional[str]): Hex calldata as returned by Etherscan
+        index (Optional[SignatureIndex]): Index to use, defaults to the shared one
+
+    Returns:
+        Dict[str, Any]: "method" always; "selector" for contract calls; "args" when
+            the selector is known or the input is a text memo
+    """
+    if not input_data or input_data == "0x":
+        return {"method": "Transfer"}
+    data = bytes.fromhex(input_data[2:] if input_data.startswith("0x") else input_data)
+    # A known selector wins: a call without arguments can be four printable bytes
+    selector = data[:4]
+    parsed = (index or get_index()).parsed(selector) if len(selector) == 4 else None
+    if parsed is None:
+        memo = _memo(data)
+        if memo is not None:
+            return {"method": "Memo", "args": {"memo": memo[:MAX_STRING_ARG]}}
+
+    decoded: Dict[str, Any] = {"method": "Contract Interaction", "selector": "0x" + selector.hex()}
+    if parsed is None:
+        return decoded
+    name, params = parsed
+    decoded["method"] = name
+    try:
+        decoded["args"] = _decode_params(params, data, 4)
+    except ValueError:
+        # Truncated or non-standard encoding; the method name is still right
+        pass
+    return decoded
+
+class CalldataStore:
+    """
+    Content-addressed store for raw calldata.
+
+    Each distinct input is written once under its SHA-256 digest, so records
+    only carry a short reference and repeated calldata is stored once.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        """
+        Args:
+            directory (Union[str, Path]): Directory holding the calldata files
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / digest
+
+    def put(self, input_data: str) -> str:
+        """
+        Store calldata.
+
+        Args:
+            input_data (str): Hex calldata
+
+        Returns:
+            str: Reference of the form "sha256:<digest>"
+        """
+        data = bytes.fromhex(input_data[2:] if input_data.startswith("0x") else input_data)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(data)
+        return f"sha256:{digest}"
+
+    def get(self, reference: str) -> Optional[str]:
+        """
+        Fetch calldata by reference.
+
+        Args:
+            reference (str): Reference returned by put
+
+        Returns:
+            Optional[str]: Hex calldata, None if not stored here
+        """
+        path = self._path(reference.split(":", 1)[-1])
+        if not path.exists():
+            return None
+        return "0x" + path.read_bytes().hex()
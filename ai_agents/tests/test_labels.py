@@ -0,0 +1,110 @@
+import json
+import os
+
+from labels import LabelStore, read_label_file
+
+PREFIX = "0x" + "ab" * 8
+FIRST = PREFIX + "00" * 12
+SECOND = PREFIX + "11" * 12
+THIRD = PREFIX + "22" * 12
+OTHER = "0x" + "cd" * 20
+
+
+def write_csv(path, rows, header="address,category,name"):
+    path.write_text("\n".join([header, *(",".join(row) for row in rows)]) + "\n")
+    return path
+
+
+def touch(path, offset):
+    """Move a file's modification time so a reload notices it within one test."""
+    mtime = path.stat().st_mtime + offset
+    os.utime(path, (mtime, mtime))
+
+
+def test_addresses_sharing_a_prefix(tmp_path):
+    store = LabelStore([write_csv(tmp_path / "labels.csv", [
+        (FIRST, "exchange", "Binance 14"),
+        (SECOND, "mixer", "Tornado Cash"),
+    ])])
+    assert len(store) == 2
+    # The second one goes to the collision table and is still found
+    slots, collisions = store._index[:2]
+    assert len(slots) == 1 and len(collisions) == 1
+    assert store.get(FIRST) == {"category": "exchange", "name": "Binance 14"}
+    assert store.get(SECOND) == {"category": "mixer", "name": "Tornado Cash"}
+    assert store.get("0x" + SECOND[2:].upper()) == {"category": "mixer", "name": "Tornado Cash"}
+    # Same prefix, but neither the slot's address nor a collision
+    assert store.get(THIRD) is None
+    assert store.get(OTHER) is None
+
+
+def test_csv_reader(tmp_path):
+    path = tmp_path / "labels.csv"
+    path.write_text(
+        "# comments are skipped\n"
+        "address,category,name\n"
+        f"{FIRST},exchange,Binance 14\n"
+        f"0x{OTHER[2:].upper()},router,\n"
+    )
+    assert list(read_label_file(path)) == [
+        (FIRST, "exchange", "Binance 14"), ("0x" + OTHER[2:].upper(), "router", "")
+    ]
+
+
+def test_json_readers(tmp_path):
+    listed = tmp_path / "list.json"
+    listed.write_text(json.dumps([{"address": FIRST, "category": "bridge", "name": "Stargate"},
+                                  {"address": OTHER, "category": "sanctioned"}]))
+    keyed = tmp_path / "keyed.json"
+    keyed.write_text(json.dumps({SECOND: {"category": "mixer", "name": "Tornado Cash"}}))
+    assert list(read_label_file(listed)) == [(FIRST, "bridge", "Stargate"), (OTHER, "sanctioned", "")]
+    assert list(read_label_file(keyed)) == [(SECOND, "mixer", "Tornado Cash")]
+    store = LabelStore([listed, keyed])
+    assert store.get(OTHER) == {"category": "sanctioned", "name": ""}
+    assert store.get(SECOND)["name"] == "Tornado Cash"
+
+
+def test_invalid_rows_are_skipped_and_later_files_win(tmp_path):
+    base = write_csv(tmp_path / "base.csv", [
+        (FIRST, "exchange", "Old name"),
+        ("0x1234", "exchange", "Too short"),
+        ("0x" + "zz" * 20, "exchange", "Not hex"),
+        (OTHER, "casino", "Unknown category"),
+    ])
+    override = write_csv(tmp_path / "override.csv", [(FIRST, "exchange", "New name")])
+    store = LabelStore([base, override, tmp_path / "missing.csv"])
+    assert len(store) == 1
+    assert store.get(FIRST)["name"] == "New name"
+    assert store.get(OTHER) is None
+    for address in (None, "", "0x1234", "not an address"):
+        assert store.get(address) is None
+
+
+def test_changed_files_are_reloaded(tmp_path):
+    path = write_csv(tmp_path / "labels.csv", [(FIRST, "exchange", "Binance 14")])
+    extra = tmp_path / "extra.json"
+    store = LabelStore([path, extra], check_interval=0)
+    assert not store.maybe_reload()
+
+    write_csv(path, [(FIRST, "exchange", "Binance 14"), (SECOND, "mixer", "Tornado Cash")])
+    touch(path, 10)
+    assert store.get(SECOND) == {"category": "mixer", "name": "Tornado Cash"}
+
+    # A file that did not exist yet is picked up, and labels of a removed one dropped
+    extra.write_text(json.dumps({OTHER: {"category": "sanctioned", "name": "OFAC"}}))
+    assert store.get(OTHER) == {"category": "sanctioned", "name": "OFAC"}
+    extra.unlink()
+    assert store.get(OTHER) is None
+    assert len(store) == 2
+
+
+def test_reload_waits_for_the_check_interval(tmp_path):
+    path = write_csv(tmp_path / "labels.csv", [(FIRST, "exchange", "Binance 14")])
+    store = LabelStore([path], check_interval=3600)
+    write_csv(path, [(SECOND, "mixer", "Tornado Cash")])
+    touch(path, 10)
+    assert not store.maybe_reload()
+    assert store.get(SECOND) is None
+    assert store.reload() == 1
+    assert store.get(SECOND)["name"] == "Tornado Cash"
+    assert store.get(FIRST) is None
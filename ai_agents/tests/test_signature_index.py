@@ -0,0 +1,160 @@
+import os
+
+import pytest
+
+from signature_index import (MAX_STRING_ARG, SignatureIndex, build_index, canonical_signature, decode_call,
+                             keccak256, parse_signature, selector_of)
+
+SIGNATURES = """
+# ERC-20 and WETH
+transfer(address to,uint256 amount)
+transfer(address,uint256)  # same selector, the named one above is kept
+deposit()
+depositWithExpiry(address vault,address asset,uint256 amount,string memo,uint256 expiration)
+exactInputSingle((address tokenIn,address tokenOut,uint24 fee,address recipient,uint256 deadline,uint256 amountIn,uint256 amountOutMinimum,uint160 sqrtPriceLimitX96) params)
+mint(uint256[] ids,int256 delta,address to)
+probe26()
+"""
+
+ALICE = "0x" + "11" * 20
+VAULT = "0x" + "22" * 20
+
+
+def word(value):
+    return (value % (1 << 256)).to_bytes(32, "big")
+
+
+def address(value):
+    return word(int(value, 16))
+
+
+def calldata(selector, *words):
+    return "0x" + selector + b"".join(words).hex()
+
+
+@pytest.fixture
+def index(tmp_path):
+    source = tmp_path / "signatures.txt"
+    source.write_text(SIGNATURES)
+    index = SignatureIndex(tmp_path / "signatures.idx", source)
+    yield index
+    index.close()
+
+
+def test_keccak_and_selectors():
+    assert keccak256(b"").hex() == "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+    # Inputs longer than one 136-byte block
+    assert keccak256(b"a" * 200) != keccak256(b"a" * 199)
+    assert selector_of("transfer(address,uint256)").hex() == "a9059cbb"
+    assert selector_of("transfer(address to, uint256 amount)").hex() == "a9059cbb"
+    assert selector_of("deposit()").hex() == "d0e30db0"
+    assert selector_of("depositWithExpiry(address,address,uint256,string,uint256)").hex() == "44bc937b"
+    assert selector_of(
+        "exactInputSingle((address,address,uint24,address,uint256,uint256,uint256,uint160))"
+    ).hex() == "414bf389"
+
+
+def test_parse_signature_with_tuples():
+    name, params = parse_signature("f((uint256 a,(address,bool)[] b) order,bytes32 salt)")
+    assert name == "f"
+    assert params == [([("uint256", "a"), (([("address", ""), ("bool", "")], "[]"), "b")], "order"),
+                      ("bytes32", "salt")]
+    assert canonical_signature("f((uint256 a,(address,bool)[] b) order,bytes32 salt)") == \
+        "f((uint256,(address,bool)[]),bytes32)"
+
+
+def test_lookup_bisects_the_mapped_table(tmp_path):
+    source = tmp_path / "signatures.txt"
+    signatures = [f"f{i}(uint256 x)" for i in range(500)]
+    source.write_text("\n".join(signatures))
+    assert build_index(source, tmp_path / "signatures.idx") == 500
+    index = SignatureIndex(tmp_path / "signatures.idx", source=None)
+    assert index.count == 500
+    assert all(index.lookup(selector_of(signature)) == signature for signature in signatures)
+    assert index.lookup(b"\x00\x00\x00\x00") is None
+    assert index.lookup(b"\xff\xff\xff\xff") is None
+    index.close()
+
+
+def test_duplicate_selectors_keep_the_first(index):
+    assert index.count == 6
+    assert index.lookup(bytes.fromhex("a9059cbb")) == "transfer(address to,uint256 amount)"
+
+
+def test_index_is_rebuilt_when_the_source_is_newer(tmp_path):
+    source = tmp_path / "signatures.txt"
+    source.write_text("deposit()\n")
+    SignatureIndex(tmp_path / "signatures.idx", source).close()
+    built = (tmp_path / "signatures.idx").stat().st_mtime
+    source.write_text("deposit()\nwithdraw(uint256 wad)\n")
+    os.utime(source, (built + 10, built + 10))
+    index = SignatureIndex(tmp_path / "signatures.idx", source)
+    assert index.lookup(selector_of("withdraw(uint256)")) == "withdraw(uint256 wad)"
+    index.close()
+
+
+def test_decode_transfer(index):
+    result = decode_call(calldata("a9059cbb", address(ALICE), word(10**30)), index)
+    assert result == {"method": "transfer", "selector": "0xa9059cbb", "args": {"to": ALICE, "amount": str(10**30)}}
+
+
+def test_plain_transfers_and_unknown_selectors(index):
+    assert decode_call(None, index) == {"method": "Transfer"}
+    assert decode_call("0x", index) == {"method": "Transfer"}
+    assert decode_call(calldata("deadbeef", word(1)), index) == {
+        "method": "Contract Interaction", "selector": "0xdeadbeef"
+    }
+    assert decode_call("0xd0e30db0", index) == {"method": "deposit", "selector": "0xd0e30db0", "args": {}}
+
+
+def test_truncated_arguments_keep_the_method(index):
+    result = decode_call(calldata("a9059cbb", address(ALICE), b"\x00" * 16), index)
+    assert result == {"method": "transfer", "selector": "0xa9059cbb"}
+
+
+def test_thorchain_memo(index):
+    memo = "=:BTC.BTC:bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh:0/1/0"
+    result = decode_call("0x" + memo.encode().hex(), index)
+    assert result == {"method": "Memo", "args": {"memo": memo}}
+    long_memo = "SWAP:ETH.ETH:" + "x" * 400
+    assert decode_call("0x" + long_memo.encode().hex(), index)["args"]["memo"] == long_memo[:MAX_STRING_ARG]
+
+
+def test_memo_with_unprintable_bytes_is_a_contract_call(index):
+    assert decode_call("0x" + b"=:BTC.BTC\x00".hex(), index)["method"] == "Contract Interaction"
+
+
+def test_known_selector_of_four_printable_bytes(index):
+    selector = selector_of("probe26()")
+    assert selector.decode("ascii").isprintable()
+    # A known selector wins over reading the same bytes as a memo
+    assert decode_call("0x" + selector.hex(), index)["method"] == "probe26"
+    assert decode_call("0x" + b"G*.a".hex(), index) == {"method": "Memo", "args": {"memo": "G*.a"}}
+
+
+def test_router_deposit_with_string_memo(index):
+    memo = "SWAP:BTC.BTC:bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh"
+    encoded = memo.encode()
+    data = calldata(
+        "44bc937b", address(VAULT), address("0x0"), word(5 * 10**18), word(5 * 32), word(1700000000),
+        word(len(encoded)), encoded.ljust(32 * ((len(encoded) + 31) // 32), b"\x00")
+    )
+    assert decode_call(data, index)["args"] == {
+        "vault": VAULT, "asset": "0x" + "00" * 20, "amount": str(5 * 10**18), "memo": memo,
+        "expiration": "1700000000"
+    }
+
+
+def test_static_tuple(index):
+    data = calldata("414bf389", address(ALICE), address(VAULT), word(3000), address(ALICE), word(1700000000),
+                    word(10**18), word(0), word(0))
+    assert decode_call(data, index)["args"] == {"params": {
+        "tokenIn": ALICE, "tokenOut": VAULT, "fee": "3000", "recipient": ALICE, "deadline": "1700000000",
+        "amountIn": str(10**18), "amountOutMinimum": "0", "sqrtPriceLimitX96": "0"
+    }}
+
+
+def test_dynamic_arrays_are_skipped(index):
+    data = calldata(selector_of("mint(uint256[],int256,address)").hex(), word(3 * 32), word(-5), address(ALICE),
+                    word(1), word(42))
+    assert decode_call(data, index)["args"] == {"delta": "-5", "to": ALICE}
@@ -0,0 +1,68 @@
+import copy
+
+from wallet_tracker3 import _record_key, fill_log_indexes, track
+
+SEED = "0xseed"
+USDT = "0x00000000000000000000000000000000000000aa"
+DAI = "0x00000000000000000000000000000000000000bb"
+
+
+def eth(tx_hash, sender, recipient, value, block):
+    return {"hash": tx_hash, "from": sender, "to": recipient, "value": str(value), "timeStamp": "1700000000",
+            "blockNumber": str(block), "input": "0x"}
+
+
+def token(tx_hash, sender, recipient, value, block, contract=USDT, symbol="USDT", **extra):
+    return {"hash": tx_hash, "from": sender, "to": recipient, "value": str(value), "timeStamp": "1700000000",
+            "blockNumber": str(block), "contractAddress": contract, "tokenSymbol": symbol, "tokenDecimal": "6",
+            **extra}
+
+
+class FakeEtherscan:
+    """Answers from fixed tokentx rows without logIndex, the way Etherscan sometimes returns them."""
+
+    def __init__(self):
+        self.internal = {SEED: [eth(SEED, "0xs", "0xa", 10**18, 100)]}
+        self.tokens = {
+            "0xa": [
+                # One swap moving two tokens to the same wallet, and two identical transfers
+                token("0xswap", "0xa", "0xb", 100 * 10**6, 101),
+                token("0xswap", "0xa", "0xb", 50 * 10**6, 101, DAI, "DAI"),
+                token("0xswap", "0xa", "0xc", 10 * 10**6, 101),
+                token("0xswap", "0xa", "0xc", 10 * 10**6, 101),
+            ],
+            "0xb": [token("0xnext", "0xb", "0xd", 60 * 10**6, 102)],
+        }
+
+    def get_transaction_details(self, tx_hash):
+        return self.internal.get(tx_hash)
+
+    def get_wallet_transactions(self, wallet, start_block, end_block=None):
+        return None
+
+    def get_token_transfers(self, wallet, start_block, end_block=None):
+        return copy.deepcopy(self.tokens.get(wallet))
+
+
+def test_transfers_of_one_transaction_without_log_index_are_all_followed():
+    records = track(SEED, FakeEtherscan(), output_path=None, verbose=False)
+
+    swap = [record for record in records if record["tx_hash"] == "0xswap"]
+    assert len(swap) == 4
+    assert len({_record_key(record) for record in swap}) == 4
+    assert all(record["log_index"] < 0 for record in swap)
+
+    # The child of the USDT transfer to 0xb points at that transfer, not at the DAI one
+    usdt_to_b = next(record for record in swap if record["to"] == "0xb" and record["currency"] == "USDT")
+    child = next(record for record in records if record["tx_hash"] == "0xnext")
+    assert child["parent_log_index"] == usdt_to_b["log_index"]
+
+
+def test_derived_log_indexes_are_stable_and_real_ones_are_kept():
+    rows = FakeEtherscan().tokens["0xa"]
+    first = [row["logIndex"] for row in fill_log_indexes(copy.deepcopy(rows))]
+    # The recipient's query lists the transfer too, in another order and with other rows
+    again = fill_log_indexes([copy.deepcopy(rows[1]), token("0xother", "0xz", "0xb", 1, 99), copy.deepcopy(rows[0])])
+    assert again[0]["logIndex"] == first[1] and again[2]["logIndex"] == first[0]
+
+    assert fill_log_indexes([token("0xswap", "0xa", "0xb", 1, 101, logIndex="7")])[0]["logIndex"] == "7"
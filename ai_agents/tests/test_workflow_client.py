@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+from workflow_client import WorkflowClient
+
+
+async def serve(received, ack_delay):
+    """Ingest endpoint that records every transaction and acknowledges batches slowly."""
+    async def ingest(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            batch = json.loads(message.data)
+            received.extend(batch["transactions"])
+            await asyncio.sleep(ack_delay)
+            await ws.send_json({"batch_id": batch["batch_id"], "accepted": len(batch["transactions"]), "rejected": []})
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/workflow/w/ingest", ingest)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+def test_close_during_slow_send_delivers_every_transaction_once():
+    async def scenario():
+        received = []
+        runner, url = await serve(received, ack_delay=0.3)
+        client = WorkflowClient("w", url, batch_size=1000, flush_interval=0.05)
+        await client.connect()
+        for i in range(3):
+            await client.send({"i": i})
+        # Let the periodic flush send its batch and wait for the slow acknowledgement
+        await asyncio.sleep(0.1)
+        for i in range(3, 5):
+            await client.send({"i": i})
+        await client.close()
+        await runner.cleanup()
+        return received, client.acks
+
+    received, acks = asyncio.run(scenario())
+    assert sorted(tx["i"] for tx in received) == [0, 1, 2, 3, 4]
+    assert [ack["accepted"] for ack in acks] == [3, 2]
+
+
+def test_failed_flush_keeps_the_batch():
+    async def scenario():
+        client = WorkflowClient("w", "http://127.0.0.1:9", batch_size=1000)
+        await client.send({"i": 0})
+        try:
+            await client.flush()
+        except Exception:
+            pass
+        pending = list(client._pending)
+        await client._session.close()
+        return pending
+
+    assert asyncio.run(scenario()) == [{"i": 0}]
@@ -0,0 +1,333 @@
+"""
+Synthetic transaction trace generator for load testing.
+
+Produces transaction trees in the all_transactions.json schema with
+controllable depth, fan-out distributions, hot wallets (exchanges, mixers)
+and cycles, and streams them to a file, into MongoDB or into a workflow
+over the batched ingest channel at a target rate.
+
+Usage:
+    python trace_generator.py --count 100000 --output synthetic.json
+    python trace_generator.py --count 1000000 --fanout lognormal:0.5,1.2 --hot-wallets 20 --format jsonl --output big.jsonl
+    python trace_generator.py --count 50000 --rate 2000 --workflow-id <id>              # WebSocket ingest
+    python trace_generator.py --count 50000 --mongo-uri mongodb://localhost --db aml --workflow-id <id>
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+GENESIS_BLOCK = 21_900_000
+GENESIS_TIMESTAMP = 1_740_000_000  # timestamp of GENESIS_BLOCK
+BLOCK_TIME = 12  # seconds
+
+def parse_distribution(spec: str, rng: random.Random) -> Callable[[], int]:
+    """
+    Build a sampler of non-negative integers from a distribution spec.
+
+    Supported specs: "fixed:k", "uniform:a,b", "poisson:mean", "geometric:mean",
+    "lognormal:mu,sigma" (heavy tail), "pareto:alpha" (very heavy tail).
+
+    Args:
+        spec (str): Distribution spec
+        rng (random.Random): Random source
+
+    Returns:
+        Callable[[], int]: Function drawing one sample
+
+    Raises:
+        ValueError: If the spec is not recognized
+    """
+    name, _, args = spec.partition(":")
+    params = [float(p) for p in args.split(",") if p]
+    if name == "fixed":
+        return lambda: int(params[0])
+    if name == "uniform":
+        return lambda: rng.randint(int(params[0]), int(params[1]))
+    if name == "poisson":
+        limit = math.exp(-params[0])
+
+        def poisson() -> int:
+            # Knuth's method; fan-out means are small
+            k, p = 0, rng.random()
+            while p > limit:
+                k += 1
+                p *= rng.random()
+            return k
+        return poisson
+    if name == "geometric":
+        p = 1 / (1 + params[0])
+        return lambda: int(math.log(1 - rng.random()) / math.log(1 - p))
+    if name == "lognormal":
+        return lambda: int(rng.lognormvariate(params[0], params[1]))
+    if name == "pareto":
+        return lambda: int(rng.paretovariate(params[0])) - 1
+    raise ValueError(f"Unknown distribution: {spec}")
+
+class TraceGenerator:
+    """
+    Generator of synthetic fund-flow trees.
+
+    Starting from a seed transaction with several internal transfers, every
+    received transfer is spent onward breadth-first. Each wallet forwards its
+    funds to a number of recipients drawn from the fan-out distribution,
+    splitting the amount randomly minus a small fee, in later blocks. Amounts
+    are split in integer wei, so every transfer's children sum exactly to
+    what it forwarded.
+    Recipients are new wallets, hot wallets (a fixed pool with Zipf-like
+    popularity and their own, heavier fan-out), or, with the cycle
+    probability, a wallet already on the path the funds took.
+    """
+
+    def __init__(self, max_depth: int = 6, seed_transfers: int = 10, fanout: str = "geometric:1.5",
+                 hot_wallets: int = 0, hot_prob: float = 0.05, hot_fanout: str = "lognormal:2,1",
+                 cycle_prob: float = 0.0, seed_amount: float = 1000.0, min_amount: float = 0.001,
+                 block_gap: float = 200.0, seed: Optional[int] = None):
+        """
+        Args:
+            max_depth (int): Deepest hop generated below the seed
+            seed_transfers (int): Internal transfers of the seed transaction (depth 0)
+            fanout (str): Distribution of recipients per spent transfer
+            hot_wallets (int): Size of the hot wallet pool
+            hot_prob (float): Probability that a recipient is a hot wallet
+            hot_fanout (str): Distribution of recipients when a hot wallet spends
+            cycle_prob (float): Probability that a recipient is a wallet already on the path
+            seed_amount (float): ETH moved by the seed transaction
+            min_amount (float): Transfers below this amount are not spent further
+            block_gap (float): Mean number of blocks between receiving and spending funds
+            seed (Optional[int]): Random seed for reproducible traces
+        """
+        self.rng = random.Random(seed)
+        self.max_depth = max_depth
+        self.seed_transfers = seed_transfers
+        self.fanout = parse_distribution(fanout, self.rng)
+        self.hot_fanout = parse_distribution(hot_fanout, self.rng)
+        self.hot_prob = hot_prob if hot_wallets else 0.0
+        self.cycle_prob = cycle_prob
+        self.seed_value = int(seed_amount * 10**18)
+        self.min_value = int(min_amount * 10**18)
+        self.block_gap = block_gap
+        self.hot_wallets = [self._address() for _ in range(hot_wallets)]
+        self._hot_set = set(self.hot_wallets)
+        # Zipf-like popularity: the k-th hot wallet is picked with weight 1/k
+        self._hot_weights = [1 / (k + 1) for k in range(hot_wallets)]
+
+    def _address(self) -> str:
+        return f"0x{self.rng.getrandbits(160):040x}"
+
+    def _hash(self) -> str:
+        return f"0x{self.rng.getrandbits(256):064x}"
+
+    def _recipient(self, path: tuple) -> str:
+        draw = self.rng.random()
+        if draw < self.cycle_prob and path:
+            return self.rng.choice(path)
+        if draw < self.cycle_prob + self.hot_prob:
+            return self.rng.choices(self.hot_wallets, self._hot_weights)[0]
+        return self._address()
+
+    def _record(self, tx_hash: str, parent_tx: Optional[str], sender: str, recipient: str,
+                value: int, block: int, depth: int) -> Dict[str, Any]:
+        timestamp = GENESIS_TIMESTAMP + (block - GENESIS_BLOCK) * BLOCK_TIME
+        return {
+            "tx_hash": tx_hash,
+            "parent_tx": parent_tx,
+            "from": sender,
+            "to": recipient,
+            "value": str(value),
+            "decimals": 18,
+            "amount": value / 10**18,
+            "currency": "ETH",
+            "time": datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+            "blockNumber": str(block),
+            "method": "Transfer",
+            "input": "0x",
+            "depth": depth
+        }
+
+    def _split(self, value: int, parts: int) -> List[int]:
+        spendable = value * self.rng.randint(950, 999) // 1000  # fees and dust stay behind
+        weights = [self.rng.expovariate(1.0) for _ in range(parts)]
+        total = sum(weights)
+        # Cut points on the cumulative weights keep shares non-negative and summing to spendable
+        cuts = [int(spendable * c / total) for c in itertools.accumulate(weights[:-1])] + [spendable]
+        return [end - start for start, end in zip([0] + cuts, cuts)]
+
+    def generate(self, count: int) -> Iterator[Dict[str, Any]]:
+        """
+        Generate up to `count` records, parents always before their children.
+
+        Args:
+            count (int): Maximum number of records
+
+        Yields:
+            Dict[str, Any]: Records in the all_transactions.json schema
+        """
+        produced = 0
+        # Queue entries: (record, wallets the funds passed through)
+        queue: deque = deque()
+        while produced < count:
+            # A new seed transaction whenever the previous tree is exhausted
+            seed_hash, source = self._hash(), self._address()
+            block = GENESIS_BLOCK + self.rng.randint(0, 10_000)
+            for value in self._split(self.seed_value, self.seed_transfers):
+                if produced >= count:
+                    return
+                record = self._record(seed_hash, None, source, self._address(), value, block, 0)
+                produced += 1
+                queue.append((record, (source,)))
+                yield record
+
+            while queue and produced < count:
+                parent, path = queue.popleft()
+                if parent["depth"] >= self.max_depth or int(parent["value"]) < self.min_value:
+                    continue
+                sender = parent["to"]
+                parts = (self.hot_fanout if sender in self._hot_set else self.fanout)()
+                if parts <= 0:
+                    continue
+                path = path + (sender,)
+                block = int(parent["blockNumber"])
+                for value in self._split(int(parent["value"]), parts):
+                    if produced >= count:
+                        return
+                    block += 1 + int(self.rng.expovariate(1 / self.block_gap))
+                    record = self._record(self._hash(), parent["tx_hash"], sender, self._recipient(path),
+                                          value, block, parent["depth"] + 1)
+                    produced += 1
+                    queue.append((record, path))
+                    yield record
+
+def paced(records: Iterator[Dict[str, Any]], rate: Optional[float]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield records no faster than `rate` per second.
+
+    Args:
+        records (Iterator[Dict[str, Any]]): Records to pace
+        rate (Optional[float]): Records per second, None for unlimited
+    """
+    if not rate:
+        yield from records
+        return
+    started = time.perf_counter()
+    for i, record in enumerate(records):
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        yield record
+
+def write_file(records: Iterator[Dict[str, Any]], path: str, jsonl: bool = False) -> int:
+    """
+    Stream records to a JSON array file (or JSON lines) without holding them in memory.
+
+    Returns:
+        int: Number of records written
+    """
+    written = 0
+    with open(path, "w") as f:
+        if not jsonl:
+            f.write("[\n")
+        for record in records:
+            if jsonl:
+                f.write(json.dumps(record) + "\n")
+            else:
+                f.write((",\n" if written else "") + json.dumps(record))
+            written += 1
+        if not jsonl:
+            f.write("\n]\n")
+    return written
+
+def write_mongo(records: Iterator[Dict[str, Any]], uri: str, db_name: str, workflow_id: str,
+                batch_size: int = 500) -> int:
+    """
+    Insert records into the `transactions` collection watched by the workflow service.
+
+    Returns:
+        int: Number of records inserted
+    """
+    from pymongo import MongoClient
+    from workflow_client import to_transaction_input
+
+    collection = MongoClient(uri)[db_name]["transactions"]
+    inserted = 0
+    batch = []
+    for record in records:
+        batch.append({**to_transaction_input(record), "workflow_id": workflow_id})
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+async def send_to_workflow(records: Iterator[Dict[str, Any]], workflow_id: str,
+                           base_url: Optional[str] = None, rate: Optional[float] = None) -> int:
+    """
+    Stream records into a workflow over the batched WebSocket ingest channel.
+
+    Returns:
+        int: Number of records sent
+    """
+    from workflow_client import WorkflowClient, to_transaction_input
+
+    sent = 0
+    started = time.perf_counter()
+    async with WorkflowClient(workflow_id, base_url=base_url) as client:
+        for record in records:
+            if rate:
+                delay = started + sent / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await client.send(to_transaction_input(record))
+            sent += 1
+    return sent
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000, help="number of transfers")
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--seed-transfers", type=int, default=10)
+    parser.add_argument("--fanout", default="geometric:1.5", help="recipients per spent transfer")
+    parser.add_argument("--hot-wallets", type=int, default=0, help="size of the hot wallet pool")
+    parser.add_argument("--hot-prob", type=float, default=0.05)
+    parser.add_argument("--hot-fanout", default="lognormal:2,1")
+    parser.add_argument("--cycle-prob", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--rate", type=float, default=None, help="target transfers per second")
+    parser.add_argument("--output", default=None, help="file to write")
+    parser.add_argument("--format", choices=["json", "jsonl"], default="json")
+    parser.add_argument("--mongo-uri", default=None, help="insert into MongoDB instead of a file")
+    parser.add_argument("--db", default=None, help="MongoDB database name")
+    parser.add_argument("--workflow-id", default=None, help="workflow to attach transactions to")
+    parser.add_argument("--workflow-url", default=None, help="workflow service URL (default WORKFLOW_URL)")
+    args = parser.parse_args()
+
+    generator = TraceGenerator(
+        max_depth=args.max_depth, seed_transfers=args.seed_transfers, fanout=args.fanout,
+        hot_wallets=args.hot_wallets, hot_prob=args.hot_prob, hot_fanout=args.hot_fanout,
+        cycle_prob=args.cycle_prob, seed=args.seed
+    )
+    records = generator.generate(args.count)
+    started = time.perf_counter()
+    if args.mongo_uri:
+        if not (args.db and args.workflow_id):
+            parser.error("--mongo-uri requires --db and --workflow-id")
+        count = write_mongo(paced(records, args.rate), args.mongo_uri, args.db, args.workflow_id)
+    elif args.workflow_id:
+        count = asyncio.run(send_to_workflow(records, args.workflow_id, args.workflow_url, args.rate))
+    else:
+        count = write_file(paced(records, args.rate), args.output or "synthetic_transactions.json",
+                           jsonl=args.format == "jsonl")
+    elapsed = time.perf_counter() - started
+    print(f"Generated {count} transfers in {elapsed:.2f}s ({count / elapsed:.0f}/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import json
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional
+
+
+def transfer_key(record: Dict[str, Any]) -> str:
+    """
+    Key of a transfer record: the hash, plus the log index for token transfers.
+
+    One transaction can move ETH and several tokens, so the hash alone does not
+    identify a record (same keys as wallet_tracker3.py).
+    """
+    if "token" in record:
+        return f"{record['tx_hash']}:{record['log_index']}"
+    return record["tx_hash"]
+
+
+class TraceIndex:
+    """
+    Preloaded, indexed view of a traced transaction set (all_transactions.json).
+
+    Everything the agent tools ask for is computed once at load time: per-wallet
+    in/out volume per currency, children of each transfer, the parent chain of
+    every transfer and wallets ranked by received volume. Tool calls are then
+    dictionary lookups or slices instead of scans over the whole trace.
+
+    Records are keyed by `transfer_key`, since the ETH and token transfers of one
+    transaction share its hash. Amounts of different currencies are never added.
+    """
+
+    def __init__(self, transactions: List[Dict[str, Any]]):
+        """
+        Build the indexes.
+
+        Args:
+            transactions (List[Dict[str, Any]]): Transaction records as written by wallet_tracker3.py
+        """
+        self.transactions = transactions
+        self.tx_by_key: Dict[str, Dict[str, Any]] = {}
+        # Keys of the transfers of each transaction hash, in trace order
+        self.transfers: Dict[str, List[str]] = defaultdict(list)
+        self.parent: Dict[str, str] = {}
+        self.children: Dict[str, List[str]] = defaultdict(list)
+        # Wallet -> currency -> volume
+        self.in_volume: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.out_volume: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.in_count: Dict[str, int] = defaultdict(int)
+        self.out_count: Dict[str, int] = defaultdict(int)
+        self.out_wallets: Dict[str, set] = defaultdict(set)
+        # First transfer that delivered funds to each wallet, used to walk parent chains
+        self.first_inbound: Dict[str, str] = {}
+
+        for tx in transactions:
+            key = transfer_key(tx)
+            sender = tx["from"].lower()
+            receiver = tx["to"].lower()
+            amount = tx["amount"]
+            currency = tx.get("currency", "ETH")
+
+            # Internal transfers of a seed transaction share its hash; the first one stands for them
+            if key not in self.tx_by_key:
+                self.tx_by_key[key] = tx
+                self.transfers[tx["tx_hash"]].append(key)
+            self.out_volume[sender][currency] += amount
+            self.out_count[sender] += 1
+            self.in_volume[receiver][currency] += amount
+            self.in_count[receiver] += 1
+            self.out_wallets[sender].add(receiver)
+            if receiver not in self.first_inbound or tx["depth"] < self.tx_by_key[self.first_inbound[receiver]]["depth"]:
+                self.first_inbound[receiver] = key
+
+        # Parents may be listed after their children, so links are resolved once every key is known
+        for key, tx in self.tx_by_key.items():
+            parent = self._parent_key(tx)
+            if parent is not None:
+                self.parent[key] = parent
+                self.children[parent].append(key)
+
+        # Receivers ranked per currency
+        received: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for wallet, volumes in self.in_volume.items():
+            for currency, volume in volumes.items():
+                received[currency][wallet] = volume
+        self.top_receivers: Dict[str, List[tuple]] = {
+            currency: sorted(volumes.items(), key=lambda item: item[1], reverse=True)
+            for currency, volumes in received.items()
+        }
+        # Children grouped by currency, largest first, with their totals, so tx_children only slices
+        self.child_volume: Dict[str, Dict[str, float]] = {}
+        for parent, children in self.children.items():
+            children.sort(key=lambda child: (self._currency(child), -self.tx_by_key[child]["amount"]))
+            volume: Dict[str, float] = defaultdict(float)
+            for child in children:
+                volume[self._currency(child)] += self.tx_by_key[child]["amount"]
+            self.child_volume[parent] = dict(volume)
+
+    @classmethod
+    def load(cls, path: str = "all_transactions.json") -> "TraceIndex":
+        """Load and index a trace file."""
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def _currency(self, key: str) -> str:
+        return self.tx_by_key[key].get("currency", "ETH")
+
+    def _parent_key(self, tx: Dict[str, Any]) -> Optional[str]:
+        """Key of the transfer that funded `tx`, None for seed transfers or parents outside the trace."""
+        parent_tx = tx.get("parent_tx")
+        if not parent_tx:
+            return None
+        if tx.get("parent_log_index") is not None:
+            key = f"{parent_tx}:{tx['parent_log_index']}"
+            if key in self.tx_by_key:
+                return key
+        if parent_tx in self.tx_by_key:
+            return parent_tx
+        # Traces written before parent_log_index: the first transfer of the parent transaction
+        transfers = self.transfers.get(parent_tx)
+        return transfers[0] if transfers else None
+
+    def wallet_summary(self, wallet: str) -> Dict[str, Any]:
+        """Inbound/outbound volume per currency and counts of a wallet."""
+        wallet = wallet.strip().lower()
+        return {
+            "wallet": wallet,
+            "in_volume": dict(self.in_volume.get(wallet, {})),
+            "out_volume": dict(self.out_volume.get(wallet, {})),
+            "in_count": self.in_count.get(wallet, 0),
+            "out_count": self.out_count.get(wallet, 0),
+            "distinct_destinations": len(self.out_wallets.get(wallet, ())),
+        }
+
+    def tx_children(self, tx_hash: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Transfers that spent funds received in a transaction, largest first per currency.
+
+        Args:
+            tx_hash (str): Transaction hash for all of its transfers, or "hash:log_index" for one token transfer
+            limit (int): Children listed per transfer
+
+        Returns:
+            Dict[str, Any]: Per transfer of the transaction, its children and their volume per currency
+        """
+        tx_hash = tx_hash.strip().lower()
+        keys = [tx_hash] if ":" in tx_hash and tx_hash in self.tx_by_key else self.transfers.get(tx_hash, [])
+        transfers = []
+        for key in keys:
+            tx = self.tx_by_key[key]
+            children = self.children.get(key, [])
+            transfers.append({
+                "transfer": key,
+                "currency": self._currency(key),
+                "amount": tx["amount"],
+                "child_count": len(children),
+                "child_volume": self.child_volume.get(key, {}),
+                "children": [
+                    {"transfer": child, "to": self.tx_by_key[child]["to"],
+                     "amount": self.tx_by_key[child]["amount"], "currency": self._currency(child)}
+                    for child in children[:limit]
+                ],
+            })
+        return {"tx_hash": tx_hash, "transfers": transfers}
+
+    def parent_chain(self, wallet: str) -> List[str]:
+        """Wallets from the seed down to `wallet` along the first transfer that funded it."""
+        chain = [wallet]
+        key = self.first_inbound.get(wallet)
+        seen = set()
+        while key and key not in seen:
+            seen.add(key)
+            chain.append(self.tx_by_key[key]["from"].lower())
+            key = self.parent.get(key)
+        chain.reverse()
+        return chain
+
+    def path(self, source: str, target: str, max_hops: int = 6) -> Optional[List[str]]:
+        """
+        Find a path of wallets from `source` to `target`.
+
+        The parent chain of `target` answers the common "how did funds get here"
+        case in O(depth); other pairs fall back to a bounded breadth-first search.
+
+        Returns:
+            Optional[List[str]]: Wallets along the path, or None if there is none within `max_hops`
+        """
+        source = source.strip().lower()
+        target = target.strip().lower()
+        chain = self.parent_chain(target)
+        if source in chain:
+            return chain[chain.index(source):]
+
+        previous: Dict[str, Optional[str]] = {source: None}
+        frontier = deque([(source, 0)])
+        while frontier:
+            wallet, hops = frontier.popleft()
+            if wallet == target:
+                path = []
+                while wallet is not None:
+                    path.append(wallet)
+                    wallet = previous[wallet]
+                return path[::-1]
+            if hops == max_hops:
+                continue
+            for neighbor in self.out_wallets.get(wallet, ()):
+                if neighbor not in previous:
+                    previous[neighbor] = wallet
+                    frontier.append((neighbor, hops + 1))
+        return None
+
+    def top_destinations(self, k: int = 5, currency: str = "ETH") -> List[Dict[str, Any]]:
+        """Wallets that received the most of a currency."""
+        return [
+            {"wallet": wallet, "in_volume": volume, "currency": currency}
+            for wallet, volume in self.top_receivers.get(currency, [])[:k]
+        ]
@@ -1,177 +1,584 @@
+import argparse
+import hashlib
+import heapq
+import os
 import requests
 import json
+from collections import deque
 from datetime import datetime
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
 
-def get_transaction_details(tx_hash):
-    ETHERSCAN_API_KEY = ""
-    base_url = "https://api.etherscan.io/api"
-    
-    # Get internal transactions
-    params = {
-        "module": "account",
-        "action": "txlistinternal",
-        "txhash": tx_hash,
-        "apikey": ETHERSCAN_API_KEY
-    }
-    
-    response = requests.get(base_url, params=params)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if data["status"] == "1" and data["message"] == "OK":
-            return data["result"]
+from labels import LabelStore, TERMINAL_CATEGORIES, get_labels
+from signature_index import CalldataStore, decode_call
+
+# Etherscan's "latest block" sentinel for open-ended block ranges
+LAST_BLOCK = 99999999
+
+class EtherscanClient:
+    """Minimal Etherscan API client used by the tracker."""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.etherscan.io/api"):
+        """
+        Args:
+            api_key (Optional[str]): Etherscan API key, defaults to the ETHERSCAN_API_KEY env var
+            base_url (str): Etherscan API endpoint
+        """
+        self.api_key = api_key if api_key is not None else os.getenv("ETHERSCAN_API_KEY", "")
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.calls = 0
+
+    def _get(self, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        self.calls += 1
+        response = self.session.get(self.base_url, params={**params, "apikey": self.api_key})
+
+        if response.status_code == 200:
+            data = response.json()
+            if data["status"] == "1" and data["message"] == "OK":
+                return data["result"]
+            else:
+                print(f"Error: {data['message']}")
+                return None
         else:
-            print(f"Error: {data['message']}")
+            print(f"Error: HTTP {response.status_code}")
             return None
-    else:
-        print(f"Error: HTTP {response.status_code}")
-        return None
-
-def get_wallet_transactions(wallet_address, start_block):
-    ETHERSCAN_API_KEY = ""
-    base_url = "https://api.etherscan.io/api"
-    
-    params = {
-        'module': 'account',
-        'action': 'txlist',
-        'address': wallet_address,
-        'startblock': start_block,
-        'endblock': 99999999,
-        'sort': 'desc',
-        'apikey': ETHERSCAN_API_KEY
+
+    def get_transaction_details(self, tx_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """Get the internal transactions of a transaction."""
+        return self._get({
+            "module": "account",
+            "action": "txlistinternal",
+            "txhash": tx_hash
+        })
+
+    def get_wallet_transactions(self, wallet_address: str, start_block: int,
+                                end_block: int = LAST_BLOCK) -> Optional[List[Dict[str, Any]]]:
+        """Get the normal transactions of a wallet in blocks [start_block, end_block], newest first."""
+        return self._get({
+            'module': 'account',
+            'action': 'txlist',
+            'address': wallet_address,
+            'startblock': start_block,
+            'endblock': end_block,
+            'sort': 'desc'
+        })
+
+    def get_token_transfers(self, wallet_address: str, start_block: int,
+                            end_block: int = LAST_BLOCK) -> Optional[List[Dict[str, Any]]]:
+        """Get the ERC-20 transfers involving a wallet in blocks [start_block, end_block], newest first."""
+        return self._get({
+            'module': 'account',
+            'action': 'tokentx',
+            'address': wallet_address,
+            'startblock': start_block,
+            'endblock': end_block,
+            'sort': 'desc'
+        })
+
+class TokenDecimals:
+    """
+    Symbol and decimals per token contract.
+
+    Etherscan repeats them on every transfer but leaves them empty for some
+    tokens; the first complete sighting is kept and reused for the rest.
+    """
+
+    def __init__(self, default_decimals: int = 18):
+        """
+        Args:
+            default_decimals (int): Decimals assumed for a token never seen with them
+        """
+        self.default_decimals = default_decimals
+        self.tokens: Dict[str, Tuple[str, int]] = {}
+
+    def resolve(self, tx: Dict[str, Any]) -> Tuple[str, int]:
+        """
+        Symbol and decimals of the token moved by a transfer.
+
+        Args:
+            tx (Dict[str, Any]): Token transfer as returned by Etherscan tokentx
+
+        Returns:
+            Tuple[str, int]: Symbol (the contract address when unknown) and decimals
+        """
+        contract = tx['contractAddress'].lower()
+        known = self.tokens.get(contract)
+        if known:
+            return known
+        symbol = tx.get('tokenSymbol') or contract
+        if tx.get('tokenDecimal') in (None, ''):
+            return symbol, self.default_decimals
+        self.tokens[contract] = (symbol, int(tx['tokenDecimal']))
+        return self.tokens[contract]
+
+def get_transaction_method(input_data):
+    return decode_call(input_data)["method"]
+
+def make_record(tx: Dict[str, Any], tx_hash: str, parent_tx: Optional[str], depth: int,
+                calldata_store: Optional[CalldataStore] = None) -> Dict[str, Any]:
+    """
+    Build a trace record from an Etherscan transaction.
+
+    Args:
+        tx (Dict[str, Any]): Transaction as returned by Etherscan
+        tx_hash (str): Hash to record (the parent hash for internal transactions)
+        parent_tx (Optional[str]): Hash of the transaction that funded this one
+        depth (int): Hops from the seed transaction
+        calldata_store (Optional[CalldataStore]): When given, contract calldata is moved
+            there and the record keeps only its selector and a reference
+
+    Returns:
+        Dict[str, Any]: Record in the all_transactions.json format
+    """
+    # Convert timestamp to readable format
+    timestamp = int(tx['timeStamp'])
+    time_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+    input_data = tx.get('input', '0x')
+    call = decode_call(input_data)
+    record = {
+        "tx_hash": tx_hash,
+        "parent_tx": parent_tx,
+        "from": tx['from'],
+        "to": tx['to'],
+        # Exact wei as a decimal string; amount is the rounded display value
+        "value": tx['value'],
+        "decimals": 18,
+        "amount": int(tx['value'])/10**18,
+        "currency": "ETH",
+        "time": time_str,
+        "blockNumber": tx['blockNumber'],
+        "method": call["method"],
+        "input": input_data,
+        "depth": depth
+    }
+    if "args" in call:
+        record["args"] = call["args"]
+    if calldata_store is not None and "selector" in call:
+        record["input"] = call["selector"]
+        record["input_ref"] = calldata_store.put(input_data)
+    return record
+
+def fill_log_indexes(transfers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Give every tokentx row a log index that tells apart the transfers of one transaction.
+
+    Etherscan does not always return `logIndex` for token transfers. Without it
+    a stable index is derived from the transfer itself: token, sender,
+    recipient, value and its ordinal among identical transfers of the
+    transaction. A transfer is listed identically for both of its wallets, so
+    every query derives the same index. Derived indexes are negative and fit
+    in 48 bits, so they never collide with real ones and stay exact in JSON.
+
+    Args:
+        transfers (List[Dict[str, Any]]): Rows as returned by Etherscan tokentx, updated in place
+
+    Returns:
+        List[Dict[str, Any]]: The same rows
+    """
+    ordinals: Dict[Tuple[str, ...], int] = {}
+    for tx in transfers:
+        if tx.get('logIndex') not in (None, ""):
+            continue
+        identity = (tx['hash'].lower(), tx['contractAddress'].lower(), tx['from'].lower(), tx['to'].lower(),
+                    str(int(tx['value'])))
+        ordinal = ordinals.get(identity, 0)
+        ordinals[identity] = ordinal + 1
+        digest = hashlib.blake2b(":".join(identity + (str(ordinal),)).encode(), digest_size=6).digest()
+        tx['logIndex'] = str(-1 - int.from_bytes(digest, "big"))
+    return transfers
+
+def make_token_record(tx: Dict[str, Any], parent_tx: Optional[str], depth: int,
+                      tokens: TokenDecimals) -> Dict[str, Any]:
+    """
+    Build a trace record from an Etherscan ERC-20 transfer.
+
+    The record has the fields of `make_record` plus the token contract and the
+    log index, which tells apart several transfers within one transaction
+    (see `fill_log_indexes` for rows without one).
+
+    Args:
+        tx (Dict[str, Any]): Transfer as returned by Etherscan tokentx
+        parent_tx (Optional[str]): Hash of the transaction that funded this one
+        depth (int): Hops from the seed transaction
+        tokens (TokenDecimals): Decimals cache
+
+    Returns:
+        Dict[str, Any]: Record in the all_transactions.json format
+    """
+    symbol, decimals = tokens.resolve(tx)
+    return {
+        "tx_hash": tx['hash'],
+        "parent_tx": parent_tx,
+        "from": tx['from'],
+        "to": tx['to'],
+        "value": tx['value'],
+        "decimals": decimals,
+        "amount": int(tx['value'])/10**decimals,
+        "currency": symbol,
+        "token": tx['contractAddress'].lower(),
+        "log_index": int(tx['logIndex']),
+        "time": datetime.fromtimestamp(int(tx['timeStamp'])).strftime('%Y-%m-%d %H:%M:%S'),
+        "blockNumber": tx['blockNumber'],
+        "method": "Token Transfer",
+        "depth": depth
     }
-    
-    response = requests.get(base_url, params=params)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if data["status"] == "1" and data["message"] == "OK":
-            return data["result"]
+
+def _record_key(record: Dict[str, Any]) -> str:
+    # One transaction can move ETH and several tokens; each transfer is followed once
+    if "token" in record:
+        return f"{record['tx_hash']}:{record['log_index']}"
+    return record['tx_hash']
+
+def assign_carried(received: Dict[str, Any], spent: List[Dict[str, Any]]) -> None:
+    """
+    Split the seed value carried by a received transfer over the transfers spending it.
+
+    "carried" is the fraction of the seed's value a record moved, so it can
+    be compared and added across currencies. Haircut within one expansion:
+    the wallet starts with the received amount, which carried
+    `received["carried"]`, and every outflow in the same currency takes, in
+    block order, the current tainted share. Spending beyond the received
+    amount is funded by clean money. Amounts in other tokens cannot be
+    compared with the received one; the seed value left after those outflows
+    is taken to have been swapped, split evenly over the other currencies
+    sent and within each by amount. The outflows never carry more than was
+    received.
+
+    Args:
+        received (Dict[str, Any]): Record whose recipient is being expanded
+        spent (List[Dict[str, Any]]): New records sent by that recipient; "carried" is set on each
+    """
+    balance = received["amount"]
+    tainted = received["carried"]
+    swapped: Dict[str, List[Dict[str, Any]]] = {}
+    for record in sorted(spent, key=lambda r: int(r["blockNumber"])):
+        if record["currency"] != received["currency"]:
+            swapped.setdefault(record["currency"], []).append(record)
+            continue
+        balance = max(balance, record["amount"])
+        record["carried"] = tainted * record["amount"] / balance if balance else 0.0
+        balance -= record["amount"]
+        # Rounding must not leave a negative share, which no threshold would follow
+        tainted = max(tainted - record["carried"], 0.0)
+    for records in swapped.values():
+        total = sum(record["amount"] for record in records)
+        for record in records:
+            record["carried"] = tainted / len(swapped) * record["amount"] / total if total else 0.0
+
+def label_record(record: Dict[str, Any], labels: LabelStore, deposits: Optional[Dict[str, str]] = None) -> None:
+    """
+    Add "from_label" / "to_label" ({"category", "name"}) to a record whose wallets are labeled.
+
+    Args:
+        record (Dict[str, Any]): Record to label
+        labels (LabelStore): Address labels
+        deposits (Optional[Dict[str, str]]): Deposit addresses found in this crawl and their exchange
+    """
+    for side in ("from", "to"):
+        label = labels.get(record[side])
+        if not label and deposits and record[side].lower() in deposits:
+            label = {"category": "exchange", "name": f"{deposits[record[side].lower()]} deposit address"}
+        if label:
+            record[f"{side}_label"] = label
+
+def deposit_exchange(spent: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Name of the exchange a wallet swept everything into, if it did.
+
+    A wallet whose outflows all go to one labeled exchange is one of its
+    per-customer deposit addresses: everything it receives ends up there.
+    """
+    names = {record["to_label"]["name"] for record in spent
+             if record.get("to_label", {}).get("category") == "exchange"}
+    if len(names) == 1 and all("to_label" in record for record in spent):
+        return names.pop()
+    return None
+
+class Frontier:
+    """
+    Records whose recipients are waiting to be expanded.
+
+    "bfs" pops records in discovery order; "priority" pops the highest score
+    first, by default the fraction of the seed's value a record carried
+    (comparable across currencies), so the crawl follows the bulk of the
+    funds before dust branches. The total carried fraction waiting in the
+    frontier is kept for early termination.
+    """
+
+    STRATEGIES = ("bfs", "priority")
+
+    def __init__(self, strategy: str = "bfs", score: Optional[Callable[[Dict[str, Any]], float]] = None):
+        """
+        Args:
+            strategy (str): "bfs" or "priority"
+            score (Optional[Callable[[Dict[str, Any]], float]]): Priority of a record, higher first;
+                defaults to its carried fraction of the seed's value
+
+        Raises:
+            ValueError: If the strategy is unknown
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown crawl strategy: {strategy}")
+        self.strategy = strategy
+        self.score = score or (lambda record: record["carried"])
+        self.value = 0.0
+        self._queue: deque = deque()
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._pushed = 0
+
+    def push(self, record: Dict[str, Any]) -> None:
+        self.value += record["carried"]
+        if self.strategy == "bfs":
+            self._queue.append(record)
         else:
-            print(f"Error: {data['message']}")
-            return None
-    else:
-        print(f"Error: HTTP {response.status_code}")
-        return None
+            # The counter breaks ties in discovery order and keeps records out of comparisons
+            heapq.heappush(self._heap, (-self.score(record), self._pushed, record))
+        self._pushed += 1
 
-def get_transaction_method(input_data):
-    if not input_data or input_data == "0x":
-        return "Transfer"
-    # Add more method detection logic here if needed
-    return "Contract Interaction"
-
-# Example usage
-tx_hash = "0xb61413c495fdad6114a7aa863a00b2e3c28945979a10885b12b30316ea9f072c"
-result = get_transaction_details(tx_hash)
-
-transactions = []
-if result:
-    print("TX_hash")
-    print("From")
-    print("To")
-    print("Amount Currency")
-    print("Time")
-    print("Method")
+    def pop(self) -> Dict[str, Any]:
+        record = self._queue.popleft() if self.strategy == "bfs" else heapq.heappop(self._heap)[2]
+        self.value = max(self.value - record["carried"], 0.0)
+        return record
+
+    def __len__(self) -> int:
+        return len(self._queue) + len(self._heap)
+
+def _with_label(record: Dict[str, Any], side: str) -> str:
+    label = record.get(f"{side}_label")
+    return f"{record[side]} ({label['category']}: {label['name']})" if label else record[side]
+
+def print_record(record: Dict[str, Any]) -> None:
+    print(f"{record['tx_hash']}")
+    print(f"{record['blockNumber']}")
+    print(_with_label(record, 'from'))
+    print(_with_label(record, 'to'))
+    print(f"{record['amount']} {record['currency']}")
+    print(f"{record['time']}")
+    print(f"{record['method']}")
     print("---")
-    
+
+def save_transactions(transactions: List[Dict[str, Any]], output_path: str) -> None:
+    with open(output_path, 'w') as f:
+        json.dump(transactions, f, indent=4)
+
+def track(seed_tx_hash: str, client: Optional[EtherscanClient] = None,
+          output_path: Optional[str] = 'all_transactions.json', verbose: bool = True,
+          calldata_store: Optional[CalldataStore] = None, follow_tokens: bool = True,
+          token_filter: Optional[Collection[str]] = None, min_taint: float = 0.0,
+          strategy: str = "bfs", score: Optional[Callable[[Dict[str, Any]], float]] = None,
+          max_calls: Optional[int] = None, stop_below: float = 0.0,
+          labels: Optional[LabelStore] = None,
+          stop_at: Collection[str] = TERMINAL_CATEGORIES,
+          max_hop_blocks: Optional[int] = None, end_block: int = LAST_BLOCK) -> List[Dict[str, Any]]:
+    """
+    Follow funds from a seed transaction, breadth-first or by carried value.
+
+    The seed's internal transfers form depth 0; for each recipient the
+    outgoing ETH transactions and ERC-20 transfers after the receiving block
+    are fetched and followed in the same pass. Every record carries the
+    fraction of the seed's value it moved ("carried", between 0 and 1, see
+    `assign_carried`); records carrying less than `min_taint` are kept but
+    their recipients are not expanded. The crawl ends early once `max_calls`
+    API calls are spent or the fraction carried by the whole frontier drops
+    below `stop_below`.
+    Records are labeled from the label store, and recipients labeled with a
+    category in `stop_at` (exchanges, mixers, bridges, routers) are not
+    expanded: their outflows belong to other users. A wallet found to sweep
+    everything into one exchange is treated as that exchange's deposit
+    address: later transfers to it are labeled and it is not expanded again.
+    `max_hop_blocks` bounds how long after receiving funds a wallet's
+    outflows still count as moving them, and `end_block` bounds the whole
+    investigation; both are passed to Etherscan, so out-of-range history is
+    never downloaded.
+
+    Args:
+        seed_tx_hash (str): Hash of the transaction to start from
+        client (Optional[EtherscanClient]): API client, any object with the same methods works
+        output_path (Optional[str]): File the trace is saved to after every wallet, None to skip saving
+        verbose (bool): Print every record
+        calldata_store (Optional[CalldataStore]): Store for raw calldata, None to keep it inline
+        follow_tokens (bool): Follow ERC-20 transfers as well as ETH
+        token_filter (Optional[Collection[str]]): Token contracts to follow, None for all
+        min_taint (float): Fraction of the seed's value below which a branch is not followed further
+        strategy (str): Frontier order, "bfs" or "priority" (highest score first)
+        score (Optional[Callable[[Dict[str, Any]], float]]): Priority of a record, defaults to its carried fraction
+        max_calls (Optional[int]): API call budget including the seed lookup, None for unlimited
+        stop_below (float): Stop when the frontier carries less than this fraction of the seed's value in total
+        labels (Optional[LabelStore]): Address labels, defaults to the shared store
+        stop_at (Collection[str]): Label categories whose wallets are not expanded, empty to follow all
+        max_hop_blocks (Optional[int]): Blocks after the receiving block in which outflows are followed, None for no limit
+        end_block (int): Last block of the investigation
+
+    Returns:
+        List[Dict[str, Any]]: All collected records in discovery order
+    """
+    client = client or EtherscanClient()
+    labels = labels or get_labels()
+    frontier = Frontier(strategy, score)
+    tokens = TokenDecimals()
+    allowed_tokens = {address.lower() for address in token_filter} if token_filter is not None else None
+    result = client.get_transaction_details(seed_tx_hash)
+
+    transactions = []
+    if not result:
+        return transactions
+
+    if verbose:
+        print("TX_hash")
+        print("From")
+        print("To")
+        print("Amount Currency")
+        print("Time")
+        print("Method")
+        print("---")
+
     for tx in result:
         # Check if amount is greater than 0
-        amount = float(tx['value'])/10**18
-        if amount <= 0:
+        transaction = make_record(tx, seed_tx_hash, None, 0, calldata_store)
+        if int(transaction["value"]) <= 0:
             continue
-            
-        # Convert timestamp to readable format
-        timestamp = int(tx['timeStamp'])
-        time_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Get transaction method
-        method = get_transaction_method(tx.get('input', '0x'))
-        
-        # Create transaction record
-        transaction = {
-            "tx_hash": tx_hash,
-            "parent_tx": None,  # Add parent_tx field as None for initial transactions
-            "from": tx['from'],
-            "to": tx['to'],
-            "amount": amount,
-            "currency": "ETH",
-            "time": time_str,
-            "blockNumber": tx['blockNumber'],
-            "method": method,
-            "input": tx.get('input', '0x'),
-            "depth": 0
-        }
+        label_record(transaction, labels)
         transactions.append(transaction)
-        
-        # Print formatted output
-        print(f"{tx_hash}")
-        print(f"{tx['blockNumber']}")
-        print(f"{tx['from']}")
-        print(f"{tx['to']}")
-        print(f"{amount} ETH")
-        print(f"{time_str}")
-        print(f"{method}")
-        print("---")
-    
+    # The seed's transfers carry its whole value between them
+    seed_value = sum(int(transaction["value"]) for transaction in transactions)
+    for transaction in transactions:
+        transaction["carried"] = int(transaction["value"]) / seed_value
+        if verbose:
+            print_record(transaction)
+
     # Track which transactions have already been processed
-    processed_tx_hashes = set(tx['tx_hash'] for tx in transactions)
+    processed_keys = set(_record_key(tx) for tx in transactions)
 
-    # Use a queue to manage breadth-first exploration of transaction layers
-    queue = transactions[:]
+    def expandable(record: Dict[str, Any]) -> bool:
+        label = record.get("to_label")
+        return record["carried"] >= min_taint and not (label and label["category"] in stop_at)
 
-    while queue:
-        current_tx = queue.pop(0)
+    for tx in transactions:
+        if expandable(tx):
+            frontier.push(tx)
+    calls = 1
+    calls_per_wallet = 2 if follow_tokens else 1
+    # Block ranges each wallet was expanded over; their records are processed already and not fetched again
+    expanded: Dict[str, List[Tuple[int, int]]] = {}
+    # Deposit address -> exchange, found from the wallets' own sweeps
+    deposits: Dict[str, str] = {}
+
+    while frontier:
+        if max_calls is not None and calls + calls_per_wallet > max_calls:
+            if verbose:
+                print(f"\nAPI call budget of {max_calls} spent, {len(frontier)} wallets left unexpanded")
+            break
+        if frontier.value < stop_below:
+            if verbose:
+                print(f"\nFrontier carries {frontier.value:.2%} of the seed's value, below {stop_below:.2%}; stopping")
+            break
+        current_tx = frontier.pop()
         dest_wallet = current_tx['to']
         start_block = int(current_tx['blockNumber'])
+        if dest_wallet.lower() in deposits and "exchange" in stop_at:
+            label_record(current_tx, labels, deposits)
+            continue
+        stop_block = min(end_block, start_block + max_hop_blocks) if max_hop_blocks is not None else end_block
+        if start_block > stop_block:
+            continue
+        ranges = expanded.setdefault(dest_wallet.lower(), [])
+        fetch_from = start_block
+        for first, last in sorted(ranges):
+            if first <= fetch_from <= last:
+                fetch_from = last + 1
+        if fetch_from > stop_block:
+            continue
+        ranges.append((start_block, stop_block))
+        calls += calls_per_wallet
         parent_tx = current_tx['tx_hash']
         next_depth = current_tx["depth"] + 1
 
-        print(f"\nFetching outgoing transactions for wallet {dest_wallet} starting from block {start_block}")
-        print("---")
+        if verbose:
+            print(f"\nFetching outgoing transactions for wallet {dest_wallet} in blocks {fetch_from}-{stop_block}")
+            print("---")
+
+        outgoing = [
+            (wallet_tx, False) for wallet_tx in client.get_wallet_transactions(dest_wallet, fetch_from, stop_block) or ()
+        ]
+        if follow_tokens:
+            outgoing += [
+                (wallet_tx, True)
+                for wallet_tx in fill_log_indexes(client.get_token_transfers(dest_wallet, fetch_from, stop_block) or [])
+                if allowed_tokens is None or wallet_tx['contractAddress'].lower() in allowed_tokens
+            ]
+
+        spent = []
+        for wallet_tx, is_token in outgoing:
+            if wallet_tx['from'].lower() != dest_wallet.lower():
+                continue
+            if is_token:
+                wallet_transaction = make_token_record(wallet_tx, parent_tx, next_depth, tokens)
+            else:
+                wallet_transaction = make_record(wallet_tx, wallet_tx['hash'], parent_tx, next_depth, calldata_store)
+            if "token" in current_tx:
+                # The hash alone does not say which transfer of the parent transaction funded this one
+                wallet_transaction["parent_log_index"] = current_tx["log_index"]
+            key = _record_key(wallet_transaction)
+            if key in processed_keys or int(wallet_transaction["value"]) <= 0:
+                continue
+            processed_keys.add(key)
+            label_record(wallet_transaction, labels, deposits)
+            spent.append(wallet_transaction)
+
+        assign_carried(current_tx, spent)
+        exchange = deposit_exchange(spent)
+        if exchange and not current_tx.get("to_label"):
+            deposits[dest_wallet.lower()] = exchange
+            label_record(current_tx, labels, deposits)
+            if verbose:
+                print(f"{dest_wallet} is a deposit address of {exchange}, not expanding it again")
+        for wallet_transaction in spent:
+            transactions.append(wallet_transaction)
+            if expandable(wallet_transaction):
+                frontier.push(wallet_transaction)
+            if verbose:
+                print_record(wallet_transaction)
+
+        # Save updated transactions to file in real-time, once per wallet
+        if spent and output_path:
+            save_transactions(transactions, output_path)
+
+    return transactions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Follow funds from a seed transaction through Etherscan")
+    parser.add_argument("tx_hash", nargs="?",
+                        default="0xb61413c495fdad6114a7aa863a00b2e3c28945979a10885b12b30316ea9f072c")
+    parser.add_argument("--output", default="all_transactions.json")
+    parser.add_argument("--calldata-store", default=None, metavar="DIR",
+                        help="keep only selectors in the output and store raw calldata in DIR by SHA-256")
+    parser.add_argument("--no-tokens", action="store_true", help="follow ETH only")
+    parser.add_argument("--token", action="append", default=None, metavar="CONTRACT",
+                        help="follow only these ERC-20 contracts (repeatable), default all")
+    parser.add_argument("--min-taint", type=float, default=0.0,
+                        help="do not expand branches carrying less than this fraction (0-1) of the seed's value")
+    parser.add_argument("--strategy", choices=Frontier.STRATEGIES, default="bfs",
+                        help="expand wallets breadth-first or by the seed value they received")
+    parser.add_argument("--max-calls", type=int, default=None, help="Etherscan API call budget")
+    parser.add_argument("--stop-below", type=float, default=0.0,
+                        help="stop once the unexpanded frontier carries less than this fraction (0-1) of the seed's value")
+    parser.add_argument("--labels", action="append", default=[], metavar="FILE",
+                        help="extra CSV/JSON label file (repeatable), on top of labels.csv and LABEL_FILES")
+    parser.add_argument("--follow-labeled", action="store_true",
+                        help="expand exchanges, mixers, bridges and routers too")
+    parser.add_argument("--max-hop-blocks", type=int, default=None,
+                        help="follow a wallet's outflows only up to this many blocks after it received the funds")
+    parser.add_argument("--end-block", type=int, default=LAST_BLOCK, help="ignore transactions after this block")
+    args = parser.parse_args()
+    calldata_store = CalldataStore(args.calldata_store) if args.calldata_store else None
+    labels = get_labels()
+    if args.labels:
+        labels = LabelStore([*labels.paths, *args.labels])
+    track(args.tx_hash, output_path=args.output, calldata_store=calldata_store,
+          follow_tokens=not args.no_tokens, token_filter=args.token, min_taint=args.min_taint,
+          strategy=args.strategy, max_calls=args.max_calls, stop_below=args.stop_below,
+          labels=labels, stop_at=() if args.follow_labeled else TERMINAL_CATEGORIES,
+          max_hop_blocks=args.max_hop_blocks, end_block=args.end_block)
 
-        wallet_txs = get_wallet_transactions(dest_wallet, start_block)
-        if wallet_txs:
-            for wallet_tx in wallet_txs:
-                if wallet_tx['from'].lower() == dest_wallet.lower():
-                    tx_hash = wallet_tx['hash']
-                    if tx_hash in processed_tx_hashes:
-                        continue
-
-                    amount = float(wallet_tx['value'])/10**18
-                    if amount <= 0:
-                        continue
-
-                    timestamp = int(wallet_tx['timeStamp'])
-                    time_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                    method = get_transaction_method(wallet_tx.get('input', '0x'))
-
-                    wallet_transaction = {
-                        "tx_hash": tx_hash,
-                        "parent_tx": parent_tx,
-                        "from": wallet_tx['from'],
-                        "to": wallet_tx['to'],
-                        "amount": amount,
-                        "currency": "ETH",
-                        "time": time_str,
-                        "blockNumber": wallet_tx['blockNumber'],
-                        "method": method,
-                        "input": wallet_tx.get('input', '0x'),
-                        "depth": next_depth
-                    }
-
-                    transactions.append(wallet_transaction)
-                    queue.append(wallet_transaction)
-                    processed_tx_hashes.add(tx_hash)
-
-                    # Save updated transactions to file in real-time
-                    with open('all_transactions.json', 'w') as f:
-                        json.dump(transactions, f, indent=4)
-
-                    print(f"{wallet_tx['hash']}")
-                    print(f"{wallet_tx['blockNumber']}")
-                    print(f"{wallet_tx['from']}")
-                    print(f"{wallet_tx['to']}")
-                    print(f"{amount} ETH")
-                    print(f"{time_str}")
-                    print(f"{method}")
-                    print("---")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+class WorkflowClient:
+    """
+    Persistent push channel from an agent to the workflow system.
+
+    Keeps one aiohttp session and one WebSocket to
+    `/workflow/{workflow_id}/ingest` open for the whole run. Transactions are
+    buffered and sent in batches; every batch waits for the server's
+    acknowledgement before the next one is sent, so the caller knows exactly
+    which transactions were accepted. A batch that could not be delivered is
+    queued again and retried by the next flush, over HTTP once the WebSocket
+    has failed.
+    """
+
+    def __init__(self, workflow_id: str, base_url: Optional[str] = None,
+                 batch_size: int = 200, flush_interval: float = 0.5):
+        """
+        Args:
+            workflow_id (str): Workflow the transactions belong to
+            base_url (Optional[str]): Workflow system URL, defaults to WORKFLOW_URL or http://localhost:8000
+            batch_size (int): Number of buffered transactions that triggers a flush
+            flush_interval (float): Seconds after which a partial batch is flushed
+        """
+        self.workflow_id = workflow_id
+        self.base_url = (base_url or os.getenv("WORKFLOW_URL", "http://localhost:8000")).rstrip("/")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.acks: List[Dict[str, Any]] = []
+        self._pending: List[Dict[str, Any]] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = asyncio.Event()
+
+    async def connect(self) -> None:
+        """Open the session and the ingest WebSocket."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        ws_url = self.base_url.replace("http", "ws", 1) + f"/workflow/{self.workflow_id}/ingest"
+        self._ws = await self._session.ws_connect(ws_url, heartbeat=30)
+        self._closing.clear()
+        self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        """Flush remaining transactions and close the connection."""
+        if self._flusher:
+            # Not cancelled: a flush it is running must get its acknowledgement before the
+            # remaining transactions are sent, or the batch would be lost with an unread ack
+            self._closing.set()
+            await self._flusher
+            self._flusher = None
+        await self.flush()
+        if self._ws:
+            await self._ws.close()
+            self._ws = None
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "WorkflowClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def send(self, transaction: Dict[str, Any]) -> None:
+        """
+        Queue a transaction, flushing when the batch is full.
+
+        Args:
+            transaction (Dict[str, Any]): Transaction in the workflow system's TransactionInput shape
+        """
+        self._pending.append(transaction)
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> Optional[Dict[str, Any]]:
+        """
+        Send all queued transactions as one batch and wait for the acknowledgement.
+
+        Returns:
+            Optional[Dict[str, Any]]: The server acknowledgement, None if nothing was queued
+
+        Raises:
+            aiohttp.ClientError: If the batch could not be delivered; it stays queued
+            RuntimeError: If the acknowledgement belongs to another batch; the batch stays queued
+            ValueError: If the server rejected the batch as invalid; it is dropped
+        """
+        async with self._lock:
+            if not self._pending:
+                return None
+            batch, self._pending = self._pending, []
+            batch_id = uuid.uuid4().hex
+            message = json.dumps({"batch_id": batch_id, "transactions": batch})
+
+            try:
+                ack = await self._send(message)
+            except BaseException as e:
+                # Invalid batches would fail again; anything else, cancellation included, is
+                # retried ahead of newer transactions. An interrupted exchange may leave an
+                # acknowledgement unread, so the socket is not reused
+                if not (isinstance(e, aiohttp.ClientResponseError) and e.status < 500):
+                    self._pending[:0] = batch
+                await self._drop_websocket()
+                raise
+
+            if ack.get("error"):
+                raise ValueError(f"Batch {batch_id} rejected: {ack['error']}")
+            if ack.get("batch_id") != batch_id:
+                # Acknowledgements no longer match their batches, so the socket cannot be trusted
+                self._pending[:0] = batch
+                await self._drop_websocket()
+                raise RuntimeError(f"Unexpected acknowledgement for batch {batch_id}: {ack}")
+            self.acks.append(ack)
+            return ack
+
+    async def _send(self, message: str) -> Dict[str, Any]:
+        """Send one batch message and return the acknowledgement."""
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.send_str(message)
+            return await self._ws.receive_json()
+        # Fall back to the batch HTTP endpoint on the same pooled session
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        async with self._session.post(
+            f"{self.base_url}/workflow/{self.workflow_id}/add_transactions",
+            data=message,
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _drop_websocket(self) -> None:
+        """Close the WebSocket after a failure; later batches use the HTTP endpoint."""
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            with contextlib.suppress(Exception):
+                await ws.close()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            # Sleeps until the next flush, or returns as soon as close() asks it to stop
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._closing.wait(), self.flush_interval)
+            if self._closing.is_set():
+                return
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Periodic flush to workflow %s failed", self.workflow_id)
+
+
+def to_transaction_input(tx: Dict[str, Any], blockchain: str = "ethereum") -> Dict[str, Any]:
+    """
+    Convert a tracker transaction record into the workflow system's TransactionInput shape.
+
+    Args:
+        tx (Dict[str, Any]): Record as written by wallet_tracker3.py
+        blockchain (str): Blockchain identifier for both wallets
+
+    Returns:
+        Dict[str, Any]: Transaction payload for the ingest channel
+    """
+    return {
+        "from_blockchain": blockchain,
+        "from_wallet": tx["from"],
+        "to_blockchain": blockchain,
+        "to_wallet": tx["to"],
+        "hash": tx["tx_hash"],
+        "sum": tx["amount"],
+        "ticker_token": tx["currency"],
+        "date": tx["time"],
+        "prev_hash": tx.get("parent_tx"),
+        "log_index": tx.get("log_index"),
+        "prev_log_index": tx.get("parent_log_index"),
+        # Traces written before exact amounts were recorded only have the float amount
+        "value": tx.get("value"),
+        "decimals": tx.get("decimals", 18),
+        "block_number": int(tx["blockNumber"]) if tx.get("blockNumber") else None,
+        "from_label": tx.get("from_label"),
+        "to_label": tx.get("to_label")
+    }
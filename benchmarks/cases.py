@@ -0,0 +1,97 @@
+"""
+Benchmark cases. Each case takes a trace, prepares its inputs and returns the
+number of items it processed, the seconds spent on the measured work (setup
+excluded) and one latency sample (seconds) per measured operation.
+"""
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from traces import MockEtherscan, seeds
+
+Result = Tuple[int, float, List[float]]
+
+def _transaction_inputs(trace: List[Dict[str, Any]]) -> list:
+    from src.models import TransactionInput
+    from workflow_client import to_transaction_input
+    return [TransactionInput(**to_transaction_input(tx)) for tx in trace]
+
+def _ingest(trace: List[Dict[str, Any]], store: str) -> Result:
+    from src.workflow import Workflow
+    transactions = _transaction_inputs(trace)
+    workflow = Workflow("benchmark", "Benchmark", graph_store=store)
+    latencies = []
+    clock = time.perf_counter
+    started = clock()
+    for transaction in transactions:
+        began = clock()
+        workflow.add_transaction(transaction)
+        latencies.append(clock() - began)
+    return len(transactions), clock() - started, latencies
+
+def ingest_records(trace: List[Dict[str, Any]]) -> Result:
+    """Workflow.add_transaction one transaction at a time into the record store."""
+    return _ingest(trace, "records")
+
+def ingest_columnar(trace: List[Dict[str, Any]]) -> Result:
+    """Workflow.add_transaction one transaction at a time into the columnar store."""
+    return _ingest(trace, "columnar")
+
+def batch_sse(trace: List[Dict[str, Any]], batch_size: int = 500) -> Result:
+    """Batches through WorkflowManager.add_transactions, each followed by an SSE buffer drain."""
+    from src.models import TransactionBatchInput
+    from src.workflow import Workflow
+    from src.workflow_manager import WorkflowManager
+    transactions = _transaction_inputs(trace)
+    manager = WorkflowManager()
+    workflow = Workflow("benchmark", "Benchmark")
+    manager.add_workflow(workflow)
+    batches = [
+        TransactionBatchInput(transactions=transactions[start:start + batch_size])
+        for start in range(0, len(transactions), batch_size)
+    ]
+    latencies = []
+    started = time.perf_counter()
+    for batch in batches:
+        began = time.perf_counter()
+        manager.add_transactions("benchmark", batch)
+        json.dumps(workflow.get_buffer())
+        latencies.append(time.perf_counter() - began)
+    return len(transactions), time.perf_counter() - started, latencies
+
+def visualize_stats(trace: List[Dict[str, Any]]) -> Result:
+    """visualize_flow graph construction and statistics, without drawing."""
+    from visualize_flow import build_graph, compute_statistics
+    began = time.perf_counter()
+    compute_statistics(build_graph(trace), trace)
+    elapsed = time.perf_counter() - began
+    return len(trace), elapsed, [elapsed]
+
+def tracker(trace: List[Dict[str, Any]]) -> Result:
+    """wallet_tracker3.track against an in-memory Etherscan; latency per wallet expansion."""
+    from wallet_tracker3 import track
+    client = MockEtherscan(trace)
+    calls = []
+    for method in ("get_transaction_details", "get_wallet_transactions", "get_token_transfers"):
+        call = getattr(client, method)
+
+        def stamped(*args, call=call):
+            calls.append(time.perf_counter())
+            return call(*args)
+        setattr(client, method, stamped)
+
+    records = 0
+    started = time.perf_counter()
+    for seed in seeds(trace):
+        records += len(track(seed, client=client, output_path=None, verbose=False))
+    calls.append(time.perf_counter())
+    # Time from one API call to the next covers the call and processing its result
+    return records, calls[-1] - started, [end - start for start, end in zip(calls, calls[1:])]
+
+CASES: Dict[str, Callable[[List[Dict[str, Any]]], Result]] = {
+    "ingest_records": ingest_records,
+    "ingest_columnar": ingest_columnar,
+    "batch_sse": batch_sse,
+    "visualize_stats": visualize_stats,
+    "tracker": tracker
+}
@@ -0,0 +1,168 @@
+"""
+Benchmark suite for ingestion, streaming, statistics and crawling.
+
+Every case runs in a fresh subprocess so its peak memory is measured in
+isolation. Traces are the recorded ai_agents/all_transactions.json tiled up
+to each requested size, or synthetic traces from ai_agents/trace_generator.py
+with heavy-tailed fan-out, hot wallets and cycles (--trace synthetic). Results (throughput, p50/p99 latency, peak memory)
+are appended to benchmarks/results.jsonl together with the git revision, so
+runs on different commits can be compared.
+
+Usage:
+    python benchmarks/run.py [--sizes 10000,100000] [--cases ingest_records,tracker] [--trace synthetic]
+    python benchmarks/run.py --compare <rev>   # compare the last run with an earlier revision
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+RESULTS_PATH = BENCH_DIR / "results.jsonl"
+
+def _setup_paths() -> None:
+    sys.path[:0] = [str(BENCH_DIR), str(ROOT / "workflow_system"), str(ROOT / "ai_agents")]
+    # The workflow settings require a MongoDB URI; benchmarks never connect to it
+    os.environ.setdefault("URI", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "benchmark")
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+def run_case(name: str, size: int, trace_kind: str = "recorded") -> Dict[str, Any]:
+    """
+    Run one case in the current process.
+
+    Args:
+        name (str): Case name from cases.CASES
+        size (int): Number of trace records
+        trace_kind (str): "recorded" (tiled capture) or "synthetic"
+
+    Returns:
+        Dict[str, Any]: Throughput, latency percentiles and memory of the run
+    """
+    _setup_paths()
+    from loguru import logger
+    logger.remove()
+    from cases import CASES
+    from traces import load_trace, scale_trace, synthetic_trace
+
+    trace = synthetic_trace(size) if trace_kind == "synthetic" else scale_trace(load_trace(), size)
+    baseline = _peak_rss_mb()
+    items, elapsed, latencies = CASES[name](trace)
+    latencies.sort()
+    return {
+        "case": name,
+        "trace": trace_kind,
+        "size": size,
+        "items": items,
+        "seconds": round(elapsed, 4),
+        "throughput": round(items / elapsed, 1) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 4),
+        # Peak memory over the trace fixture, including the case's prepared inputs
+        "peak_mb": round(_peak_rss_mb() - baseline, 1)
+    }
+
+def _git_revision() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return {"rev": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+def _load_results() -> List[Dict[str, Any]]:
+    if not RESULTS_PATH.exists():
+        return []
+    with open(RESULTS_PATH) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def compare(baseline_rev: str, results: Optional[List[Dict[str, Any]]] = None) -> None:
+    """
+    Print the change of each case and size against the latest results of another revision.
+
+    Args:
+        baseline_rev (str): Revision to compare with
+        results (Optional[List[Dict[str, Any]]]): Results to compare, defaults to the last run on record
+    """
+    history = _load_results()
+    if results is None:
+        last_run = history[-1]["run"] if history else None
+        results = [r for r in history if r["run"] == last_run]
+    current_runs = {r["run"] for r in results}
+    baseline = {
+        (r["case"], r.get("trace", "recorded"), r["size"]): r for r in history
+        if r["rev"].startswith(baseline_rev) and r["run"] not in current_runs
+    }
+    print(f"\n{'case':<18}{'size':>9}{'throughput':>14}{'p99':>14}{'peak':>14}   vs {baseline_rev}")
+    for result in results:
+        before = baseline.get((result["case"], result["trace"], result["size"]))
+        if not before:
+            continue
+        def change(key: str) -> str:
+            if not before[key]:
+                return "n/a"
+            return f"{(result[key] - before[key]) / before[key] * 100:+.1f}%"
+        print(f"{result['case']:<18}{result['size']:>9}{change('throughput'):>14}{change('p99_ms'):>14}{change('peak_mb'):>14}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated trace sizes (records)")
+    parser.add_argument("--cases", default=None, help="comma-separated case names, default all")
+    parser.add_argument("--trace", choices=["recorded", "synthetic"], default="recorded")
+    parser.add_argument("--compare", default=None, metavar="REV", help="compare results with an earlier revision")
+    parser.add_argument("--no-save", action="store_true", help="do not append results to results.jsonl")
+    parser.add_argument("--single", nargs=2, metavar=("CASE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_case(args.single[0], int(args.single[1]), args.trace)))
+        return
+
+    _setup_paths()
+    from cases import CASES
+    names = args.cases.split(",") if args.cases else list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    revision = _git_revision()
+    run_id = datetime.now(UTC).isoformat(timespec="seconds")
+    results = []
+    print(f"{'case':<18}{'size':>9}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for name in names:
+            process = subprocess.run(
+                [sys.executable, __file__, "--single", name, str(size), "--trace", args.trace],
+                capture_output=True, text=True
+            )
+            if process.returncode != 0:
+                print(f"{name:<18}{size:>9}  failed:\n{process.stderr}")
+                continue
+            result = {**json.loads(process.stdout.strip().splitlines()[-1]), **revision,
+                      "run": run_id, "python": platform.python_version()}
+            results.append(result)
+            print(f"{name:<18}{size:>9}{result['throughput']:>12,.0f}{result['p50_ms']:>10.3f}"
+                  f"{result['p99_ms']:>10.3f}{result['peak_mb']:>10.1f}")
+
+    if not args.no_save:
+        with open(RESULTS_PATH, "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    if args.compare:
+        compare(args.compare, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Trace fixtures for the benchmarks: the recorded trace, scaled copies of it,
+synthetic traces and an in-memory Etherscan replaying a trace for the tracker.
+"""
+import json
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+TRACE_PATH = ROOT / "ai_agents" / "all_transactions.json"
+
+def load_trace(path: Path = TRACE_PATH) -> List[Dict[str, Any]]:
+    """Load a trace in the all_transactions.json format."""
+    with open(path) as f:
+        return json.load(f)
+
+def scale_trace(base: List[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    """
+    Build a trace of `size` records by tiling relabeled copies of a base trace.
+
+    Every copy gets its own wallets and hashes, so copies form independent
+    graphs with the shape of the original; parents always precede children.
+
+    Args:
+        base (List[Dict[str, Any]]): Trace to copy
+        size (int): Number of records wanted
+
+    Returns:
+        List[Dict[str, Any]]: The scaled trace
+    """
+    if size <= len(base):
+        return base[:size]
+    trace = []
+    copy = 0
+    while len(trace) < size:
+        suffix = f"_{copy}" if copy else ""
+        for tx in base[:size - len(trace)]:
+            trace.append({
+                **tx,
+                "tx_hash": tx["tx_hash"] + suffix,
+                "parent_tx": tx["parent_tx"] + suffix if tx["parent_tx"] else None,
+                "from": tx["from"] + suffix,
+                "to": tx["to"] + suffix
+            })
+        copy += 1
+    return trace
+
+def synthetic_trace(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate a reproducible synthetic trace with heavy-tailed fan-out, hot wallets and cycles.
+
+    Args:
+        size (int): Number of records
+        seed (int): Random seed
+
+    Returns:
+        List[Dict[str, Any]]: The generated trace
+    """
+    from trace_generator import TraceGenerator
+    generator = TraceGenerator(fanout="lognormal:0.5,1.2", hot_wallets=20, cycle_prob=0.02, seed=seed)
+    return list(generator.generate(size))
+
+def seeds(trace: List[Dict[str, Any]]) -> List[str]:
+    """Hashes of the seed transactions of a trace, in order."""
+    return list(dict.fromkeys(tx["tx_hash"] for tx in trace if tx["depth"] == 0))
+
+def _to_etherscan(tx: Dict[str, Any]) -> Dict[str, Any]:
+    timestamp = datetime.strptime(tx["time"], "%Y-%m-%d %H:%M:%S").timestamp()
+    response = {
+        "hash": tx["tx_hash"],
+        "from": tx["from"],
+        "to": tx["to"],
+        "value": tx["value"] if "value" in tx else str(int(round(tx["amount"] * 10**18))),
+        "timeStamp": str(int(timestamp)),
+        "blockNumber": tx["blockNumber"]
+    }
+    if "token" in tx:
+        # Token records are replayed as tokentx rows with 18 decimals
+        return {**response, "contractAddress": tx["token"], "tokenSymbol": tx["currency"],
+                "tokenDecimal": "18", "logIndex": str(tx["log_index"])}
+    return {**response, "input": tx.get("input", "0x")}
+
+class MockEtherscan:
+    """
+    In-memory stand-in for `wallet_tracker3.EtherscanClient` answering from a trace.
+
+    Optionally sleeps per call to model API latency.
+    """
+
+    def __init__(self, trace: List[Dict[str, Any]], latency: float = 0.0):
+        """
+        Args:
+            trace (List[Dict[str, Any]]): Trace to serve
+            latency (float): Seconds to sleep per API call
+        """
+        self.latency = latency
+        self.calls = 0
+        self._internal: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._outgoing: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._token_outgoing: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for tx in trace:
+            if tx["depth"] == 0:
+                self._internal[tx["tx_hash"]].append(_to_etherscan(tx))
+            elif "token" in tx:
+                self._token_outgoing[tx["from"].lower()].append(_to_etherscan(tx))
+            else:
+                self._outgoing[tx["from"].lower()].append(_to_etherscan(tx))
+        for outgoing in (self._outgoing, self._token_outgoing):
+            for txs in outgoing.values():
+                txs.sort(key=lambda tx: int(tx["blockNumber"]), reverse=True)
+        # Negated block numbers ascend along the newest-first lists, so block ranges are found by bisection
+        self._blocks = {wallet: [-int(tx["blockNumber"]) for tx in txs] for wallet, txs in self._outgoing.items()}
+        self._token_blocks = {
+            wallet: [-int(tx["blockNumber"]) for tx in txs] for wallet, txs in self._token_outgoing.items()
+        }
+
+    def _call(self) -> None:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_transaction_details(self, tx_hash: str) -> Optional[List[Dict[str, Any]]]:
+        self._call()
+        return self._internal.get(tx_hash)
+
+    def _in_blocks(self, outgoing: Dict[str, List[Dict[str, Any]]], blocks: Dict[str, List[int]],
+                   wallet_address: str, start_block: int, end_block: int) -> Optional[List[Dict[str, Any]]]:
+        self._call()
+        wallet = wallet_address.lower()
+        wallet_blocks = blocks.get(wallet, [])
+        txs = outgoing.get(wallet, [])[bisect_left(wallet_blocks, -end_block):bisect_right(wallet_blocks, -start_block)]
+        return txs or None
+
+    def get_wallet_transactions(self, wallet_address: str, start_block: int,
+                                end_block: int = 99999999) -> Optional[List[Dict[str, Any]]]:
+        return self._in_blocks(self._outgoing, self._blocks, wallet_address, start_block, end_block)
+
+    def get_token_transfers(self, wallet_address: str, start_block: int,
+                            end_block: int = 99999999) -> Optional[List[Dict[str, Any]]]:
+        return self._in_blocks(self._token_outgoing, self._token_blocks, wallet_address, start_block, end_block)
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Define the root directory (path to workflow-system folder)
@@ -17,6 +18,50 @@ class WorkflowConfig(BaseSettings):
     HOST: str = "localhost"
     PORT: int = 8000
     MAX_DURATION: int = 3600  # 1 hour in seconds
+    IDLE_TIMEOUT: int = 900  # cancel running workflows without activity for 15 minutes
+    RETENTION: int = 600  # keep finished workflows for 10 minutes before eviction
+    MEMORY_BUDGET_MB: int = 1024  # estimated graph memory allowed across all workflows
+    REAPER_INTERVAL: int = 30  # seconds between reaper runs
+    # "records" (default) or "columnar". Columnar ingests about 30% slower and holds no less memory,
+    # but computes /stats about 20x faster; it only pays off when whole-graph statistics are read
+    # many times per ingest (see the README)
+    GRAPH_STORE: str = "records"
+    TAINT_POLICY: str = "haircut"  # "haircut", "fifo" or "poison"
+    THREADED_BATCH_SIZE: int = 500  # batches at least this large are ingested on a worker thread
+    LOG_SUMMARY_EVERY: int = 1000  # transactions per aggregated activity log entry
+    ADMIN_TOKEN: Optional[str] = None  # enables /admin endpoints and request tracing when set
+    PROFILE_MAX_SECONDS: int = 60  # longest profile /admin/profile may capture
+
+class DetectorConfig(BaseSettings):
+    ENABLED: bool = True  # run the laundering pattern detectors on ingested transactions
+    WINDOW_BLOCKS: int = 7200  # sliding window of the structuring and fan detectors (about a day)
+    PEEL_MIN_LENGTH: int = 4  # hops before a peel chain is reported
+    PEEL_MIN_SHARE: float = 0.5  # a peel hop forwards at least this share of what it received...
+    PEEL_MAX_SHARE: float = 0.99  # ...and peels off at least 1%, so plain forwarding does not count
+    STRUCTURING_THRESHOLDS: Dict[str, float] = {"ETH": 10.0, "USDT": 10000.0, "USDC": 10000.0, "DAI": 10000.0}
+    STRUCTURING_BAND: float = 0.1  # amounts within 10% below a threshold are near-threshold
+    STRUCTURING_MIN_COUNT: int = 5  # near-threshold transfers from one wallet within the window
+    FAN_MIN_DEGREE: int = 20  # distinct counterparties within the window for fan-out / fan-in
+    CYCLE_MAX_LENGTH: int = 6  # longest round trip looked for along the funds' path
+
+class ScreeningConfig(BaseSettings):
+    ENABLED: bool = True
+    LISTS: List[str] = []  # watchlist files (relative to workflow_system/), e.g. '["lists/sdn.csv"]'
+    INDEX_PATH: str = "screening.idx"  # compiled index, rebuilt when a list is newer
+    FALSE_POSITIVE_RATE: float = 0.001  # Bloom filter rate; positives are always confirmed exactly
+
+class EntityClusteringConfig(BaseSettings):
+    ENABLED: bool = True  # group wallets of the same entity (deposit address and gas funding heuristics)
+    GAS_TOPUP_MAX: float = 0.05  # largest native transfer counted as a gas top-up
+    NATIVE_TOKEN: str = "ETH"
+
+class ClusterConfig(BaseSettings):
+    ENABLED: bool = False  # partition workflows across several worker processes
+    WORKER_ID: str = "worker-0"
+    WORKER_URL: str = "http://localhost:8000"  # address other workers use to reach this one
+    VIRTUAL_NODES: int = 64  # points per worker on the consistent hash ring
+    HEARTBEAT_INTERVAL: int = 5  # seconds
+    WORKER_TTL: int = 15  # seconds without heartbeat before a worker is considered dead
 
 class AIAgentConfig(BaseSettings):
     HOST: str = "localhost"
@@ -45,7 +90,11 @@ class Configs(BaseSettings):
     # Nested configurations
     FRONTEND: FrontendConfig = FrontendConfig()
     WORKFLOW: WorkflowConfig = WorkflowConfig()
+    DETECTORS: DetectorConfig = DetectorConfig()
+    SCREENING: ScreeningConfig = ScreeningConfig()
+    ENTITY_CLUSTERING: EntityClusteringConfig = EntityClusteringConfig()
     AI_AGENT: AIAgentConfig = AIAgentConfig()
+    CLUSTER: ClusterConfig = ClusterConfig()
     MONGODB: MongoDBConfig = MongoDBConfig()
     
     model_config = SettingsConfigDict(
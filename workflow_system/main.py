@@ -1,15 +1,31 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from sse_starlette.sse import EventSourceResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 import uuid
 import asyncio
-from typing import Dict
+from typing import Dict, Optional
 import json
-from src.models import TransactionInput, WorkflowStatus, InitNodeInput
+import sys
+import time
+import secrets
+from loguru import logger
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from src.models import TransactionInput, TransactionBatchInput, WorkflowStatus, InitNodeInput, PatternKind
 from src.workflow_manager import WorkflowManager
 from src.workflow import Workflow
 from src.database import db, setup_transaction_watcher
+from src.http_client import http_client
+from src.cluster import registry, FORWARDED_HEADER
+from src.screening import get_screening
+from src.snapshot import negotiate_encoding
+from src.metrics import register_workflow_gauges, SSE_SEND_SECONDS, SSE_STREAMS
+from src.profiler import SamplingProfiler, ProfilerBusyError, start_request_trace, server_timing
+from config import CONFIGS
+
+# Drop records below LOG_LEVEL before they are formatted; per-item ingest logs are DEBUG
+logger.remove()
+logger.add(sys.stderr, level=CONFIGS.LOG_LEVEL)
 
 app = FastAPI()
 
@@ -24,6 +40,7 @@ app.add_middleware(
 
 # Initialize workflow manager
 workflow_manager = WorkflowManager()
+register_workflow_gauges(workflow_manager)
 
 # In-memory storage for workflow states
 workflows: Dict[str, Dict] = {}
@@ -32,11 +49,50 @@ class WorkflowUpdate(BaseModel):
     status: str
     message: str
 
+def _is_admin(request: Request) -> bool:
+    token = CONFIGS.WORKFLOW.ADMIN_TOKEN
+    return bool(token) and secrets.compare_digest(request.headers.get("x-admin-token", ""), token)
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """
+    Report timing spans of a request in a Server-Timing header.
+    
+    Only for requests sending X-Trace-Spans with a valid X-Admin-Token;
+    all other requests skip span collection entirely.
+    """
+    if "x-trace-spans" not in request.headers or not _is_admin(request):
+        return await call_next(request)
+    spans = start_request_trace()
+    response = await call_next(request)
+    response.headers["Server-Timing"] = server_timing(spans)
+    return response
+
+@app.middleware("http")
+async def route_to_owner(request: Request, call_next):
+    """
+    Forward requests for a workflow owned by another worker to that worker.
+    
+    Only active in cluster mode. Requests already forwarded by a worker are
+    always handled locally, so routing can never loop.
+    """
+    parts = request.url.path.strip("/").split("/")
+    if (CONFIGS.CLUSTER.ENABLED and len(parts) >= 3 and parts[0] == "workflow"
+            and FORWARDED_HEADER not in request.headers
+            and not workflow_manager.get_workflow(parts[1])):
+        base_url = await registry.remote_url(parts[1])
+        if base_url:
+            return await registry.proxy_request(request, base_url)
+    return await call_next(request)
+
 @app.on_event("startup")
 async def startup_event():
     """
     Initialize connections and services on application startup.
     """
+    # Open the shared HTTP session used for calls to the AI agent system
+    await http_client.connect()
+    
     # Connect to MongoDB
     connected = await db.connect()
     if not connected:
@@ -46,14 +102,32 @@ async def startup_event():
     watcher_setup = await setup_transaction_watcher(workflow_manager)
     if not watcher_setup:
         raise Exception("Failed to set up transaction watcher")
+    
+    # Open (and if needed build) the sanctions index now: a broken list must stop startup, not disable screening
+    await asyncio.to_thread(get_screening)
+    
+    # Start enforcing workflow duration, idle and memory limits
+    workflow_manager.start_reaper()
+    
+    # Join the cluster so requests can be routed between workers
+    if CONFIGS.CLUSTER.ENABLED:
+        await registry.start(lambda: [w.workflow_id for w in workflow_manager.get_all_workflows()])
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """
     Clean up connections and resources on application shutdown.
     """
+    await workflow_manager.stop_reaper()
+    
+    if CONFIGS.CLUSTER.ENABLED:
+        await registry.stop()
+    
     # Disconnect from MongoDB
     await db.disconnect()
+    
+    # Close pooled HTTP connections
+    await http_client.disconnect()
 
 @app.post("/workflow/start")
 async def start_workflow(request: Request):
@@ -74,11 +148,22 @@ async def start_workflow(request: Request):
         data = await request.json()
         workflow_id = str(uuid.uuid4()) if not data.get("workflow_id", None) else data.get("workflow_id")
         
+        # In cluster mode the workflow is created on the worker the hash ring assigns it to
+        if CONFIGS.CLUSTER.ENABLED:
+            owner = registry.assign(workflow_id)
+            if owner != registry.worker_id and FORWARDED_HEADER not in request.headers:
+                body = json.dumps({**data, "workflow_id": workflow_id}).encode()
+                return await registry.proxy_request(request, registry.url_of(owner), body=body)
+            if not await registry.claim(workflow_id):
+                raise HTTPException(status_code=409, detail="Workflow is owned by another worker")
+        
         # Create new workflow
         workflow = Workflow(
             workflow_id=workflow_id,
             name=data.get("name", "Unnamed Workflow"),
             parameters=data.get("parameters", {}),
+            graph_store=data.get("graph_store"),
+            taint_policy=data.get("taint_policy"),
         )
         
         # Add workflow to manager
@@ -152,6 +237,306 @@ async def add_transaction(workflow_id: str, transaction: TransactionInput):
         raise HTTPException(status_code=404, detail="Workflow not found or transaction addition failed")
     return result
 
+@app.post("/workflow/{workflow_id}/add_transactions")
+async def add_transactions(workflow_id: str, batch: TransactionBatchInput):
+    """
+    Add a batch of transactions to a workflow.
+    
+    Args:
+        workflow_id (str): ID of the workflow to add the transactions to
+        batch (TransactionBatchInput): Batch of transaction data to add
+        
+    Returns:
+        Dict: Acknowledgement with the batch ID, accepted count and rejected entries
+        
+    Raises:
+        HTTPException: If workflow not found
+    """
+    ack = await workflow_manager.add_transactions_async(workflow_id, batch)
+    if ack is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return ack
+
+@app.websocket("/workflow/{workflow_id}/ingest")
+async def ingest_transactions(websocket: WebSocket, workflow_id: str):
+    """
+    Stream transaction batches into a workflow over a persistent WebSocket.
+    
+    Each message is a JSON TransactionBatchInput; every batch is answered with
+    an acknowledgement carrying its batch ID, accepted count and rejected entries.
+    """
+    await websocket.accept()
+    if not workflow_manager.get_workflow(workflow_id) and CONFIGS.CLUSTER.ENABLED \
+            and FORWARDED_HEADER not in websocket.headers:
+        base_url = await registry.remote_url(workflow_id)
+        if base_url:
+            await registry.proxy_websocket(websocket, workflow_id, base_url)
+            return
+    if not workflow_manager.get_workflow(workflow_id):
+        await websocket.close(code=4404, reason="Workflow not found")
+        return
+    
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                batch = TransactionBatchInput.model_validate_json(message)
+            except ValidationError as e:
+                await websocket.send_json({"batch_id": None, "error": str(e)})
+                continue
+            
+            ack = await workflow_manager.add_transactions_async(workflow_id, batch)
+            if ack is None:
+                await websocket.close(code=4404, reason="Workflow not found")
+                return
+            await websocket.send_json(ack)
+    except WebSocketDisconnect:
+        pass
+
+@app.get("/workflow/{workflow_id}/stats")
+async def workflow_stats(workflow_id: str):
+    """
+    Get whole-graph statistics of a workflow.
+    
+    Args:
+        workflow_id (str): ID of the workflow
+        
+    Returns:
+        Dict: Total flow per token, node/edge counts, max degrees, depth distribution and time range
+        
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = workflow_manager.get_workflow(workflow_id)
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    with workflow.lock:
+        return workflow.graph_stats()
+
+def _get_workflow_or_404(workflow_id: str) -> Workflow:
+    workflow = workflow_manager.get_workflow(workflow_id)
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return workflow
+
+def _get_transaction_edge_or_404(workflow: Workflow, tx_hash: str) -> int:
+    edge_id = workflow.get_transaction_edge_id(tx_hash)
+    if edge_id is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return edge_id
+
+@app.get("/workflow/{workflow_id}/transactions/{tx_hash}/descendants")
+async def transaction_descendants(workflow_id: str, tx_hash: str, max_depth: Optional[int] = None, limit: int = 1000):
+    """
+    Get the transactions that spent funds descending from a transaction.
+    
+    Args:
+        workflow_id (str): ID of the workflow
+        tx_hash (str): Hash of the transaction to start from
+        max_depth (Optional[int]): Maximum number of hops below the transaction
+        limit (int): Maximum number of transactions returned
+        
+    Returns:
+        Dict: Descendant edges in breadth-first order
+        
+    Raises:
+        HTTPException: If workflow or transaction not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    edge_id = _get_transaction_edge_or_404(workflow, tx_hash)
+    with workflow.lock:
+        edges = workflow.index.descendants(edge_id, max_depth=max_depth, limit=limit)
+    return {"tx_hash": tx_hash, "edges": [edge.to_dict() for edge in edges]}
+
+@app.get("/workflow/{workflow_id}/transactions/{tx_hash}/ancestors")
+async def transaction_ancestors(workflow_id: str, tx_hash: str):
+    """
+    Get the chain of transactions that funded a transaction, nearest first.
+    
+    Raises:
+        HTTPException: If workflow or transaction not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    edge_id = _get_transaction_edge_or_404(workflow, tx_hash)
+    with workflow.lock:
+        edges = workflow.index.ancestors(edge_id)
+    return {"tx_hash": tx_hash, "edges": [edge.to_dict() for edge in edges]}
+
+@app.get("/workflow/{workflow_id}/paths")
+async def wallet_paths(workflow_id: str, from_wallet: str, to_wallet: str, max_depth: int = 6, max_paths: int = 10):
+    """
+    Find transaction paths from one wallet to another.
+    
+    Args:
+        workflow_id (str): ID of the workflow
+        from_wallet (str): Source wallet address
+        to_wallet (str): Target wallet address
+        max_depth (int): Maximum number of transactions per path
+        max_paths (int): Maximum number of paths returned
+        
+    Returns:
+        Dict: Paths as lists of edges from source to target
+        
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    with workflow.lock:
+        paths = workflow.index.paths(from_wallet, to_wallet, max_depth=max_depth, max_paths=max_paths)
+    return {"paths": [[edge.to_dict() for edge in path] for path in paths]}
+
+@app.get("/workflow/{workflow_id}/flow")
+async def flow_at_depth(workflow_id: str, depth: int):
+    """
+    Get the total flow per token reaching a given depth from the seed.
+    
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    with workflow.lock:
+        return {
+            "depth": depth,
+            "flow": workflow.index.flow_at_depth(depth),
+            "value": {token: str(value) for token, value in workflow.index.value_at_depth(depth).items()}
+        }
+
+@app.get("/workflow/{workflow_id}/nodes/{node_id}")
+async def node_summary(workflow_id: str, node_id: int):
+    """
+    Get a node with its cumulative inflow per token and degrees.
+    
+    Raises:
+        HTTPException: If workflow or node not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    if node_id not in workflow.nodes:
+        raise HTTPException(status_code=404, detail="Node not found")
+    with workflow.lock:
+        return workflow.index.node_summary(node_id)
+
+@app.get("/workflow/{workflow_id}/nodes/{node_id}/taint")
+async def node_taint(workflow_id: str, node_id: int):
+    """
+    Get the taint a node received and the tainted balance left in its wallet.
+
+    Raises:
+        HTTPException: If workflow or node not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    if node_id not in workflow.nodes:
+        raise HTTPException(status_code=404, detail="Node not found")
+    # Propagation after a large ingest can take a while; keep the event loop free
+    return await asyncio.to_thread(workflow.node_taint, node_id)
+
+@app.get("/workflow/{workflow_id}/taint")
+async def tainted_nodes(workflow_id: str, min_tainted: float = 0.0, limit: int = 1000):
+    """
+    List the nodes that received at least `min_tainted` tainted tokens, most tainted first.
+
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    nodes = await asyncio.to_thread(workflow.tainted_nodes, min_tainted, limit)
+    return {"policy": workflow.taint.policy, "min_tainted": min_tainted, "nodes": nodes}
+
+@app.get("/workflow/{workflow_id}/findings")
+async def workflow_findings(workflow_id: str, kind: Optional[PatternKind] = None):
+    """
+    List the laundering patterns detected in a workflow (peel chains, structuring, fan-out/fan-in, mixers, cycles).
+
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    return {"findings": workflow.findings(kind)}
+
+@app.get("/workflow/{workflow_id}/nodes/{node_id}/entity")
+async def node_entity(workflow_id: str, node_id: int):
+    """
+    Get the wallets controlled by the same entity as a node's wallet.
+
+    Raises:
+        HTTPException: If workflow or node not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    if node_id not in workflow.nodes:
+        raise HTTPException(status_code=404, detail="Node not found")
+    return workflow.node_entity(node_id)
+
+@app.get("/workflow/{workflow_id}/entities")
+async def entity_clusters(workflow_id: str, min_size: int = 2):
+    """
+    List the entities of at least `min_size` wallets, largest first.
+
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    entities = await asyncio.to_thread(workflow.entity_clusters, min_size)
+    return {"entities": entities}
+
+@app.get("/workflow/{workflow_id}/timeline")
+async def workflow_timeline(workflow_id: str, from_block: Optional[int] = None, to_block: Optional[int] = None,
+                            wallet: Optional[str] = None, window: Optional[int] = None, limit: int = 1000):
+    """
+    List the transfers in blocks [from_block, to_block], optionally of one wallet, with per-token totals.
+
+    With `window`, each token also reports the `window` blocks that moved the most of it.
+
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    result = await asyncio.to_thread(workflow.time_slice, from_block, to_block, wallet, window, limit)
+    return {"from_block": from_block, "to_block": to_block, "wallet": wallet, **result}
+
+@app.get("/workflow/{workflow_id}/alerts")
+async def workflow_alerts(workflow_id: str):
+    """
+    List the screening alerts raised for a workflow's wallets.
+
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    return {"alerts": list(workflow.alerts)}
+
+@app.get("/workflow/{workflow_id}/snapshot")
+async def workflow_snapshot(workflow_id: str, request: Request):
+    """
+    Get the full serialized state of a workflow.
+    
+    The serialization is cached per workflow version. Clients that send the
+    last ETag in If-None-Match get 304 Not Modified while the workflow is
+    unchanged; gzip (and br, if brotli is installed) is used when accepted.
+    
+    Args:
+        workflow_id (str): ID of the workflow
+        request (Request): The incoming request
+        
+    Returns:
+        Response: JSON snapshot, or 304 if the client's copy is current
+        
+    Raises:
+        HTTPException: If workflow not found
+    """
+    workflow = _get_workflow_or_404(workflow_id)
+    snapshot = workflow.snapshot_cache.get()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers=headers)
+    
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""),
+                                  workflow.snapshot_cache.supported_encodings())
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        body = workflow.snapshot_cache.encode(snapshot, encoding)
+        return Response(content=body, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
 @app.get("/workflow/{workflow_id}/events")
 async def workflow_events(workflow_id: str):
     workflow = workflow_manager.get_workflow(workflow_id)
@@ -159,17 +544,81 @@ async def workflow_events(workflow_id: str):
         raise HTTPException(status_code=404, detail="Workflow not found")
 
     async def event_generator():
-        while workflow.status not in [WorkflowStatus.COMPLETED, WorkflowStatus.ERROR, WorkflowStatus] or workflow.has_changes():
-            if workflow.has_changes():
-                data = workflow.get_buffer()
-                yield {
-                    "event": "message",
-                    "data": json.dumps(data)
-                }
-            await asyncio.sleep(1)
+        SSE_STREAMS.inc()
+        try:
+            while True:
+                if workflow.has_changes():
+                    began = time.perf_counter()
+                    message = json.dumps(workflow.get_buffer())
+                    SSE_SEND_SECONDS.observe(time.perf_counter() - began)
+                    yield {
+                        "event": "message",
+                        "data": message
+                    }
+                # Stop once the workflow is finished and drained, or evicted by the reaper
+                if workflow.closed or workflow.status.is_terminal:
+                    break
+                await asyncio.sleep(1)
+        finally:
+            SSE_STREAMS.dec()
     
     return EventSourceResponse(event_generator())
 
+@app.post("/admin/profile")
+async def profile(request: Request, seconds: float = 10.0, interval_ms: float = 5.0, format: str = "speedscope"):
+    """
+    Sample the stacks of all threads of this process for a while.
+    
+    The profiler runs on its own thread, so the service keeps serving (and is
+    profiled) meanwhile. Requires X-Admin-Token; only one profile runs at a
+    time and captures are capped at WORKFLOW.PROFILE_MAX_SECONDS.
+    
+    Args:
+        request (Request): The incoming request
+        seconds (float): How long to sample
+        interval_ms (float): Milliseconds between samples, at least 1
+        format (str): "speedscope" (JSON for speedscope.app) or "collapsed" (flamegraph.pl input)
+        
+    Returns:
+        Response: The profile as a downloadable file
+        
+    Raises:
+        HTTPException: If admin endpoints are disabled, the token is wrong,
+            the parameters are invalid or a profile is already running
+    """
+    if not CONFIGS.WORKFLOW.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not _is_admin(request):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if format not in ("speedscope", "collapsed"):
+        raise HTTPException(status_code=400, detail="format must be 'speedscope' or 'collapsed'")
+    if not 0 < seconds <= CONFIGS.WORKFLOW.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {CONFIGS.WORKFLOW.PROFILE_MAX_SECONDS}]")
+    
+    profiler = SamplingProfiler(duration=seconds, interval=max(interval_ms, 1.0) / 1000)
+    try:
+        await asyncio.to_thread(profiler.run)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if format == "collapsed":
+        content, media_type, filename = profiler.collapsed(), "text/plain", "profile.collapsed.txt"
+    else:
+        content, media_type, filename = json.dumps(profiler.speedscope()), "application/json", "profile.speedscope.json"
+    return Response(content=content, media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Expose service metrics in the Prometheus text format.
+    
+    Returns:
+        Response: Histograms of ingest, SSE, buffer and MongoDB timings, and
+            gauges of workflows, graph size and queue depths held by this process
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=CONFIGS.WORKFLOW.PORT) 
\ No newline at end of file
@@ -0,0 +1,42 @@
+from typing import Optional
+
+class ActivityLog:
+    """
+    Per-workflow aggregation of high-volume graph activity.
+
+    Instead of one log entry per node, edge and transaction, the workflow
+    counts them here and periodically emits a single summary such as
+    "Added 500 transactions (500 edges, 312 nodes)".
+    """
+
+    __slots__ = ("nodes", "edges", "transactions", "summary_every")
+
+    def __init__(self, summary_every: int = 1000):
+        """
+        Args:
+            summary_every (int): Number of transactions after which a summary is due
+        """
+        self.summary_every = summary_every
+        self.nodes = 0
+        self.edges = 0
+        self.transactions = 0
+
+    def is_due(self) -> bool:
+        """Whether enough transactions accumulated to emit a summary."""
+        return self.transactions >= self.summary_every
+
+    def summary(self) -> Optional[str]:
+        """
+        Build the summary of activity since the last one and reset the counters.
+
+        Returns:
+            Optional[str]: The summary message, or None if nothing happened
+        """
+        if not (self.nodes or self.edges or self.transactions):
+            return None
+        if self.transactions:
+            message = f"Added {self.transactions} transactions ({self.edges} edges, {self.nodes} nodes)"
+        else:
+            message = f"Added {self.edges} edges and {self.nodes} nodes"
+        self.nodes = self.edges = self.transactions = 0
+        return message
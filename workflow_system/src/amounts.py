@@ -0,0 +1,93 @@
+from collections import Counter
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+# Exact values are split into 32-bit limbs so column sums can be accumulated
+# in uint64 without overflow for up to 2**32 rows
+LIMB_BITS = 32
+LIMB_MASK = (1 << LIMB_BITS) - 1
+# Columns hold 128 bits (3.4e20 ETH in wei); larger values are kept aside
+COLUMN_LIMBS = 4
+COLUMN_LIMIT = 1 << (LIMB_BITS * COLUMN_LIMBS)
+
+def to_base_units(amount: float, decimals: int) -> int:
+    """
+    Convert a display amount to an integer amount in the token's smallest unit.
+
+    Uses the shortest decimal representation of the float, so an amount that
+    was rounded from an exact value converts back to that value whenever the
+    float still identifies it.
+
+    Args:
+        amount (float): Amount in whole tokens
+        decimals (int): Decimals of the token (18 for ETH)
+
+    Returns:
+        int: Amount in base units (wei for ETH)
+    """
+    text = repr(float(amount))
+    whole, _, fraction = text.partition(".")
+    # Fast path: plain notation with no more fractional digits than decimals
+    if "e" not in text and "n" not in text and len(fraction) <= decimals:
+        return int(whole + fraction.ljust(decimals, "0"))
+    return int(Decimal(text).scaleb(decimals).to_integral_value())
+
+def from_base_units(value: int, decimals: int) -> float:
+    """Convert base units to whole tokens, correctly rounded to the nearest float."""
+    return value / 10**decimals
+
+def token_labels(tokens: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], str]:
+    """
+    Display names of (ticker, decimals) pairs that are aggregated separately.
+
+    Anyone can deploy a token under an existing ticker, so amounts are only
+    summed per ticker and decimals. A ticker seen with a single precision is
+    shown as is; otherwise each precision is named "<ticker> (<decimals> decimals)".
+
+    Args:
+        tokens (Iterable[Tuple[str, int]]): Distinct (ticker, decimals) pairs
+
+    Returns:
+        Dict[Tuple[str, int], str]: Display name of every pair
+    """
+    tokens = list(tokens)
+    precisions = Counter(ticker for ticker, _ in tokens)
+    return {
+        (ticker, decimals): ticker if precisions[ticker] == 1 else f"{ticker} ({decimals} decimals)"
+        for ticker, decimals in tokens
+    }
+
+def limb_bytes(value: int) -> bytes:
+    """Little-endian bytes of a value below COLUMN_LIMIT, the memory layout of its '<u4' limbs."""
+    return value.to_bytes(COLUMN_LIMBS * LIMB_BITS // 8, "little")
+
+def join_limbs(limbs) -> int:
+    """Recombine (possibly carried-over) limb sums into one integer."""
+    return sum(int(limb) << (LIMB_BITS * i) for i, limb in enumerate(limbs))
+
+def exact_group_sums(limbs: np.ndarray, groups: np.ndarray, group_count: int) -> List[int]:
+    """
+    Sum limb-split values per group without losing precision.
+
+    Rows are sorted by group and every limb column is reduced in uint64, then
+    the per-group limb totals are recombined with Python integers.
+
+    Args:
+        limbs (np.ndarray): (rows, COLUMN_LIMBS) uint32 limbs
+        groups (np.ndarray): Group id of every row
+        group_count (int): Number of groups
+
+    Returns:
+        List[int]: Exact total of every group
+    """
+    totals = [0] * group_count
+    if not len(groups):
+        return totals
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    sums = np.add.reduceat(limbs[order].astype(np.uint64), starts, axis=0)
+    for group, row in zip(sorted_groups[starts], sums):
+        totals[int(group)] = join_limbs(row)
+    return totals
@@ -1,21 +1,24 @@
 from typing import List, Optional, Dict, Any
-from .models import Node, Edge, WorkflowStatus, LogEntry, LogType
+from .models import WorkflowStatus, LogEntry, LogType
+from .records import NodeRecord, EdgeRecord
+from .profiler import span
 
 class WorkflowBuffer:
     """
     Buffer class to store workflow state changes and logs.
     """
     def __init__(self):
-        self.new_nodes: List[Node] = []
-        self.new_edges: List[Edge] = []
+        self.new_nodes: List[NodeRecord] = []
+        self.new_edges: List[EdgeRecord] = []
         self.status: Optional[WorkflowStatus] = None
         self.logs: List[LogEntry] = []
+        self.alerts: List[Dict[str, Any]] = []
     
-    def add_node(self, node: Node) -> None:
+    def add_node(self, node: NodeRecord) -> None:
         """Add a new node to the buffer."""
         self.new_nodes.append(node)
     
-    def add_edge(self, edge: Edge) -> None:
+    def add_edge(self, edge: EdgeRecord) -> None:
         """Add a new edge to the buffer."""
         self.new_edges.append(edge)
     
@@ -33,22 +36,31 @@ class WorkflowBuffer:
         """
         self.logs.append(LogEntry(message=message, type=log_type))
     
+    def add_alert(self, alert: Dict[str, Any]) -> None:
+        """Add a screening alert to the buffer."""
+        self.alerts.append(alert)
+    
     def clear(self) -> None:
         """Clear all buffered changes."""
         self.new_nodes.clear()
         self.new_edges.clear()
         self.status = None
         self.logs.clear()
+        self.alerts.clear()
     
     def has_changes(self) -> bool:
         """Check if there are any buffered changes."""
-        return bool(self.new_nodes or self.new_edges or self.status or self.logs)
+        return bool(self.new_nodes or self.new_edges or self.status or self.logs or self.alerts)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert buffer contents to a dictionary."""
+        with span("buffer.to_dict"):
+            return self._to_dict()
+    
+    def _to_dict(self) -> Dict[str, Any]:
         return {
-            "new_nodes": [node.model_dump() for node in self.new_nodes],
-            "new_edges": [edge.model_dump() for edge in self.new_edges],
+            "new_nodes": [node.to_dict() for node in self.new_nodes],
+            "new_edges": [edge.to_dict() for edge in self.new_edges],
             "status": self.status.value if self.status else None,
             "logs": [
                 {
@@ -57,5 +69,6 @@ class WorkflowBuffer:
                     "timestamp": log.timestamp.isoformat()
                 }
                 for log in self.logs
-            ]
+            ],
+            "alerts": self.alerts
         } 
\ No newline at end of file
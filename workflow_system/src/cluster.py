@@ -0,0 +1,321 @@
+import asyncio
+import bisect
+import hashlib
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import aiohttp
+from fastapi import Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from loguru import logger
+from config import CONFIGS
+from .database import db
+from .http_client import http_client
+
+# Set on requests forwarded between workers so they are never forwarded again
+FORWARDED_HEADER = "X-Forwarded-By-Worker"
+
+# Hop-by-hop headers that must not be copied onto a proxied request or response
+_HOP_HEADERS = {
+    "connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade",
+    "host", "content-length"
+}
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+class ConsistentHashRing:
+    """
+    Consistent hash ring mapping workflow IDs to workers.
+
+    Every worker is placed on the ring at several virtual points so workflows
+    spread evenly, and adding or removing a worker only moves the workflows
+    between it and its neighbours.
+    """
+
+    def __init__(self, workers: Iterable[str] = (), virtual_nodes: int = 64):
+        """
+        Args:
+            workers (Iterable[str]): Initial worker IDs
+            virtual_nodes (int): Points per worker on the ring
+        """
+        self._virtual_nodes = virtual_nodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self.workers: List[str] = []
+        self.set_workers(workers)
+
+    def set_workers(self, workers: Iterable[str]) -> None:
+        """Rebuild the ring for a new set of workers."""
+        ring: List[Tuple[int, str]] = sorted(
+            (_hash(f"{worker}#{i}"), worker)
+            for worker in set(workers)
+            for i in range(self._virtual_nodes)
+        )
+        self._points = [point for point, _ in ring]
+        self._owners = [worker for _, worker in ring]
+        self.workers = sorted(set(workers))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get the worker a key is assigned to.
+
+        Args:
+            key (str): Workflow ID
+
+        Returns:
+            Optional[str]: The worker ID, or None if the ring is empty
+        """
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+class WorkerRegistry:
+    """
+    MongoDB-backed registry of live workers and workflow ownership.
+
+    Each worker heartbeats into the `workers` collection; the live workers form
+    the consistent hash ring used to place new workflows. The worker that
+    creates a workflow records itself in `workflow_owners`, so every worker can
+    route requests for the workflow to its owner even while the ring changes.
+    """
+
+    WORKERS = "workers"
+    OWNERS = "workflow_owners"
+
+    def __init__(self, worker_id: str, worker_url: str, virtual_nodes: int = 64,
+                 heartbeat_interval: int = 5, worker_ttl: int = 15):
+        """
+        Args:
+            worker_id (str): Unique ID of this worker
+            worker_url (str): Base URL other workers use to reach this worker
+            virtual_nodes (int): Points per worker on the hash ring
+            heartbeat_interval (int): Seconds between heartbeats
+            worker_ttl (int): Seconds without a heartbeat before a worker is considered dead
+        """
+        self.worker_id = worker_id
+        self.worker_url = worker_url.rstrip("/")
+        self.ring = ConsistentHashRing([worker_id], virtual_nodes)
+        self._heartbeat_interval = heartbeat_interval
+        self._worker_ttl = worker_ttl
+        self._urls: Dict[str, str] = {worker_id: self.worker_url}
+        self._owners: Dict[str, str] = {}
+        self._local_ids: Callable[[], Iterable[str]] = lambda: ()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, local_ids: Callable[[], Iterable[str]]) -> None:
+        """
+        Register this worker and start heartbeating.
+
+        Args:
+            local_ids (Callable[[], Iterable[str]]): Returns the IDs of workflows held by this worker
+        """
+        self._local_ids = local_ids
+        await self.heartbeat()
+        self._task = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"Worker {self.worker_id} joined cluster at {self.worker_url}")
+
+    async def stop(self) -> None:
+        """Stop heartbeating and remove this worker and its ownership records."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await db.delete_one(self.WORKERS, {"_id": self.worker_id})
+        for workflow_id in [w for w, owner in self._owners.items() if owner == self.worker_id]:
+            await self.release(workflow_id)
+        logger.info(f"Worker {self.worker_id} left cluster")
+
+    async def heartbeat(self) -> None:
+        """Refresh this worker's heartbeat, the ring of live workers and stale ownership records."""
+        now = time.time()
+        await db.update_one(
+            self.WORKERS,
+            {"_id": self.worker_id},
+            {"$set": {"url": self.worker_url, "heartbeat": now}},
+            upsert=True
+        )
+        live = await db.find_many(self.WORKERS, {"heartbeat": {"$gte": now - self._worker_ttl}})
+        self._urls = {doc["_id"]: doc["url"] for doc in live}
+        self._urls[self.worker_id] = self.worker_url
+        if sorted(self._urls) != self.ring.workers:
+            self.ring.set_workers(self._urls)
+            logger.info(f"Cluster ring updated: {self.ring.workers}")
+
+        # Release workflows this worker no longer holds (e.g. evicted by the reaper)
+        held = set(self._local_ids())
+        for workflow_id in [w for w, owner in self._owners.items() if owner == self.worker_id and w not in held]:
+            await self.release(workflow_id)
+        # Forget cached owners that have died; their workflows are gone with them
+        self._owners = {w: owner for w, owner in self._owners.items() if owner in self._urls}
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error(f"Cluster heartbeat failed: {str(e)}")
+
+    def assign(self, workflow_id: str) -> str:
+        """Worker a new workflow should be created on."""
+        return self.ring.get(workflow_id) or self.worker_id
+
+    def url_of(self, worker_id: str) -> Optional[str]:
+        """Base URL of a live worker."""
+        return self._urls.get(worker_id)
+
+    async def claim(self, workflow_id: str) -> bool:
+        """
+        Record this worker as the owner of a workflow.
+
+        Returns:
+            bool: True if this worker owns the workflow, False if another worker already does
+        """
+        await db.update_one(
+            self.OWNERS,
+            {"_id": workflow_id},
+            {"$setOnInsert": {"worker_id": self.worker_id, "claimed_at": time.time()}},
+            upsert=True
+        )
+        doc = await db.find_one(self.OWNERS, {"_id": workflow_id})
+        if doc is not None and doc["worker_id"] not in self._urls:
+            # Take over the record left behind by a dead worker
+            await db.update_one(
+                self.OWNERS,
+                {"_id": workflow_id, "worker_id": doc["worker_id"]},
+                {"$set": {"worker_id": self.worker_id, "claimed_at": time.time()}}
+            )
+        owner = await self.owner_of(workflow_id, refresh=True)
+        return owner == self.worker_id
+
+    async def release(self, workflow_id: str) -> None:
+        """Remove this worker's ownership record of a workflow."""
+        self._owners.pop(workflow_id, None)
+        await db.delete_one(self.OWNERS, {"_id": workflow_id, "worker_id": self.worker_id})
+
+    async def owner_of(self, workflow_id: str, refresh: bool = False) -> Optional[str]:
+        """
+        Get the worker that owns a workflow.
+
+        Args:
+            workflow_id (str): ID of the workflow
+            refresh (bool): Bypass the local cache
+
+        Returns:
+            Optional[str]: Owner worker ID, or None if the workflow is not owned by a live worker
+        """
+        if not refresh and workflow_id in self._owners:
+            return self._owners[workflow_id]
+        doc = await db.find_one(self.OWNERS, {"_id": workflow_id})
+        if doc is None or doc["worker_id"] not in self._urls:
+            self._owners.pop(workflow_id, None)
+            return None
+        self._owners[workflow_id] = doc["worker_id"]
+        return doc["worker_id"]
+
+    async def remote_url(self, workflow_id: str) -> Optional[str]:
+        """
+        Base URL of the worker owning a workflow, if that is not this worker.
+
+        Returns:
+            Optional[str]: The owner's URL, or None if the workflow is local or unowned
+        """
+        owner = await self.owner_of(workflow_id)
+        if owner is None or owner == self.worker_id:
+            return None
+        return self.url_of(owner)
+
+    async def proxy_request(self, request: Request, base_url: str, body: Optional[bytes] = None) -> Response:
+        """
+        Forward an HTTP request to another worker and stream its response back.
+
+        Streaming keeps SSE connections open end to end.
+
+        Args:
+            request (Request): The incoming request
+            base_url (str): Base URL of the target worker
+            body (Optional[bytes]): Body to send instead of the incoming request's body
+
+        Returns:
+            Response: The target worker's response, or 502 if it cannot be reached
+        """
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in _HOP_HEADERS}
+        headers[FORWARDED_HEADER] = self.worker_id
+        session = await http_client.get_session()
+        try:
+            upstream = await session.request(
+                request.method,
+                f"{base_url}{request.url.path}",
+                params=list(request.query_params.multi_items()),
+                data=body if body is not None else await request.body(),
+                headers=headers,
+                auto_decompress=False,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=10)
+            )
+        except aiohttp.ClientError as e:
+            logger.error(f"Failed to forward {request.url.path} to {base_url}: {str(e)}")
+            return Response(status_code=502, content=f"Owner worker unreachable: {base_url}")
+        response_headers = {k: v for k, v in upstream.headers.items() if k.lower() not in _HOP_HEADERS}
+
+        async def body_iterator():
+            try:
+                async for chunk in upstream.content.iter_any():
+                    yield chunk
+            finally:
+                upstream.release()
+
+        return StreamingResponse(body_iterator(), status_code=upstream.status, headers=response_headers)
+
+    async def proxy_websocket(self, websocket: WebSocket, workflow_id: str, base_url: str) -> None:
+        """
+        Relay an accepted WebSocket to the same path on another worker.
+
+        If the owner cannot be reached, the client socket is closed with code
+        4502 and the workflow's owner is looked up again, so the next request
+        does not follow a cached owner that died or released it.
+
+        Args:
+            websocket (WebSocket): The accepted client WebSocket
+            workflow_id (str): ID of the workflow the socket is for
+            base_url (str): Base URL of the target worker
+        """
+        session = await http_client.get_session()
+        url = f"{base_url.replace('http', 'ws', 1)}{websocket.url.path}"
+        try:
+            upstream = await session.ws_connect(url, headers={FORWARDED_HEADER: self.worker_id})
+        except aiohttp.ClientError as e:
+            logger.error(f"Failed to relay {websocket.url.path} to {base_url}: {str(e)}")
+            await self.owner_of(workflow_id, refresh=True)
+            await websocket.close(code=4502, reason="Owner worker unreachable")
+            return
+        async with upstream:
+            async def client_to_upstream():
+                try:
+                    while True:
+                        await upstream.send_str(await websocket.receive_text())
+                except WebSocketDisconnect:
+                    await upstream.close()
+
+            async def upstream_to_client():
+                async for message in upstream:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        await websocket.send_text(message.data)
+                await websocket.close(code=upstream.close_code or 1000)
+
+            tasks = [asyncio.create_task(client_to_upstream()), asyncio.create_task(upstream_to_client())]
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+
+# Create singleton instance; only started when cluster mode is enabled
+registry = WorkerRegistry(
+    worker_id=CONFIGS.CLUSTER.WORKER_ID,
+    worker_url=CONFIGS.CLUSTER.WORKER_URL,
+    virtual_nodes=CONFIGS.CLUSTER.VIRTUAL_NODES,
+    heartbeat_interval=CONFIGS.CLUSTER.HEARTBEAT_INTERVAL,
+    worker_ttl=CONFIGS.CLUSTER.WORKER_TTL
+)
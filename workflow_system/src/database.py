@@ -4,6 +4,9 @@ from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from loguru import logger
 from config import CONFIGS
 from datetime import datetime
+import time
+from .metrics import MONGO_OPERATION_SECONDS, CHANGE_STREAM_LAG_SECONDS
+from .profiler import span
 
 class MongoDB:
     """
@@ -80,7 +83,8 @@ class MongoDB:
             return None
         
         try:
-            result = await self._db[collection].insert_one(document)
+            with MONGO_OPERATION_SECONDS.labels("insert_one", collection).time(), span("mongo.insert_one"):
+                result = await self._db[collection].insert_one(document)
             return str(result.inserted_id)
         except Exception as e:
             logger.error(f"Error inserting document into {collection}: {str(e)}")
@@ -102,7 +106,8 @@ class MongoDB:
             return None
         
         try:
-            result = await self._db[collection].find_one(query)
+            with MONGO_OPERATION_SECONDS.labels("find_one", collection).time(), span("mongo.find_one"):
+                result = await self._db[collection].find_one(query)
             return result
         except Exception as e:
             logger.error(f"Error finding document in {collection}: {str(e)}")
@@ -125,20 +130,22 @@ class MongoDB:
             return []
         
         try:
-            cursor = self._db[collection].find(query)
-            if limit > 0:
-                cursor = cursor.limit(limit)
-            
-            results = []
-            async for document in cursor:
-                results.append(document)
+            with MONGO_OPERATION_SECONDS.labels("find_many", collection).time(), span("mongo.find_many"):
+                cursor = self._db[collection].find(query)
+                if limit > 0:
+                    cursor = cursor.limit(limit)
+                
+                results = []
+                async for document in cursor:
+                    results.append(document)
             
             return results
         except Exception as e:
             logger.error(f"Error finding documents in {collection}: {str(e)}")
             return []
     
-    async def update_one(self, collection: str, query: Dict[str, Any], update: Dict[str, Any]) -> bool:
+    async def update_one(self, collection: str, query: Dict[str, Any], update: Dict[str, Any],
+                         upsert: bool = False) -> bool:
         """
         Update a single document in a collection.
         
@@ -146,17 +153,19 @@ class MongoDB:
             collection (str): Collection name
             query (Dict[str, Any]): Query to find document to update
             update (Dict[str, Any]): Update operations to apply
+            upsert (bool): Insert the document if no document matches the query
             
         Returns:
-            bool: True if document was updated, False otherwise
+            bool: True if document was updated or inserted, False otherwise
         """
         if not self._connected:
             logger.error("Cannot update document: Not connected to MongoDB")
             return False
         
         try:
-            result = await self._db[collection].update_one(query, update)
-            return result.modified_count > 0
+            with MONGO_OPERATION_SECONDS.labels("update_one", collection).time(), span("mongo.update_one"):
+                result = await self._db[collection].update_one(query, update, upsert=upsert)
+            return result.modified_count > 0 or result.upserted_id is not None
         except Exception as e:
             logger.error(f"Error updating document in {collection}: {str(e)}")
             return False
@@ -177,7 +186,8 @@ class MongoDB:
             return False
         
         try:
-            result = await self._db[collection].delete_one(query)
+            with MONGO_OPERATION_SECONDS.labels("delete_one", collection).time(), span("mongo.delete_one"):
+                result = await self._db[collection].delete_one(query)
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Error deleting document in {collection}: {str(e)}")
@@ -274,7 +284,9 @@ async def setup_transaction_watcher(workflow_manager):
     async def transaction_callback(change_event):
         """Process a transaction change event."""
         operation_type = change_event.get("operationType")
-        logger.info(f"Received {operation_type} event in transactions collection")
+        logger.debug("Received {} event in transactions collection", operation_type)
+        if "clusterTime" in change_event:
+            CHANGE_STREAM_LAG_SECONDS.observe(max(0.0, time.time() - change_event["clusterTime"].time))
         
         # Forward the event to the workflow manager
         await workflow_manager.add_transaction_event(change_event)
@@ -0,0 +1,263 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple, Set
+
+from config import DetectorConfig
+from .models import PatternKind
+
+# Transfers without a block number are placed at the mainnet block estimated from their timestamp:
+# one block per 12 second slot since The Merge, the average block time between block 1 and it before
+SECONDS_PER_BLOCK = 12
+FIRST_BLOCK = (1, 1438269988)
+MERGE_BLOCK = (15537394, 1663224179)
+
+# (position, counterparty, edge id), sorted by position
+Event = Tuple[int, str, int]
+
+@dataclass(slots=True)
+class Finding:
+    """A laundering pattern found in a workflow's transfer graph."""
+    kind: PatternKind
+    wallet: str
+    token: str
+    edge_ids: List[int]
+    block: int
+    detail: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def message(self) -> str:
+        """One-line description for the workflow log."""
+        details = ", ".join(f"{key}={value}" for key, value in self.detail.items())
+        return f"Pattern {self.kind.value} at {self.wallet} ({self.token}, {len(self.edge_ids)} transfers): {details}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the finding to its API representation."""
+        return {
+            "kind": self.kind.value,
+            "wallet": self.wallet,
+            "token": self.token,
+            "edge_ids": self.edge_ids,
+            "block": self.block,
+            "detail": self.detail
+        }
+
+def estimate_block(timestamp: int) -> int:
+    """
+    Estimate the Ethereum mainnet block mined at a timestamp.
+
+    Estimates are late by the slots missed since The Merge (about 1%), which
+    is close enough to compare with real block numbers over hours or days.
+
+    Args:
+        timestamp (int): Epoch seconds
+
+    Returns:
+        int: Estimated block number, 0 for timestamps before block 1
+    """
+    merge_block, merge_time = MERGE_BLOCK
+    if timestamp >= merge_time:
+        return merge_block + (timestamp - merge_time) // SECONDS_PER_BLOCK
+    first_block, first_time = FIRST_BLOCK
+    if timestamp < first_time:
+        return 0
+    return first_block + (timestamp - first_time) * (merge_block - first_block) // (merge_time - first_time)
+
+def _densest_window(events: List[Event], position: int, width: int) -> List[Event]:
+    """
+    Find the window of `width` blocks around `position` with the most distinct counterparties.
+
+    Only windows containing `position` are considered: an event can only
+    complete a pattern in a window it belongs to. Two pointers sweep the
+    events within `width` blocks of it, so the cost is linear in that slice.
+    """
+    start = bisect_left(events, (position - width,))
+    stop = bisect_right(events, (position + width + 1,))
+    window = Counter()
+    best, best_range = 0, (start, start)
+    left = start
+    for right in range(start, stop):
+        window[events[right][1]] += 1
+        while events[right][0] - events[left][0] > width:
+            counterparty = events[left][1]
+            window[counterparty] -= 1
+            if not window[counterparty]:
+                del window[counterparty]
+            left += 1
+        if events[left][0] <= position <= events[right][0] and len(window) > best:
+            best, best_range = len(window), (left, right + 1)
+    return events[best_range[0]:best_range[1]]
+
+class PatternDetector:
+    """
+    Incremental detection of laundering patterns as transfers stream into a workflow.
+
+    - peel chain: a run of hops that each forward most of what they received
+      from the previous hop and peel off a smaller part
+    - structuring: many transfers from one wallet just below a reporting threshold
+    - fan-out / fan-in: a wallet sending to or receiving from many distinct
+      wallets; both at once is reported as a mixer
+    - cycle: funds returning to a wallet they already passed through
+
+    Peel chains and cycles follow each transfer's parent (the transfer whose
+    funds it spends), so they cost O(1) and O(CYCLE_MAX_LENGTH) per transfer.
+    Structuring and fan-out/fan-in keep per-wallet event lists sorted by block
+    and sweep a sliding window around each new event. Every pattern is reported
+    once per wallet (per chain root for peel chains), when it first appears.
+    """
+
+    def __init__(self, config: DetectorConfig):
+        """
+        Args:
+            config (DetectorConfig): Thresholds and window sizes
+        """
+        self.config = config
+        # Per edge: parent edge id, sending wallet, amount, peel chain length, first edge of the chain, token
+        self._edges: Dict[int, Tuple[Optional[int], str, float, int, int, str]] = {}
+        self._near_threshold: Dict[Tuple[str, str], List[Event]] = {}
+        # Per (wallet, token): events and every counterparty seen, which bounds any window's degree
+        self._fan_out: Dict[Tuple[str, str], Tuple[List[Event], Set[str]]] = {}
+        self._fan_in: Dict[Tuple[str, str], Tuple[List[Event], Set[str]]] = {}
+        self._reported: Set[Tuple[PatternKind, Any]] = set()
+        self._fan_findings: Dict[Tuple[PatternKind, Tuple[str, str]], Finding] = {}
+        self.findings: List[Finding] = []
+
+    def add_transfer(self, edge_id: int, parent_edge_id: Optional[int], from_wallet: str, to_wallet: str,
+                     token: str, amount: float, block: int, timestamp: int) -> List[Finding]:
+        """
+        Register a transfer edge and run the detectors it can trigger.
+
+        Args:
+            edge_id (int): Edge id in the workflow
+            parent_edge_id (Optional[int]): Transfer whose funds this one spends, None for the seed's
+            from_wallet (str): Sending wallet
+            to_wallet (str): Receiving wallet
+            token (str): Token ticker
+            amount (float): Amount in whole tokens
+            block (int): Block number, 0 when unknown
+            timestamp (int): Epoch seconds, used when the block is unknown
+
+        Returns:
+            List[Finding]: Patterns this transfer completed
+        """
+        position = block or estimate_block(timestamp)
+        found: List[Finding] = []
+        parent = self._edges.get(parent_edge_id) if parent_edge_id is not None else None
+        self._detect_peel(edge_id, parent_edge_id, parent, from_wallet, token, amount, position, found)
+        self._detect_structuring(edge_id, from_wallet, to_wallet, token, amount, position, found)
+        self._detect_fan(edge_id, from_wallet, to_wallet, token, position, found)
+        self._detect_cycle(edge_id, parent_edge_id, to_wallet, token, position, found)
+        self.findings.extend(found)
+        return found
+
+    def _report(self, key: Tuple[PatternKind, Any], finding: Finding, found: List[Finding]) -> None:
+        if key not in self._reported:
+            self._reported.add(key)
+            found.append(finding)
+
+    def _chain(self, edge_id: int, length: int) -> List[int]:
+        """Edge ids of the `length` transfers ending at `edge_id`, oldest first."""
+        chain = []
+        current: Optional[int] = edge_id
+        while current is not None and len(chain) < length:
+            chain.append(current)
+            current = self._edges[current][0]
+        return chain[::-1]
+
+    def _detect_peel(self, edge_id: int, parent_edge_id: Optional[int], parent, from_wallet: str,
+                     token: str, amount: float, position: int, found: List[Finding]) -> None:
+        length, root = 0, edge_id
+        # Shares are only comparable within one token; token outflows are often funded by ETH
+        if parent is not None and parent[5] == token and parent[2] > 0:
+            share = amount / parent[2]
+            if self.config.PEEL_MIN_SHARE <= share <= self.config.PEEL_MAX_SHARE:
+                length = parent[3] + 1
+                if parent[3]:
+                    root = parent[4]
+        self._edges[edge_id] = (parent_edge_id, from_wallet, amount, length, root, token)
+        if length >= self.config.PEEL_MIN_LENGTH and (PatternKind.PEEL_CHAIN, root) not in self._reported:
+            self._report((PatternKind.PEEL_CHAIN, root), Finding(
+                PatternKind.PEEL_CHAIN, self._edges[root][1], token, self._chain(edge_id, length), position,
+                {"hops": length, "start_amount": self._edges[root][2], "amount": amount}
+            ), found)
+
+    def _detect_structuring(self, edge_id: int, from_wallet: str, to_wallet: str, token: str,
+                            amount: float, position: int, found: List[Finding]) -> None:
+        threshold = self.config.STRUCTURING_THRESHOLDS.get(token)
+        if threshold is None or not threshold * (1 - self.config.STRUCTURING_BAND) <= amount < threshold:
+            return
+        key = (from_wallet, token)
+        if (PatternKind.STRUCTURING, key) in self._reported:
+            return
+        # Every transfer counts, so the counterparty slot holds the edge id
+        events = self._near_threshold.setdefault(key, [])
+        insort(events, (position, str(edge_id), edge_id))
+        if len(events) < self.config.STRUCTURING_MIN_COUNT:
+            return
+        window = _densest_window(events, position, self.config.WINDOW_BLOCKS)
+        if len(window) >= self.config.STRUCTURING_MIN_COUNT:
+            self._report((PatternKind.STRUCTURING, key), Finding(
+                PatternKind.STRUCTURING, from_wallet, token, [event[2] for event in window], position,
+                {"transfers": len(window), "threshold": threshold,
+                 "blocks": window[-1][0] - window[0][0]}
+            ), found)
+            del self._near_threshold[key]
+
+    def _detect_fan(self, edge_id: int, from_wallet: str, to_wallet: str, token: str,
+                    position: int, found: List[Finding]) -> None:
+        for kind, lists, wallet, counterparty in (
+            (PatternKind.FAN_OUT, self._fan_out, from_wallet, to_wallet),
+            (PatternKind.FAN_IN, self._fan_in, to_wallet, from_wallet)
+        ):
+            key = (wallet, token)
+            if (kind, key) in self._reported:
+                continue
+            events, seen = lists.setdefault(key, ([], set()))
+            insort(events, (position, counterparty, edge_id))
+            seen.add(counterparty)
+            if len(seen) < self.config.FAN_MIN_DEGREE:
+                continue
+            window = _densest_window(events, position, self.config.WINDOW_BLOCKS)
+            counterparties = len({event[1] for event in window})
+            if counterparties < self.config.FAN_MIN_DEGREE:
+                continue
+            finding = Finding(
+                kind, wallet, token, [event[2] for event in window], position,
+                {"counterparties": counterparties, "blocks": window[-1][0] - window[0][0]}
+            )
+            self._report((kind, key), finding, found)
+            self._fan_findings[(kind, key)] = finding
+            # A flagged wallet is not swept again; hubs would make every later event expensive
+            del lists[key]
+            fan_in = self._fan_findings.get((PatternKind.FAN_IN, key))
+            fan_out = self._fan_findings.get((PatternKind.FAN_OUT, key))
+            if fan_in and fan_out:
+                self._report((PatternKind.MIXER, key), Finding(
+                    PatternKind.MIXER, wallet, token, fan_in.edge_ids + fan_out.edge_ids, position,
+                    {"senders": fan_in.detail["counterparties"], "receivers": fan_out.detail["counterparties"]}
+                ), found)
+
+    def _detect_cycle(self, edge_id: int, parent_edge_id: Optional[int], to_wallet: str, token: str,
+                      position: int, found: List[Finding]) -> None:
+        if (PatternKind.CYCLE, to_wallet) in self._reported:
+            return
+        current, hops = parent_edge_id, 1
+        while current is not None and hops < self.config.CYCLE_MAX_LENGTH:
+            entry = self._edges.get(current)
+            if entry is None:
+                return
+            parent_id, sender = entry[0], entry[1]
+            hops += 1
+            if sender == to_wallet:
+                self._report((PatternKind.CYCLE, to_wallet), Finding(
+                    PatternKind.CYCLE, to_wallet, token, self._chain(edge_id, hops), position, {"hops": hops}
+                ), found)
+                return
+            current = parent_id
+
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the detector in bytes."""
+        events = sum(len(events) for events in self._near_threshold.values())
+        events += sum(len(events) + len(seen) for lists in (self._fan_out, self._fan_in)
+                      for events, seen in lists.values())
+        return len(self._edges) * 200 + events * 120 + len(self.findings) * 500
@@ -0,0 +1,175 @@
+from typing import Optional, Dict, List, Set
+import numpy as np
+
+# Labels of services that hold many users' funds; their transfers say nothing about ownership
+SERVICE_CATEGORIES = ("exchange", "mixer", "bridge", "router")
+
+class EntityClusters:
+    """
+    Incremental grouping of wallets controlled by the same entity.
+
+    Wallets are interned to integer ids and grouped with a union-find over
+    NumPy arrays (union by size, path halving), so merging and lookups are
+    near O(1) and the arrays grow by doubling like the columnar graph store.
+
+    Ethereum has no multi-input transactions, so instead of the common-input
+    heuristic two account-based ones are applied as transfers arrive:
+
+    - deposit address: a wallet that forwards funds to an exchange is one of
+      its per-customer deposit addresses, and every wallet sending to it is
+      the same customer
+    - gas funding: wallets whose first traced inflow is a small native top-up
+      from the same (non-service) wallet are prepared by the same entity
+
+    Cluster ids are the id of the cluster's root wallet and can change when
+    two clusters merge.
+    """
+
+    def __init__(self, gas_topup_max: float = 0.05, native_token: str = "ETH", initial_capacity: int = 1024):
+        """
+        Args:
+            gas_topup_max (float): Largest native transfer counted as a gas top-up
+            native_token (str): Ticker of the chain's native token
+            initial_capacity (int): Number of wallets allocated up front
+        """
+        self.gas_topup_max = gas_topup_max
+        self.native_token = native_token
+        self._ids: Dict[str, int] = {}
+        self.wallets: List[str] = []
+        self._parent = np.arange(initial_capacity, dtype=np.int32)
+        self._size = np.ones(initial_capacity, dtype=np.int32)
+        self._received = np.zeros(initial_capacity, dtype=bool)
+
+        # Senders of each unlabeled wallet, kept until it turns out to be a deposit address
+        self._senders: Dict[int, List[int]] = {}
+        # Deposit address -> first wallet that sent to it, the customer's representative
+        self._deposits: Dict[int, Optional[int]] = {}
+        # Funder -> first wallet it topped up with gas
+        self._gas_funded: Dict[int, int] = {}
+        self.merges = 0
+
+    def _id(self, wallet: str) -> int:
+        wallet_id = self._ids.get(wallet)
+        if wallet_id is None:
+            wallet_id = len(self.wallets)
+            if wallet_id >= len(self._parent):
+                size = 2 * len(self._parent)
+                self._parent = np.concatenate([self._parent, np.arange(len(self._parent), size, dtype=np.int32)])
+                self._size = np.concatenate([self._size, np.ones(size - len(self._size), dtype=np.int32)])
+                self._received = np.concatenate([self._received, np.zeros(size - len(self._received), dtype=bool)])
+            self._ids[wallet] = wallet_id
+            self.wallets.append(wallet)
+        return wallet_id
+
+    def find(self, wallet_id: int) -> int:
+        """Root of a wallet's cluster, halving the path on the way."""
+        parent = self._parent
+        while parent[wallet_id] != wallet_id:
+            grandparent = parent[parent[wallet_id]]
+            parent[wallet_id] = grandparent
+            wallet_id = int(grandparent)
+        return wallet_id
+
+    def union(self, first: int, second: int) -> bool:
+        """
+        Merge the clusters of two wallets.
+
+        Returns:
+            bool: Whether they were in different clusters
+        """
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self._size[first] < self._size[second]:
+            first, second = second, first
+        self._parent[second] = first
+        self._size[first] += self._size[second]
+        self.merges += 1
+        return True
+
+    def add_transfer(self, from_wallet: str, to_wallet: str, token: str, amount: float,
+                     from_label: Optional[Dict[str, str]] = None,
+                     to_label: Optional[Dict[str, str]] = None) -> None:
+        """
+        Register a transfer and apply the heuristics it triggers.
+
+        Args:
+            from_wallet (str): Sending wallet
+            to_wallet (str): Receiving wallet
+            token (str): Token ticker
+            amount (float): Amount in whole tokens
+            from_label (Optional[Dict[str, str]]): Label of the sender, if known
+            to_label (Optional[Dict[str, str]]): Label of the receiver, if known
+        """
+        sender, receiver = self._id(from_wallet), self._id(to_wallet)
+        sender_is_service = bool(from_label) and from_label["category"] in SERVICE_CATEGORIES
+
+        # Deposit address: an unlabeled wallet sweeping into an exchange
+        if to_label and to_label["category"] == "exchange" and not from_label and sender not in self._deposits:
+            customers = self._senders.pop(sender, [])
+            self._deposits[sender] = customers[0] if customers else None
+            for customer in customers[1:]:
+                self.union(customers[0], customer)
+        if receiver in self._deposits:
+            customer = self._deposits[receiver]
+            if customer is None:
+                self._deposits[receiver] = sender
+            elif not sender_is_service:
+                self.union(customer, sender)
+        elif not to_label and not sender_is_service:
+            self._senders.setdefault(receiver, []).append(sender)
+
+        # Gas funding: a fresh wallet's first inflow is a small native top-up
+        if (not self._received[receiver] and not sender_is_service and token == self.native_token
+                and 0 < amount <= self.gas_topup_max):
+            first_funded = self._gas_funded.setdefault(sender, receiver)
+            if first_funded != receiver:
+                self.union(first_funded, receiver)
+        self._received[receiver] = True
+
+    def cluster_id(self, wallet: str) -> Optional[int]:
+        """Cluster id of a wallet, None if the wallet is unknown."""
+        wallet_id = self._ids.get(wallet)
+        return None if wallet_id is None else self.find(wallet_id)
+
+    def members(self, wallet: str) -> List[str]:
+        """All wallets in the same cluster as `wallet` (just the wallet if it is not clustered)."""
+        cluster_id = self.cluster_id(wallet)
+        if cluster_id is None:
+            return [wallet]
+        roots = self._roots()
+        return [self.wallets[i] for i in np.flatnonzero(roots == cluster_id)]
+
+    def _roots(self) -> np.ndarray:
+        """Root of every wallet, fully compressing the forest with vectorized pointer jumping."""
+        count = len(self.wallets)
+        parent = self._parent[:count]
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                return parent.copy()
+            parent[:] = grandparent
+
+    def clusters(self, min_size: int = 2) -> Dict[int, List[str]]:
+        """
+        Clusters with at least `min_size` wallets.
+
+        Returns:
+            Dict[int, List[str]]: Cluster id to member wallets
+        """
+        roots = self._roots()
+        sizes = np.bincount(roots, minlength=len(roots))
+        result: Dict[int, List[str]] = {}
+        for wallet_id in np.flatnonzero(sizes[roots] >= min_size):
+            result.setdefault(int(roots[wallet_id]), []).append(self.wallets[wallet_id])
+        return result
+
+    def deposit_addresses(self) -> Set[str]:
+        """Wallets identified as exchange deposit addresses."""
+        return {self.wallets[wallet_id] for wallet_id in self._deposits}
+
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the clusters in bytes."""
+        arrays = self._parent.nbytes + self._size.nbytes + self._received.nbytes
+        senders = sum(len(senders) for senders in self._senders.values())
+        return arrays + len(self.wallets) * 150 + senders * 40 + len(self._senders) * 100
@@ -0,0 +1,161 @@
+from collections import defaultdict, deque
+from typing import Optional, Dict, Any, List, Mapping, Tuple
+from .models import TransactionType
+from .records import NodeRecord, EdgeRecord
+from .amounts import from_base_units, token_labels
+
+class GraphIndex:
+    """
+    Traversal indexes over a workflow graph, maintained incrementally.
+
+    Every edge added to the workflow updates the out/in adjacency lists, the
+    `prev_hash` parent/child links between transaction edges, and the exact
+    cumulative inflow per node and total flow per depth per token, in base units.
+    Traversal queries then only touch the part of the graph they return.
+    """
+
+    def __init__(self, nodes: Mapping[int, NodeRecord], edges: Mapping[int, EdgeRecord]):
+        """
+        Initialize empty indexes over a workflow's node and edge mappings.
+
+        Args:
+            nodes (Mapping[int, NodeRecord]): Node mapping of the workflow's graph store
+            edges (Mapping[int, EdgeRecord]): Edge mapping of the workflow's graph store
+        """
+        self._nodes = nodes
+        self._edges = edges
+        self.out_edges: Dict[int, List[int]] = defaultdict(list)
+        self.in_edges: Dict[int, List[int]] = defaultdict(list)
+        self.wallet_nodes: Dict[str, List[int]] = defaultdict(list)
+        self.parent: Dict[int, int] = {}
+        self.children: Dict[int, List[int]] = defaultdict(list)
+        self.depth: Dict[int, int] = {}
+        # Keyed by (ticker, decimals): look-alike tokens reuse tickers with other decimals
+        self.inflow: Dict[int, Dict[Tuple[str, int], int]] = defaultdict(lambda: defaultdict(int))
+        self.depth_flow: Dict[int, Dict[Tuple[str, int], int]] = defaultdict(lambda: defaultdict(int))
+
+    def add_node(self, node: NodeRecord) -> None:
+        """Index a newly added node."""
+        self.wallet_nodes[node.wallet].append(node.internal_id)
+
+    def child_depth(self, parent_edge_id: Optional[int]) -> int:
+        """Depth of an edge spending funds from `parent_edge_id`: one more than the parent, 0 without one."""
+        return self.depth[parent_edge_id] + 1 if parent_edge_id is not None else 0
+
+    def add_edge(self, edge: EdgeRecord, parent_edge_id: Optional[int] = None) -> None:
+        """
+        Index a newly added edge.
+
+        Args:
+            edge (EdgeRecord): The added edge
+            parent_edge_id (Optional[int]): Transaction edge whose funds this edge spends
+        """
+        self.out_edges[edge.from_node_id].append(edge.internal_id)
+        self.in_edges[edge.to_node_id].append(edge.internal_id)
+        depth = self.child_depth(parent_edge_id)
+        if parent_edge_id is not None:
+            self.parent[edge.internal_id] = parent_edge_id
+        self.depth[edge.internal_id] = depth
+        if edge.type == TransactionType.TRANSACTION:
+            if parent_edge_id is not None:
+                self.children[parent_edge_id].append(edge.internal_id)
+            self.inflow[edge.to_node_id][edge.ticker_token, edge.decimals] += edge.value
+            self.depth_flow[depth][edge.ticker_token, edge.decimals] += edge.value
+
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the indexes in bytes."""
+        return len(self.depth) * 250 + len(self.wallet_nodes) * 150
+
+    def descendants(self, edge_id: int, max_depth: Optional[int] = None, limit: int = 1000) -> List[EdgeRecord]:
+        """
+        Collect the transaction edges that spent funds descending from an edge.
+
+        Args:
+            edge_id (int): Edge to start from (not included in the result)
+            max_depth (Optional[int]): Maximum number of hops below the start edge
+            limit (int): Maximum number of edges returned
+
+        Returns:
+            List[EdgeRecord]: Descendant edges in breadth-first order
+        """
+        result = []
+        queue = deque((child, 1) for child in self.children.get(edge_id, ()))
+        while queue and len(result) < limit:
+            child, hops = queue.popleft()
+            result.append(self._edges[child])
+            if max_depth is None or hops < max_depth:
+                queue.extend((grandchild, hops + 1) for grandchild in self.children.get(child, ()))
+        return result
+
+    def ancestors(self, edge_id: int) -> List[EdgeRecord]:
+        """
+        Follow the `prev_hash` chain of an edge back to the seed.
+
+        Returns:
+            List[EdgeRecord]: Ancestor edges, nearest first
+        """
+        result = []
+        parent = self.parent.get(edge_id)
+        while parent is not None:
+            result.append(self._edges[parent])
+            parent = self.parent.get(parent)
+        return result
+
+    def paths(self, from_wallet: str, to_wallet: str, max_depth: int = 6, max_paths: int = 10) -> List[List[EdgeRecord]]:
+        """
+        Find transaction paths between two wallets.
+
+        Args:
+            from_wallet (str): Source wallet address
+            to_wallet (str): Target wallet address
+            max_depth (int): Maximum number of edges per path
+            max_paths (int): Maximum number of paths returned
+
+        Returns:
+            List[List[EdgeRecord]]: Paths as lists of edges from source to target
+        """
+        targets = set(self.wallet_nodes.get(to_wallet, ()))
+        if not targets:
+            return []
+        paths: List[List[EdgeRecord]] = []
+        for start in self.wallet_nodes.get(from_wallet, ()):
+            stack = [(start, [], {start})]
+            while stack and len(paths) < max_paths:
+                node_id, path, visited = stack.pop()
+                if len(path) == max_depth:
+                    continue
+                for edge_id in self.out_edges.get(node_id, ()):
+                    edge = self._edges[edge_id]
+                    if edge.type != TransactionType.TRANSACTION or edge.to_node_id in visited:
+                        continue
+                    if edge.to_node_id in targets:
+                        paths.append(path + [edge])
+                        if len(paths) == max_paths:
+                            break
+                    else:
+                        stack.append((edge.to_node_id, path + [edge], visited | {edge.to_node_id}))
+        return paths
+
+    def flow_at_depth(self, depth: int) -> Dict[str, float]:
+        """Total transaction flow per token reaching the given depth, in whole tokens."""
+        flow = self.depth_flow.get(depth, {})
+        names = token_labels(flow)
+        return {names[token]: from_base_units(value, token[1]) for token, value in flow.items()}
+
+    def value_at_depth(self, depth: int) -> Dict[str, int]:
+        """Exact total transaction flow per token reaching the given depth, in base units."""
+        flow = self.depth_flow.get(depth, {})
+        names = token_labels(flow)
+        return {names[token]: value for token, value in flow.items()}
+
+    def node_summary(self, node_id: int) -> Dict[str, Any]:
+        """Node data with its cumulative inflow per token (whole tokens and exact base units) and degrees."""
+        inflow = self.inflow.get(node_id, {})
+        names = token_labels(inflow)
+        return {
+            **self._nodes[node_id].to_dict(),
+            "inflow": {names[token]: from_base_units(value, token[1]) for token, value in inflow.items()},
+            "inflow_value": {names[token]: str(value) for token, value in inflow.items()},
+            "in_degree": len(self.in_edges.get(node_id, ())),
+            "out_degree": len(self.out_edges.get(node_id, ()))
+        }
@@ -0,0 +1,405 @@
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator, Mapping
+import numpy as np
+
+from .models import TransactionType
+from .records import NodeRecord, EdgeRecord
+from .amounts import COLUMN_LIMBS, COLUMN_LIMIT, exact_group_sums, from_base_units, limb_bytes, token_labels
+
+def parse_timestamp(date: str) -> int:
+    """
+    Convert an edge date string to epoch seconds.
+
+    Args:
+        date (str): Date in ISO format ("2025-03-03 16:43:23" or "2025-03-03T16:43:23")
+
+    Returns:
+        int: Epoch seconds, or 0 if the date cannot be parsed
+    """
+    try:
+        return int(datetime.fromisoformat(date).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+class StringInterner:
+    """
+    Maps repeated strings (wallets, chains) or other hashable keys (tokens) to dense integer ids.
+    """
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: str) -> int:
+        """Get the id of a string, assigning a new one on first sight."""
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self.values)
+            self._ids[value] = index
+            self.values.append(value)
+        return index
+
+    def get(self, value: str) -> Optional[int]:
+        """Get the id of a string without interning it."""
+        return self._ids.get(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class RecordGraphStore:
+    """
+    Default graph store keeping nodes and edges as slotted records in dicts.
+
+    Cheap to append to and to read single records from; whole-graph analytics
+    iterate over Python objects.
+    """
+    kind = "records"
+
+    # Approximate bytes per record including dict slots, strings and the extra dict
+    NODE_BYTES = 300
+    EDGE_BYTES = 500
+
+    def __init__(self):
+        self.nodes: Dict[int, NodeRecord] = {}
+        self.edges: Dict[int, EdgeRecord] = {}
+        self._depths = array("l")
+
+    def add_node(self, wallet: str, blockchain: str, link_etherscan: str,
+                 label: Optional[Dict[str, str]] = None) -> NodeRecord:
+        """Append a node and return its record."""
+        node = NodeRecord(len(self.nodes) + 1, wallet, blockchain, link_etherscan, label)
+        self.nodes[node.internal_id] = node
+        return node
+
+    def add_edge(self, from_node_id: int, to_node_id: int, sum: float, ticker_token: str,
+                 type: TransactionType, date: str, hash: str, etherscan_link: str,
+                 extra: Optional[Dict[str, Any]] = None, depth: int = 0,
+                 value: int = 0, decimals: int = 18) -> EdgeRecord:
+        """Append an edge and return its record."""
+        edge = EdgeRecord(len(self.edges) + 1, from_node_id, to_node_id, sum, ticker_token,
+                          type, date, hash, etherscan_link, extra, value, decimals)
+        self.edges[edge.internal_id] = edge
+        self._depths.append(depth)
+        return edge
+
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the store in bytes."""
+        return len(self.nodes) * self.NODE_BYTES + len(self.edges) * self.EDGE_BYTES
+
+    def stats(self) -> Dict[str, Any]:
+        """Compute whole-graph statistics."""
+        flow: Counter = Counter()
+        in_degree: Counter = Counter()
+        out_degree: Counter = Counter()
+        timestamps = []
+        for edge in self.edges.values():
+            if edge.type != TransactionType.TRANSACTION:
+                continue
+            flow[edge.ticker_token, edge.decimals] += edge.value
+            out_degree[edge.from_node_id] += 1
+            in_degree[edge.to_node_id] += 1
+            timestamps.append(parse_timestamp(edge.date))
+        flow = {token: total for token, total in flow.items() if total}
+        names = token_labels(flow)
+        return {
+            "store": self.kind,
+            "node_count": len(self.nodes),
+            "edge_count": len(self.edges),
+            "total_flow": {names[token]: from_base_units(total, token[1]) for token, total in flow.items()},
+            "total_value": {names[token]: str(total) for token, total in flow.items()},
+            "max_in_degree": max(in_degree.values(), default=0),
+            "max_out_degree": max(out_degree.values(), default=0),
+            "depth_distribution": dict(sorted(Counter(self._depths).items())),
+            "first_timestamp": min(timestamps, default=None),
+            "last_timestamp": max(timestamps, default=None)
+        }
+
+class _ColumnarNodeView(Mapping):
+    """Read-only mapping of node id to NodeRecord over a ColumnarGraphStore."""
+    def __init__(self, store: "ColumnarGraphStore"):
+        self._store = store
+
+    def __getitem__(self, node_id: int) -> NodeRecord:
+        if not isinstance(node_id, int) or not 1 <= node_id <= self._store.node_count:
+            raise KeyError(node_id)
+        return self._store.node_record(node_id)
+
+    def __contains__(self, node_id: object) -> bool:
+        return isinstance(node_id, int) and 1 <= node_id <= self._store.node_count
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(1, self._store.node_count + 1))
+
+    def __len__(self) -> int:
+        return self._store.node_count
+
+class _ColumnarEdgeView(Mapping):
+    """Read-only mapping of edge id to EdgeRecord over a ColumnarGraphStore."""
+    def __init__(self, store: "ColumnarGraphStore"):
+        self._store = store
+
+    def __getitem__(self, edge_id: int) -> EdgeRecord:
+        if not isinstance(edge_id, int) or not 1 <= edge_id <= self._store.edge_count:
+            raise KeyError(edge_id)
+        return self._store.edge_record(edge_id)
+
+    def __contains__(self, edge_id: object) -> bool:
+        return isinstance(edge_id, int) and 1 <= edge_id <= self._store.edge_count
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(1, self._store.edge_count + 1))
+
+    def __len__(self) -> int:
+        return self._store.edge_count
+
+class ColumnarGraphStore:
+    """
+    Array-backed graph store for workflows whose whole-graph statistics are read often.
+
+    Edges are kept as NumPy columns (endpoints, amounts, timestamps, token and
+    type codes, depth) indexed by `internal_id - 1`; wallets, chains and tokens
+    (ticker and decimals, so look-alike tokens never share an id) are interned
+    to integer ids. Exact amounts are stored as four 32-bit limbs
+    per edge so per-token totals can be summed exactly in uint64; the rare
+    values beyond 128 bits are kept in a dict and added separately. Columns grow by doubling, so appends are
+    amortized O(1), and whole-graph statistics run as vectorized operations.
+    `nodes` and `edges` expose the same mapping interface as the record store,
+    building records on access.
+
+    Appends cost more than in the record store (interning and per-column
+    writes), so ingestion is slower, and the workflow's other indexes
+    dominate its memory either way; see the README for measurements.
+    """
+    kind = "columnar"
+
+    _TYPE_CODES = {TransactionType.TRANSACTION: 0, TransactionType.DUPLICATE: 1}
+    _CODE_TYPES = {code: type for type, code in _TYPE_CODES.items()}
+
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize empty columns.
+
+        Args:
+            initial_capacity (int): Number of rows allocated up front
+        """
+        self.wallets = StringInterner()
+        self.blockchains = StringInterner()
+        # (ticker, decimals) pairs
+        self.tokens = StringInterner()
+
+        self.node_count = 0
+        self._node_wallet = np.empty(initial_capacity, dtype=np.int32)
+        self._node_blockchain = np.empty(initial_capacity, dtype=np.int16)
+        self._node_links: Dict[int, str] = {}
+        # Few wallets are labeled, so labels are kept per row only where present
+        self._node_labels: Dict[int, Dict[str, str]] = {}
+
+        self.edge_count = 0
+        self._from = np.empty(initial_capacity, dtype=np.int32)
+        self._to = np.empty(initial_capacity, dtype=np.int32)
+        self._amount = np.empty(initial_capacity, dtype=np.float64)
+        self._value = np.empty((initial_capacity, COLUMN_LIMBS), dtype="<u4")
+        # Byte view for writing and reading limbs without per-element NumPy overhead
+        self._value_bytes = memoryview(self._value).cast("B")
+        self._big_values: Dict[int, int] = {}
+        self._timestamp = np.empty(initial_capacity, dtype=np.int64)
+        self._token = np.empty(initial_capacity, dtype=np.int16)
+        self._type = np.empty(initial_capacity, dtype=np.int8)
+        self._depth = np.empty(initial_capacity, dtype=np.int32)
+        self._hashes: List[str] = []
+        self._dates: List[str] = []
+        self._edge_links: Dict[int, str] = {}
+        self._extras: Dict[int, Dict[str, Any]] = {}
+
+        self.nodes = _ColumnarNodeView(self)
+        self.edges = _ColumnarEdgeView(self)
+
+    @staticmethod
+    def _grow(column: np.ndarray, size: int) -> np.ndarray:
+        """Return `column`, reallocated with doubled capacity if `size` rows do not fit."""
+        if size <= len(column):
+            return column
+        grown = np.empty((max(size, 2 * len(column)),) + column.shape[1:], dtype=column.dtype)
+        grown[:len(column)] = column
+        return grown
+
+    def add_node(self, wallet: str, blockchain: str, link_etherscan: str,
+                 label: Optional[Dict[str, str]] = None) -> NodeRecord:
+        """Append a node and return its record."""
+        row = self.node_count
+        self._node_wallet = self._grow(self._node_wallet, row + 1)
+        self._node_blockchain = self._grow(self._node_blockchain, row + 1)
+        self._node_wallet[row] = self.wallets.intern(wallet)
+        self._node_blockchain[row] = self.blockchains.intern(blockchain)
+        # Links following the default pattern are rebuilt on read instead of stored
+        if link_etherscan != f"https://etherscan.io/address/{wallet}":
+            self._node_links[row] = link_etherscan
+        if label is not None:
+            self._node_labels[row] = label
+        self.node_count += 1
+        return NodeRecord(row + 1, wallet, blockchain, link_etherscan, label)
+
+    def add_edge(self, from_node_id: int, to_node_id: int, sum: float, ticker_token: str,
+                 type: TransactionType, date: str, hash: str, etherscan_link: str,
+                 extra: Optional[Dict[str, Any]] = None, depth: int = 0,
+                 value: int = 0, decimals: int = 18) -> EdgeRecord:
+        """Append an edge and return its record."""
+        row = self.edge_count
+        if row + 1 > len(self._from):
+            self._from = self._grow(self._from, row + 1)
+            self._to = self._grow(self._to, row + 1)
+            self._amount = self._grow(self._amount, row + 1)
+            self._value = self._grow(self._value, row + 1)
+            self._value_bytes = memoryview(self._value).cast("B")
+            self._timestamp = self._grow(self._timestamp, row + 1)
+            self._token = self._grow(self._token, row + 1)
+            self._type = self._grow(self._type, row + 1)
+            self._depth = self._grow(self._depth, row + 1)
+        self._from[row] = from_node_id
+        self._to[row] = to_node_id
+        self._amount[row] = sum
+        width = self._value.itemsize * COLUMN_LIMBS
+        if value < COLUMN_LIMIT:
+            self._value_bytes[row * width:(row + 1) * width] = limb_bytes(value)
+        else:
+            self._value_bytes[row * width:(row + 1) * width] = limb_bytes(0)
+            self._big_values[row] = value
+        self._timestamp[row] = parse_timestamp(date)
+        self._token[row] = self.tokens.intern((ticker_token, decimals))
+        self._type[row] = self._TYPE_CODES[type]
+        self._depth[row] = depth
+        self._hashes.append(hash)
+        self._dates.append(date)
+        if etherscan_link != f"https://etherscan.io/tx/{hash}":
+            self._edge_links[row] = etherscan_link
+        if extra is not None:
+            self._extras[row] = extra
+        self.edge_count += 1
+        return EdgeRecord(row + 1, from_node_id, to_node_id, sum, ticker_token,
+                          type, date, hash, etherscan_link, extra, value, decimals)
+
+    def node_record(self, node_id: int) -> NodeRecord:
+        """Build the record of a node from its columns."""
+        row = node_id - 1
+        wallet = self.wallets.values[self._node_wallet[row]]
+        return NodeRecord(
+            node_id,
+            wallet,
+            self.blockchains.values[self._node_blockchain[row]],
+            self._node_links.get(row, f"https://etherscan.io/address/{wallet}"),
+            self._node_labels.get(row)
+        )
+
+    def edge_record(self, edge_id: int) -> EdgeRecord:
+        """Build the record of an edge from its columns."""
+        row = edge_id - 1
+        hash = self._hashes[row]
+        ticker_token, decimals = self.tokens.values[self._token[row]]
+        return EdgeRecord(
+            edge_id,
+            int(self._from[row]),
+            int(self._to[row]),
+            float(self._amount[row]),
+            ticker_token,
+            self._CODE_TYPES[int(self._type[row])],
+            self._dates[row],
+            hash,
+            self._edge_links.get(row, f"https://etherscan.io/tx/{hash}"),
+            self._extras.get(row),
+            self._big_values.get(row) or int.from_bytes(self._edge_value_bytes(row), "little"),
+            decimals
+        )
+
+    def _edge_value_bytes(self, row: int) -> memoryview:
+        width = self._value.itemsize * COLUMN_LIMBS
+        return self._value_bytes[row * width:(row + 1) * width]
+
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the store in bytes."""
+        columns = (self._node_wallet, self._node_blockchain, self._from, self._to, self._amount,
+                   self._value, self._timestamp, self._token, self._type, self._depth)
+        # Hash and date strings plus their list slots
+        strings = self.edge_count * 200 + len(self.wallets) * 150
+        return sum(column.nbytes for column in columns) + strings + len(self._extras) * 250
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Export the numeric columns without copying.
+
+        Rows are never modified after they are appended, so the returned
+        read-only views stay consistent while the store keeps growing.
+
+        Returns:
+            Dict[str, Any]: Column views trimmed to the current size plus the interned string tables
+        """
+        n = self.edge_count
+        columns = {
+            "from_node_id": self._from[:n],
+            "to_node_id": self._to[:n],
+            "sum": self._amount[:n],
+            "value_limbs": self._value[:n],
+            "timestamp": self._timestamp[:n],
+            "token": self._token[:n],
+            "type": self._type[:n],
+            "depth": self._depth[:n],
+            "node_wallet": self._node_wallet[:self.node_count]
+        }
+        for column in columns.values():
+            column.flags.writeable = False
+        columns["tokens"] = [ticker for ticker, _ in self.tokens.values]
+        columns["token_decimals"] = [decimals for _, decimals in self.tokens.values]
+        columns["wallets"] = list(self.wallets.values)
+        return columns
+
+    def stats(self) -> Dict[str, Any]:
+        """Compute whole-graph statistics with vectorized column operations."""
+        n = self.edge_count
+        transfers = self._type[:n] == self._TYPE_CODES[TransactionType.TRANSACTION]
+        tokens = self._token[:n][transfers]
+        flow = exact_group_sums(self._value[:n][transfers], tokens, len(self.tokens))
+        for row, value in self._big_values.items():
+            if row < n and transfers[row]:
+                flow[self._token[row]] += value
+        in_degree = np.bincount(self._to[:n][transfers], minlength=self.node_count + 1)
+        out_degree = np.bincount(self._from[:n][transfers], minlength=self.node_count + 1)
+        depths, depth_counts = np.unique(self._depth[:n], return_counts=True)
+        timestamps = self._timestamp[:n][transfers]
+        names = token_labels(self.tokens.values[token] for token, total in enumerate(flow) if total)
+        return {
+            "store": self.kind,
+            "node_count": self.node_count,
+            "edge_count": n,
+            "total_flow": {
+                names[self.tokens.values[token]]: from_base_units(total, self.tokens.values[token][1])
+                for token, total in enumerate(flow) if total
+            },
+            "total_value": {names[self.tokens.values[token]]: str(total) for token, total in enumerate(flow) if total},
+            "max_in_degree": int(in_degree.max()) if n else 0,
+            "max_out_degree": int(out_degree.max()) if n else 0,
+            "depth_distribution": {int(d): int(c) for d, c in zip(depths, depth_counts)},
+            "first_timestamp": int(timestamps.min()) if timestamps.size else None,
+            "last_timestamp": int(timestamps.max()) if timestamps.size else None
+        }
+
+GRAPH_STORES = {
+    RecordGraphStore.kind: RecordGraphStore,
+    ColumnarGraphStore.kind: ColumnarGraphStore
+}
+
+def create_graph_store(kind: str):
+    """
+    Create a graph store by name.
+
+    Args:
+        kind (str): "records" or "columnar"
+
+    Returns:
+        The graph store instance
+
+    Raises:
+        ValueError: If the store kind is unknown
+    """
+    if kind not in GRAPH_STORES:
+        raise ValueError(f"Unknown graph store: {kind}")
+    return GRAPH_STORES[kind]()
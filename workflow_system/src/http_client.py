@@ -0,0 +1,51 @@
+from typing import Optional
+import aiohttp
+from loguru import logger
+
+class HTTPClient:
+    """
+    Shared HTTP client for outgoing requests.
+
+    Holds a single pooled aiohttp ClientSession for the lifetime of the service,
+    so calls to the AI agent system reuse keep-alive connections instead of
+    paying connection setup on every request.
+    """
+
+    def __init__(self, limit: int = 100, keepalive_timeout: float = 30.0):
+        """
+        Initialize the HTTP client.
+
+        Args:
+            limit (int): Maximum number of pooled connections
+            keepalive_timeout (float): Seconds an idle connection is kept open
+        """
+        self._limit = limit
+        self._keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def connect(self) -> None:
+        """Create the shared session if it does not exist yet."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._limit, keepalive_timeout=self._keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector)
+            logger.info("Opened shared HTTP client session")
+
+    async def disconnect(self) -> None:
+        """Close the shared session and its pooled connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed shared HTTP client session")
+        self._session = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared session, creating it on first use.
+
+        Returns:
+            aiohttp.ClientSession: The pooled session
+        """
+        await self.connect()
+        return self._session
+
+# Create singleton instance
+http_client = HTTPClient()
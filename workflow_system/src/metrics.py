@@ -0,0 +1,67 @@
+from typing import TYPE_CHECKING
+from prometheus_client import Counter, Gauge, Histogram
+
+if TYPE_CHECKING:
+    from .workflow_manager import WorkflowManager
+
+# Prometheus metrics of the workflow service, exposed on /metrics.
+# Observing a histogram costs about a microsecond, so they stay on in production;
+# gauges over all workflows are only computed when /metrics is scraped.
+
+ADD_TRANSACTION_SECONDS = Histogram(
+    "workflow_add_transaction_seconds",
+    "Time to add one transaction to a workflow, including lock wait",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+)
+TRANSACTIONS_TOTAL = Counter(
+    "workflow_transactions_total",
+    "Transactions received, by ingest mode (single or batch) and result",
+    ["mode", "result"]
+)
+BUFFER_FLUSH_ITEMS = Histogram(
+    "workflow_buffer_flush_items",
+    "New nodes and edges delivered per buffer flush",
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+)
+SSE_SEND_SECONDS = Histogram(
+    "workflow_sse_send_seconds",
+    "Time to drain a workflow buffer and serialize it for one SSE message",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+SSE_STREAMS = Gauge(
+    "workflow_sse_streams",
+    "Open SSE event streams"
+)
+INGEST_BATCHES_IN_PROGRESS = Gauge(
+    "workflow_ingest_batches_in_progress",
+    "Transaction batches currently being applied"
+)
+MONGO_OPERATION_SECONDS = Histogram(
+    "workflow_mongo_operation_seconds",
+    "MongoDB operation latency",
+    ["operation", "collection"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+CHANGE_STREAM_LAG_SECONDS = Histogram(
+    "workflow_change_stream_lag_seconds",
+    "Delay between a transaction insert in MongoDB and its change event reaching the service",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+ACTIVE_WORKFLOWS = Gauge("workflow_active_workflows", "Workflows held by this process")
+WORKFLOW_NODES = Gauge("workflow_nodes", "Graph nodes held across all workflows")
+WORKFLOW_EDGES = Gauge("workflow_edges", "Graph edges held across all workflows")
+BUFFERED_ITEMS = Gauge("workflow_buffered_items", "Nodes and edges waiting in workflow buffers for SSE delivery")
+
+def register_workflow_gauges(manager: "WorkflowManager") -> None:
+    """
+    Compute the workflow gauges from a manager's workflows at scrape time.
+
+    Args:
+        manager (WorkflowManager): The manager whose workflows are reported
+    """
+    ACTIVE_WORKFLOWS.set_function(lambda: len(manager.get_all_workflows()))
+    WORKFLOW_NODES.set_function(lambda: sum(len(w.nodes) for w in manager.get_all_workflows()))
+    WORKFLOW_EDGES.set_function(lambda: sum(len(w.edges) for w in manager.get_all_workflows()))
+    BUFFERED_ITEMS.set_function(lambda: sum(
+        len(w.buffer.new_nodes) + len(w.buffer.new_edges) for w in manager.get_all_workflows()
+    ))
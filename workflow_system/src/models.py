@@ -1,7 +1,7 @@
 from enum import Enum
-from datetime import datetime
-from typing import Optional, Dict, Any
-from pydantic import BaseModel
+from datetime import datetime, UTC
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field
 
 class LogType(str, Enum):
     """Enumeration of possible log types."""
@@ -14,7 +14,7 @@ class LogEntry(BaseModel):
     """Represents a log entry with message and type."""
     message: str
     type: LogType
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
 class WorkflowStatus(str, Enum):
     """Enumeration of possible workflow statuses."""
@@ -24,17 +24,36 @@ class WorkflowStatus(str, Enum):
     ERROR = "error"
     CANCELED = "canceled"
 
+    @property
+    def is_terminal(self) -> bool:
+        """Whether the workflow has finished and will not change status again."""
+        return self in (WorkflowStatus.COMPLETED, WorkflowStatus.ERROR, WorkflowStatus.CANCELED)
+
 class TransactionType(str, Enum):
     """Enumeration of possible transaction types."""
     TRANSACTION = "transaction"
     DUPLICATE = "duplicate"
 
+class PatternKind(str, Enum):
+    """Enumeration of laundering patterns found by the detectors."""
+    PEEL_CHAIN = "peel_chain"
+    STRUCTURING = "structuring"
+    FAN_OUT = "fan_out"
+    FAN_IN = "fan_in"
+    MIXER = "mixer"
+    CYCLE = "cycle"
+
 class InitNodeInput(BaseModel):
     """Input model for initial node data."""
     wallet: str
     blockchain: str
     link_etherscan: str
 
+class AddressLabel(BaseModel):
+    """Known owner of an address: category (exchange, mixer, bridge, router, sanctioned) and name."""
+    category: str
+    name: str = ""
+
 class TransactionInput(BaseModel):
     """Input model for transaction data."""
     from_blockchain: str
@@ -42,10 +61,28 @@ class TransactionInput(BaseModel):
     to_blockchain: str
     to_wallet: str
     hash: str
-    sum: float
+    sum: float = Field(ge=0)
     ticker_token: str
     date: str
     prev_hash: str | None = None
+    # Log index of a token transfer, and of the token transfer that funded this one;
+    # they tell apart the transfers of a transaction that moved ETH and several tokens
+    log_index: Optional[int] = None
+    prev_log_index: Optional[int] = None
+    # Exact amount in base units (wei for ETH), as a JSON number or decimal string;
+    # derived from `sum` when missing
+    value: Optional[int] = Field(default=None, ge=0)
+    decimals: int = Field(default=18, ge=0)
+    # Orders transfers for taint propagation; the date is used when missing
+    block_number: Optional[int] = None
+    # Labels of known wallets, attached to the nodes created for them
+    from_label: Optional[AddressLabel] = None
+    to_label: Optional[AddressLabel] = None
+
+class TransactionBatchInput(BaseModel):
+    """Input model for a batch of transactions pushed by an agent."""
+    batch_id: Optional[str] = None
+    transactions: List[TransactionInput]
 
 class Node(BaseModel):
     """Represents a node in the workflow graph."""
@@ -53,6 +90,7 @@ class Node(BaseModel):
     wallet: str
     blockchain: str
     link_etherscan: str
+    label: Optional[AddressLabel] = None
 
 class Edge(BaseModel):
     """Represents an edge in the workflow graph."""
@@ -65,4 +103,7 @@ class Edge(BaseModel):
     date: str
     hash: str
     etherscan_link: str
+    # Exact amount in base units as a decimal string, JSON numbers cannot hold uint256
+    value: Optional[str] = None
+    decimals: int = 18
     extra: Optional[Dict[str, Any]] = None 
\ No newline at end of file
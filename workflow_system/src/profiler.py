@@ -0,0 +1,187 @@
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+
+# Frames are identified by (function name, file, first line of the function)
+Frame = Tuple[str, str, int]
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for the running process.
+
+    A background thread walks the stacks of all other threads through
+    `sys._current_frames()` at a fixed interval and counts identical stacks.
+    Nothing is hooked into the interpreter, so the profiled code runs at full
+    speed between samples and the overhead is bounded by the sampling rate.
+    Only one profile can run at a time.
+    """
+
+    _running = threading.Lock()
+
+    def __init__(self, duration: float, interval: float = 0.005):
+        """
+        Args:
+            duration (float): Seconds to sample for
+            interval (float): Seconds between samples
+        """
+        self.duration = duration
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.thread_names: Dict[int, str] = {}
+        self.elapsed = 0.0
+
+    def run(self) -> "SamplingProfiler":
+        """
+        Sample all other threads for the configured duration, blocking the caller.
+
+        Returns:
+            SamplingProfiler: self, with collected samples
+
+        Raises:
+            ProfilerBusyError: If another profile is already running
+        """
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            own_id = threading.get_ident()
+            began = time.perf_counter()
+            deadline = began + self.duration
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own_id:
+                        self.samples[(thread_id, self._stack(frame))] += 1
+                time.sleep(self.interval)
+            self.elapsed = time.perf_counter() - began
+            self.thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        finally:
+            self._running.release()
+        return self
+
+    @staticmethod
+    def _stack(frame) -> Tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _thread_name(self, thread_id: int) -> str:
+        return self.thread_names.get(thread_id, f"thread-{thread_id}")
+
+    def collapsed(self) -> str:
+        """
+        Render the samples in the collapsed stack format used by flamegraph.pl and speedscope.
+
+        Returns:
+            str: One "thread;outer;...;inner count" line per distinct stack
+        """
+        lines = []
+        for (thread_id, stack), count in self.samples.most_common():
+            names = [self._thread_name(thread_id)]
+            names += [f"{name} ({filename.rsplit('/', 1)[-1]}:{line})" for name, filename, line in stack]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """
+        Render the samples as a speedscope file with one sampled profile per thread.
+
+        Returns:
+            Dict[str, Any]: JSON document in the speedscope file format
+        """
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[Frame, int] = {}
+        profiles: Dict[int, Dict[str, Any]] = {}
+        interval_ms = self.interval * 1000
+        for (thread_id, stack), count in self.samples.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+            profile = profiles.setdefault(thread_id, {
+                "type": "sampled",
+                "name": self._thread_name(thread_id),
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": 0,
+                "samples": [],
+                "weights": []
+            })
+            profile["samples"].append(indexes)
+            profile["weights"].append(count * interval_ms)
+            profile["endValue"] += count * interval_ms
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"workflow_system profile ({self.elapsed:.1f}s)",
+            "exporter": "workflow_system",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values())
+        }
+
+# Timings of the current request, collected only while a traced request is active
+_request_spans: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_spans", default=None)
+
+class span:
+    """
+    Time a block as a named span of the current traced request.
+
+    Outside a traced request this is a no-op costing one context variable
+    lookup, so spans can stay on hot paths.
+
+    Example:
+        with span("add_transaction"):
+            workflow.add_transaction(transaction)
+    """
+
+    __slots__ = ("name", "spans", "began")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "span":
+        self.spans = _request_spans.get()
+        if self.spans is not None:
+            self.began = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.spans is not None:
+            totals = self.spans.setdefault(self.name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += time.perf_counter() - self.began
+
+def start_request_trace() -> Dict[str, List[float]]:
+    """
+    Start collecting spans for the current request.
+
+    Returns:
+        Dict[str, List[float]]: Span name to [count, total seconds], filled as spans finish
+    """
+    spans: Dict[str, List[float]] = {}
+    _request_spans.set(spans)
+    return spans
+
+def server_timing(spans: Dict[str, List[float]]) -> str:
+    """
+    Format collected spans as a Server-Timing header value.
+
+    Args:
+        spans (Dict[str, List[float]]): Spans returned by `start_request_trace`
+
+    Returns:
+        str: e.g. 'add_transaction;dur=12.41;desc="500 calls", mongo.find_one;dur=0.83;desc="1 calls"'
+    """
+    return ", ".join(
+        f'{name};dur={total * 1000:.2f};desc="{count} calls"'
+        for name, (count, total) in spans.items()
+    )
@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from .models import TransactionType
+
+@dataclass(slots=True)
+class NodeRecord:
+    """
+    Compact internal representation of a graph node.
+
+    Workflows store these slotted records instead of pydantic `Node` models to
+    avoid validation and per-instance dict overhead on the ingest path. The
+    dictionary form matches `Node` field for field.
+    """
+    internal_id: int
+    wallet: str
+    blockchain: str
+    link_etherscan: str
+    label: Optional[Dict[str, str]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to the API representation of a node."""
+        return {
+            "internal_id": self.internal_id,
+            "wallet": self.wallet,
+            "blockchain": self.blockchain,
+            "link_etherscan": self.link_etherscan,
+            "label": self.label
+        }
+
+@dataclass(slots=True)
+class EdgeRecord:
+    """
+    Compact internal representation of a graph edge.
+
+    The dictionary form matches `Edge` field for field. `value` is the exact
+    amount in base units; `sum` is the display amount the sender reported.
+    """
+    internal_id: int
+    from_node_id: int
+    to_node_id: int
+    sum: float
+    ticker_token: str
+    type: TransactionType
+    date: str
+    hash: str
+    etherscan_link: str
+    extra: Optional[Dict[str, Any]] = None
+    value: int = 0
+    decimals: int = 18
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to the API representation of an edge."""
+        return {
+            "internal_id": self.internal_id,
+            "from_node_id": self.from_node_id,
+            "to_node_id": self.to_node_id,
+            "sum": self.sum,
+            "ticker_token": self.ticker_token,
+            "type": self.type.value,
+            "date": self.date,
+            "hash": self.hash,
+            "etherscan_link": self.etherscan_link,
+            "extra": self.extra,
+            "value": str(self.value),
+            "decimals": self.decimals
+        }
@@ -0,0 +1,180 @@
+"""
+Screening of wallets against local sanctions lists and blacklists.
+
+Watchlist files are compiled into one memory-mapped index: a Bloom filter
+followed by the sorted listed addresses (20 bytes each, plus the list they
+came from). A lookup tests the filter first, which rejects almost every
+clean address after reading a few bytes; the rare positives are confirmed by
+binary search over the sorted table, so no false alert is ever raised. The
+index is rebuilt whenever a list is newer than it, and its pages are shared
+between worker processes.
+
+Any 0x-prefixed 40-digit hex string in a list file counts as a listed
+address, so plain address lists, CSV exports and the OFAC SDN list (digital
+currency address fields) can be used as they are.
+"""
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from loguru import logger
+
+from config import CONFIGS, ROOT_DIR
+
+_MAGIC = b"SCR1"
+# magic, filter size in bits, hash count, listed addresses, list count
+_HEADER = struct.Struct(">4sQIII")
+# address, list id
+_ENTRY = struct.Struct(">20sH")
+_ADDRESS = re.compile(rb"0x[0-9a-fA-F]{40}")
+_MASK = (1 << 64) - 1
+
+def _hashes(key: bytes) -> Tuple[int, int]:
+    # Addresses are Keccak outputs, so their own bytes serve as two independent hashes
+    return int.from_bytes(key[:8], "big"), int.from_bytes(key[8:16], "big") | 1
+
+def build_index(lists: Sequence[Path], index_path: Path, false_positive_rate: float = 0.001) -> int:
+    """
+    Compile watchlist files into a screening index.
+
+    An address on several lists is attributed to the first one.
+
+    Args:
+        lists (Sequence[Path]): Watchlist files
+        index_path (Path): Index file to write
+        false_positive_rate (float): Target false positive rate of the Bloom filter
+
+    Returns:
+        int: Number of listed addresses
+    """
+    entries: Dict[bytes, int] = {}
+    for list_id, path in enumerate(lists):
+        for match in _ADDRESS.finditer(path.read_bytes()):
+            entries.setdefault(bytes.fromhex(match.group()[2:].decode()), list_id)
+    keys = sorted(entries)
+    count = len(keys)
+
+    # Optimal filter for the target rate: m = -n ln p / ln^2 2 bits, k = m/n ln 2 hashes
+    bits = max(64, math.ceil(-max(count, 1) * math.log(false_positive_rate) / math.log(2) ** 2))
+    hash_count = max(1, round(bits / max(count, 1) * math.log(2)))
+    filter_bits = np.zeros(bits, dtype=bool)
+    if keys:
+        raw = np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(count, 20)
+        first = raw[:, :8].copy().view(">u8").ravel().astype(np.uint64)
+        second = raw[:, 8:16].copy().view(">u8").ravel().astype(np.uint64) | np.uint64(1)
+        with np.errstate(over="ignore"):
+            for i in range(hash_count):
+                filter_bits[(first + np.uint64(i) * second) % np.uint64(bits)] = True
+    bloom = np.packbits(filter_bits, bitorder="little").tobytes()
+
+    table = b"".join(_ENTRY.pack(key, entries[key]) for key in keys)
+    names = "\n".join(path.name for path in lists).encode()
+    # Write to a private file next to the target and rename it, so readers never see a partial
+    # index and workers rebuilding at the same time never write into each other's file
+    with tempfile.NamedTemporaryFile(dir=index_path.parent, prefix=index_path.name, delete=False) as f:
+        try:
+            f.write(_HEADER.pack(_MAGIC, bits, hash_count, count, len(lists)) + bloom + table + names)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, index_path)
+    return count
+
+class ScreeningIndex:
+    """Memory-mapped Bloom filter with exact confirmation over the sorted listed addresses."""
+
+    def __init__(self, lists: Sequence[Path], index_path: Path, false_positive_rate: float = 0.001):
+        """
+        Args:
+            lists (Sequence[Path]): Watchlist files the index is (re)built from when missing or older
+            index_path (Path): Compiled index
+            false_positive_rate (float): Target false positive rate of the Bloom filter
+        """
+        if not index_path.exists() or any(
+            index_path.stat().st_mtime < path.stat().st_mtime for path in lists
+        ):
+            count = build_index(lists, index_path, false_positive_rate)
+            logger.info("Built screening index {} with {} addresses from {} lists", index_path, count, len(lists))
+        with open(index_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.hash_count, self.count, list_count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{index_path} is not a screening index")
+        self._table = _HEADER.size + (self.bits + 7) // 8
+        names = self._map[self._table + self.count * _ENTRY.size:].decode()
+        self.lists = names.split("\n") if list_count else []
+
+    def _maybe_listed(self, key: bytes) -> bool:
+        first, second = _hashes(key)
+        bloom, bits, offset = self._map, self.bits, _HEADER.size
+        for i in range(self.hash_count):
+            position = ((first + i * second) & _MASK) % bits
+            if not bloom[offset + (position >> 3)] >> (position & 7) & 1:
+                return False
+        return True
+
+    def _find(self, key: bytes) -> Optional[int]:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            address, list_id = _ENTRY.unpack_from(self._map, self._table + middle * _ENTRY.size)
+            if address == key:
+                return list_id
+            if address < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def check(self, address: str) -> Optional[str]:
+        """
+        Screen one address.
+
+        Args:
+            address (str): Hex address, any case
+
+        Returns:
+            Optional[str]: Name of the list the address is on, None if it is not listed
+        """
+        try:
+            key = bytes.fromhex(address[2:] if address.startswith(("0x", "0X")) else address)
+        except ValueError:
+            return None
+        if len(key) != 20 or not self._maybe_listed(key):
+            return None
+        list_id = self._find(key)
+        return None if list_id is None else self.lists[list_id]
+
+    def close(self) -> None:
+        self._map.close()
+
+_screening: Optional[ScreeningIndex] = None
+_screening_loaded = False
+
+def get_screening() -> Optional[ScreeningIndex]:
+    """
+    Shared screening index over CONFIGS.SCREENING.LISTS, opened on first use.
+
+    The app opens it at startup, so a broken list stops the service instead
+    of workflows running unscreened; a failed load is retried on the next call.
+
+    Returns:
+        Optional[ScreeningIndex]: The index, None when screening is disabled or no list is configured
+
+    Raises:
+        OSError: If a list or the index cannot be read or written
+    """
+    global _screening, _screening_loaded
+    if not _screening_loaded:
+        settings = CONFIGS.SCREENING
+        if settings.ENABLED and settings.LISTS:
+            lists = [ROOT_DIR / path for path in settings.LISTS]
+            _screening = ScreeningIndex(lists, ROOT_DIR / settings.INDEX_PATH, settings.FALSE_POSITIVE_RATE)
+        _screening_loaded = True
+    return _screening
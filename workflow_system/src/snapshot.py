@@ -0,0 +1,144 @@
+import gzip
+import json
+from dataclasses import dataclass
+from typing import Optional, Dict, List, TYPE_CHECKING
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+if TYPE_CHECKING:
+    from .workflow import Workflow
+
+def negotiate_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """
+    Pick the content encoding for a response from an Accept-Encoding header.
+
+    Codings are matched case-insensitively by token with their q-values; q=0
+    refuses a coding, and "*" covers the codings not listed. Among the
+    supported codings with the highest q-value the earliest one wins.
+
+    Args:
+        accept_encoding (str): Value of the request's Accept-Encoding header
+        supported (List[str]): Codings the server can produce, in order of preference
+
+    Returns:
+        Optional[str]: The coding to use, None to send the body uncompressed
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+@dataclass(slots=True)
+class Snapshot:
+    """One serialized version of a workflow."""
+    version: int
+    etag: str
+    body: bytes
+    encoded: Dict[str, bytes]
+
+class SnapshotCache:
+    """
+    Cached, versioned JSON serialization of a workflow's full state.
+
+    Nodes and edges are append-only, so their JSON fragments are serialized
+    once and appended to byte buffers as the graph grows. Building a snapshot
+    for a new version only serializes the small header plus the records added
+    since the previous build; reading an unchanged version returns the cached
+    bytes. Compressed variants are produced lazily, once per version.
+    """
+
+    def __init__(self, workflow: "Workflow"):
+        """
+        Args:
+            workflow (Workflow): The workflow to serialize
+        """
+        self._workflow = workflow
+        self._nodes_json = bytearray()
+        self._edges_json = bytearray()
+        self._node_count = 0
+        self._edge_count = 0
+        self._snapshot: Optional[Snapshot] = None
+
+    @staticmethod
+    def supported_encodings() -> list:
+        """Content encodings this cache can produce, in order of preference."""
+        return ["br", "gzip"] if brotli else ["gzip"]
+
+    def _append_new_records(self) -> None:
+        nodes = self._workflow.nodes
+        for node_id in range(self._node_count + 1, len(nodes) + 1):
+            if self._nodes_json:
+                self._nodes_json += b","
+            self._nodes_json += f'"{node_id}":{json.dumps(nodes[node_id].to_dict())}'.encode()
+        self._node_count = len(nodes)
+
+        edges = self._workflow.edges
+        for edge_id in range(self._edge_count + 1, len(edges) + 1):
+            if self._edges_json:
+                self._edges_json += b","
+            self._edges_json += f'"{edge_id}":{json.dumps(edges[edge_id].to_dict())}'.encode()
+        self._edge_count = len(edges)
+
+    def get(self) -> Snapshot:
+        """
+        Get the snapshot of the workflow's current version, building it if needed.
+
+        Returns:
+            Snapshot: Version, ETag and uncompressed JSON body
+        """
+        workflow = self._workflow
+        with workflow.lock:
+            if self._snapshot is None or self._snapshot.version != workflow.version:
+                self._append_new_records()
+                header = json.dumps(workflow.to_dict(include_graph=False))
+                body = b"".join([
+                    header[:-1].encode(),
+                    b',"nodes":{', bytes(self._nodes_json),
+                    b'},"edges":{', bytes(self._edges_json), b"}}"
+                ])
+                self._snapshot = Snapshot(
+                    version=workflow.version,
+                    # The creation time tells apart workflows recreated under the same ID
+                    etag=f'"{workflow.workflow_id}-{workflow.created_at.timestamp():.6f}-{workflow.version}"',
+                    body=body,
+                    encoded={}
+                )
+            return self._snapshot
+
+    def encode(self, snapshot: Snapshot, encoding: str) -> bytes:
+        """
+        Get a compressed body of a snapshot, compressing at most once per version.
+
+        Args:
+            snapshot (Snapshot): Snapshot returned by `get`
+            encoding (str): "gzip" or "br"
+
+        Returns:
+            bytes: The compressed body
+        """
+        if encoding not in snapshot.encoded:
+            if encoding == "br":
+                snapshot.encoded[encoding] = brotli.compress(snapshot.body, quality=5)
+            else:
+                snapshot.encoded[encoding] = gzip.compress(snapshot.body, compresslevel=6)
+        return snapshot.encoded[encoding]
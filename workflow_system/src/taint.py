@@ -0,0 +1,272 @@
+import heapq
+from bisect import insort
+from collections import deque
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from loguru import logger
+
+from .amounts import from_base_units, token_labels
+
+# Events of a pool are ordered by block, then timestamp, then arrival
+OrderKey = Tuple[int, int, int]
+
+TAINT_POLICIES = ("haircut", "fifo", "poison")
+
+class TaintEngine:
+    """
+    Incremental taint propagation over a workflow's transfer graph.
+
+    Transfers without a parent (the seed's) are fully tainted. Every other
+    transfer spends from a pool, the balance of one token held by the sending
+    wallet, and takes its taint from that pool according to the policy:
+
+    - haircut: each outflow carries the pool's tainted share at that moment
+    - fifo: outflows consume received lots in arrival order
+    - poison: once a pool received any taint, every outflow is fully tainted
+
+    Pools replay their inflows and outflows in block order. Funds a wallet
+    spends beyond what the trace shows it receiving are assumed clean.
+    Tokens are told apart by ticker and decimals.
+
+    Amounts and tainted amounts are exact integers in the token's base units,
+    so taint is conserved exactly through any number of hops (shares are
+    rounded down, never creating taint); they are converted to whole tokens
+    only when reported.
+
+    Adding a transfer only appends to the per-edge state and marks the two
+    pools it touches as dirty; `refresh` recomputes dirty pools, upstream
+    first, and follows changed outflows to the pools that received them.
+    Per-edge state is indexed by edge id; the tainted amount in whole tokens
+    is mirrored in a NumPy array so threshold queries are vectorized.
+    """
+
+    # Recomputations allowed per pool and refresh before giving up on a
+    # same-block cycle that never settles
+    MAX_PASSES = 50
+
+    def __init__(self, policy: str = "haircut", initial_capacity: int = 1024):
+        """
+        Args:
+            policy (str): "haircut", "fifo" or "poison"
+            initial_capacity (int): Number of transfers allocated up front
+
+        Raises:
+            ValueError: If the policy is unknown
+        """
+        if policy not in TAINT_POLICIES:
+            raise ValueError(f"Unknown taint policy: {policy}")
+        self.policy = policy
+        # Base units can exceed 64 bits, so exact amounts are Python ints
+        self._value: List[int] = [0] * initial_capacity
+        self._tainted_value: List[int] = [0] * initial_capacity
+        self._tainted_tokens = np.zeros(initial_capacity, dtype=np.float64)
+        self._decimals = np.zeros(initial_capacity, dtype=np.int16)
+        self._to_pool = np.full(initial_capacity, -1, dtype=np.int32)
+        self._keys: Dict[int, OrderKey] = {}
+
+        # Pool key: wallet, token ticker, decimals
+        self._pool_ids: Dict[Tuple[str, str, int], int] = {}
+        self.pools: List[Tuple[str, str, int]] = []
+        # Per pool: (order key, edge id, is outflow), sorted
+        self._events: List[List[Tuple[OrderKey, int, bool]]] = []
+        self._balance: List[int] = []
+        self._tainted: List[int] = []
+        self._dirty: Dict[int, OrderKey] = {}
+
+    def _pool(self, wallet: str, token: str, decimals: int) -> int:
+        key = (wallet, token, decimals)
+        pool = self._pool_ids.get(key)
+        if pool is None:
+            pool = len(self.pools)
+            self._pool_ids[key] = pool
+            self.pools.append(key)
+            self._events.append([])
+            self._balance.append(0)
+            self._tainted.append(0)
+        return pool
+
+    def _grow(self, edge_id: int) -> None:
+        if edge_id < len(self._value):
+            return
+        size = max(edge_id + 1, 2 * len(self._value))
+        self._value.extend([0] * (size - len(self._value)))
+        self._tainted_value.extend([0] * (size - len(self._tainted_value)))
+        for name, fill in (("_tainted_tokens", 0.0), ("_decimals", 0), ("_to_pool", -1)):
+            column = getattr(self, name)
+            grown = np.full(size, fill, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _set_tainted(self, edge_id: int, tainted: int) -> None:
+        self._tainted_value[edge_id] = tainted
+        self._tainted_tokens[edge_id] = from_base_units(tainted, int(self._decimals[edge_id]))
+
+    def _mark(self, pool: int, key: OrderKey) -> None:
+        current = self._dirty.get(pool)
+        if current is None or key < current:
+            self._dirty[pool] = key
+
+    def add_transfer(self, edge_id: int, from_wallet: str, to_wallet: str, token: str, value: int,
+                     decimals: int, block: int, timestamp: int, is_seed: bool) -> None:
+        """
+        Register a transfer edge.
+
+        Args:
+            edge_id (int): Edge id in the workflow
+            from_wallet (str): Sending wallet
+            to_wallet (str): Receiving wallet
+            token (str): Token ticker; each token (ticker and decimals) is tracked separately
+            value (int): Exact amount in the token's base units
+            decimals (int): Decimals of the token
+            block (int): Block number, 0 when unknown (ordering then falls back to the timestamp)
+            timestamp (int): Epoch seconds
+            is_seed (bool): Whether the transfer is one of the seed's, which is fully tainted
+        """
+        self._grow(edge_id)
+        key = (block, timestamp, edge_id)
+        self._keys[edge_id] = key
+        self._value[edge_id] = value
+        self._decimals[edge_id] = decimals
+        to_pool = self._pool(to_wallet, token, decimals)
+        self._to_pool[edge_id] = to_pool
+        insort(self._events[to_pool], (key, edge_id, False))
+        self._mark(to_pool, key)
+        if is_seed:
+            self._set_tainted(edge_id, value)
+        else:
+            from_pool = self._pool(from_wallet, token, decimals)
+            insort(self._events[from_pool], (key, edge_id, True))
+            self._mark(from_pool, key)
+
+    def _replay(self, pool: int) -> List[int]:
+        """Recompute the tainted amounts of a pool's outflows; return the edges whose amount changed."""
+        changed = []
+        values, tainted_values = self._value, self._tainted_value
+        balance = tainted = 0
+        lots: deque = deque()  # fifo: [value, tainted value] left of each received lot
+        poisoned = False
+        for _, edge_id, is_out in self._events[pool]:
+            value = values[edge_id]
+            if not is_out:
+                balance += value
+                tainted += tainted_values[edge_id]
+                if self.policy == "fifo":
+                    lots.append([value, tainted_values[edge_id]])
+                elif tainted_values[edge_id] > 0:
+                    poisoned = True
+                continue
+
+            if self.policy == "haircut":
+                # Spending more than the traced balance means clean funds from elsewhere
+                balance = max(balance, value)
+                carried = tainted * value // balance if balance else 0
+            elif self.policy == "fifo":
+                remaining, carried = value, 0
+                while remaining > 0 and lots:
+                    lot = lots[0]
+                    take = min(lot[0], remaining)
+                    lot_tainted = lot[1] * take // lot[0]
+                    carried += lot_tainted
+                    lot[0] -= take
+                    lot[1] -= lot_tainted
+                    remaining -= take
+                    if lot[0] == 0:
+                        lots.popleft()
+            else:
+                carried = value if poisoned else 0
+            balance = max(balance - value, 0)
+            tainted = max(tainted - carried, 0)
+            if tainted_values[edge_id] != carried:
+                self._set_tainted(edge_id, carried)
+                changed.append(edge_id)
+        if self.policy == "fifo":
+            tainted = sum(lot[1] for lot in lots)
+        self._balance[pool] = balance
+        self._tainted[pool] = tainted
+        return changed
+
+    def refresh(self) -> int:
+        """
+        Bring all taint values up to date.
+
+        Returns:
+            int: Number of pool recomputations
+        """
+        heap = [(key, pool) for pool, key in self._dirty.items()]
+        heapq.heapify(heap)
+        passes = 0
+        limit = self.MAX_PASSES * max(len(self.pools), 1)
+        while heap:
+            key, pool = heapq.heappop(heap)
+            if self._dirty.get(pool) != key:
+                continue  # superseded by an earlier mark
+            del self._dirty[pool]
+            passes += 1
+            if passes > limit:
+                logger.warning("Taint propagation did not settle after {} passes", passes)
+                self._dirty.clear()
+                break
+            for edge_id in self._replay(pool):
+                to_pool = int(self._to_pool[edge_id])
+                edge_key = self._keys[edge_id]
+                self._mark(to_pool, edge_key)
+                if self._dirty.get(to_pool) == edge_key:
+                    heapq.heappush(heap, (edge_key, to_pool))
+        return passes
+
+    def edge_taint(self, edge_id: int) -> Dict[str, Any]:
+        """
+        Taint of one transfer.
+
+        Returns:
+            Dict[str, Any]: Tainted share ("ratio"), tainted amount in whole tokens ("tainted")
+                and exactly in base units ("tainted_value", a decimal string)
+        """
+        self.refresh()
+        if edge_id not in self._keys:
+            return {"ratio": 0.0, "tainted": 0.0, "tainted_value": "0"}
+        value, tainted = self._value[edge_id], self._tainted_value[edge_id]
+        return {
+            "ratio": tainted / value if value else 0.0,
+            "tainted": from_base_units(tainted, int(self._decimals[edge_id])),
+            "tainted_value": str(tainted)
+        }
+
+    def wallet_taint(self, wallet: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Balance and tainted balance a wallet is left with after all traced transfers, per token.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Token to {"balance", "tainted"} in whole tokens plus
+                "tainted_value", exact in base units as a decimal string
+        """
+        self.refresh()
+        pools = {(token, decimals): pool for (pool_wallet, token, decimals), pool in self._pool_ids.items()
+                 if pool_wallet == wallet}
+        names = token_labels(pools)
+        return {
+            names[token]: {
+                "balance": from_base_units(self._balance[pool], token[1]),
+                "tainted": from_base_units(self._tainted[pool], token[1]),
+                "tainted_value": str(self._tainted[pool])
+            }
+            for token, pool in pools.items()
+        }
+
+    def tainted_edges(self, min_tainted: float = 0.0) -> np.ndarray:
+        """
+        Edge ids carrying at least `min_tainted` tainted tokens.
+
+        Useful as a pruning threshold: branches below it are not worth following.
+        """
+        self.refresh()
+        tainted = self._tainted_tokens
+        known = self._to_pool >= 0
+        return np.flatnonzero(known & (tainted >= min_tainted) & (tainted > 0))
+
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the engine in bytes."""
+        arrays = self._tainted_tokens.nbytes + self._decimals.nbytes + self._to_pool.nbytes
+        # List slots plus the int objects of exact amounts
+        values = len(self._value) * 16 + len(self._keys) * 2 * 36
+        return arrays + values + len(self._keys) * 250 + len(self.pools) * 200
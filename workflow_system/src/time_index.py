@@ -0,0 +1,183 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
+
+from .amounts import token_labels
+from .detectors import estimate_block
+
+# Open-ended bounds of a block range
+MIN_BLOCK = 0
+MAX_BLOCK = 2 ** 62
+
+class TimeIndex:
+    """
+    Block-ordered index over a workflow's transfers for time-bounded queries.
+
+    Transfers arrive in crawl order, not block order. Each wallet keeps its
+    transfers (sent and received) in two parallel arrays sorted by block,
+    kept sorted by binary insertion; since crawls mostly move forward in
+    time the insert is usually an append. The workflow-wide order is a NumPy
+    array of edge ids merged with the transfers added since the last query,
+    so ingestion never pays for sorting. A query for blocks [a, b] then
+    bisects to the slice it returns and touches nothing outside of it.
+
+    Transfers without a block number are placed at the block estimated from
+    their timestamp, like the pattern detectors do. Tokens are told apart by
+    ticker and decimals.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Args:
+            initial_capacity (int): Number of transfers allocated up front
+        """
+        self._block = np.zeros(initial_capacity, dtype=np.int64)
+        self._amount = np.zeros(initial_capacity, dtype=np.float64)
+        self._token = np.zeros(initial_capacity, dtype=np.int16)
+        # Token id -> (ticker, decimals)
+        self._token_ids: Dict[Tuple[str, int], int] = {}
+        self.tokens: List[Tuple[str, int]] = []
+
+        # Wallet -> (blocks, edge ids), both sorted by block
+        self._wallets: Dict[str, Tuple[array, array]] = {}
+        # Edge ids sorted by block, plus the ones added since the last merge
+        self._order = np.zeros(0, dtype=np.int64)
+        self._pending: List[int] = []
+
+    def _grow(self, edge_id: int) -> None:
+        if edge_id < len(self._block):
+            return
+        size = max(edge_id + 1, 2 * len(self._block))
+        for name in ("_block", "_amount", "_token"):
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def add_transfer(self, edge_id: int, from_wallet: str, to_wallet: str, token: str, decimals: int,
+                     amount: float, block: int, timestamp: int) -> None:
+        """
+        Index a transfer edge.
+
+        Args:
+            edge_id (int): Internal ID of the transfer's edge
+            from_wallet (str): Sending wallet
+            to_wallet (str): Receiving wallet
+            token (str): Token ticker
+            decimals (int): Decimals of the token
+            amount (float): Amount in whole tokens
+            block (int): Block number, 0 when unknown
+            timestamp (int): Epoch seconds, used when the block is unknown
+        """
+        position = block or estimate_block(timestamp)
+        self._grow(edge_id)
+        self._block[edge_id] = position
+        self._amount[edge_id] = amount
+        token_id = self._token_ids.get((token, decimals))
+        if token_id is None:
+            token_id = self._token_ids[token, decimals] = len(self.tokens)
+            self.tokens.append((token, decimals))
+        self._token[edge_id] = token_id
+        self._pending.append(edge_id)
+        for wallet in (from_wallet, to_wallet) if from_wallet != to_wallet else (from_wallet,):
+            entry = self._wallets.get(wallet)
+            if entry is None:
+                entry = self._wallets[wallet] = (array("q"), array("q"))
+            blocks, edge_ids = entry
+            if not blocks or blocks[-1] <= position:
+                blocks.append(position)
+                edge_ids.append(edge_id)
+            else:
+                at = bisect_right(blocks, position)
+                blocks.insert(at, position)
+                edge_ids.insert(at, edge_id)
+
+    def _sorted(self) -> np.ndarray:
+        """All indexed edge ids in block order, merging in the pending ones."""
+        if self._pending:
+            pending = np.array(self._pending, dtype=np.int64)
+            pending = pending[np.argsort(self._block[pending], kind="stable")]
+            at = np.searchsorted(self._block[self._order], self._block[pending], side="right")
+            self._order = np.insert(self._order, at, pending)
+            self._pending.clear()
+        return self._order
+
+    def transfers(self, start_block: Optional[int] = None, end_block: Optional[int] = None,
+                  wallet: Optional[str] = None) -> np.ndarray:
+        """
+        Transfers in blocks [start_block, end_block], oldest first.
+
+        Args:
+            start_block (Optional[int]): First block, None for no lower bound
+            end_block (Optional[int]): Last block (inclusive), None for no upper bound
+            wallet (Optional[str]): Only transfers sent or received by this wallet
+
+        Returns:
+            np.ndarray: Edge ids of the transfers
+        """
+        start = MIN_BLOCK if start_block is None else start_block
+        end = MAX_BLOCK if end_block is None else end_block
+        if wallet is not None:
+            entry = self._wallets.get(wallet)
+            if entry is None:
+                return np.zeros(0, dtype=np.int64)
+            blocks, edge_ids = entry
+            return np.frombuffer(edge_ids, dtype=np.int64)[bisect_left(blocks, start):bisect_right(blocks, end)].copy()
+        order = self._sorted()
+        blocks = self._block[order]
+        return order[np.searchsorted(blocks, start, side="left"):np.searchsorted(blocks, end, side="right")]
+
+    def aggregate(self, edge_ids: np.ndarray, window: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Per-token totals of transfers in block order, with the busiest sliding window.
+
+        Args:
+            edge_ids (np.ndarray): Transfers as returned by `transfers`
+            window (Optional[int]): Width of the sliding window in blocks, None to skip it
+
+        Returns:
+            Dict[str, Any]: Count, first and last block, and per token the count, volume and,
+                with `window`, the window of that many blocks moving the largest volume
+        """
+        blocks = self._block[edge_ids]
+        amounts = self._amount[edge_ids]
+        tokens = self._token[edge_ids]
+        token_ids = np.unique(tokens)
+        names = token_labels(self.tokens[token_id] for token_id in token_ids)
+        per_token = {}
+        for token_id in token_ids:
+            mask = tokens == token_id
+            token_blocks, token_amounts = blocks[mask], amounts[mask]
+            entry = {
+                "transfers": int(mask.sum()),
+                "volume": float(token_amounts.sum()),
+                "first_block": int(token_blocks[0]),
+                "last_block": int(token_blocks[-1])
+            }
+            if window:
+                # Volume of the trailing window ending at each transfer from prefix sums
+                prefix = np.concatenate(([0.0], np.cumsum(token_amounts)))
+                starts = np.searchsorted(token_blocks, token_blocks - window + 1, side="left")
+                ends = np.arange(1, len(token_blocks) + 1)
+                volumes = prefix[ends] - prefix[starts]
+                best = int(np.argmax(volumes))
+                entry["peak_window"] = {
+                    "first_block": int(token_blocks[starts[best]]),
+                    "last_block": int(token_blocks[best]),
+                    "transfers": int(ends[best] - starts[best]),
+                    "volume": float(volumes[best])
+                }
+            per_token[names[self.tokens[token_id]]] = entry
+        return {
+            "transfers": len(edge_ids),
+            "first_block": int(blocks[0]) if len(blocks) else None,
+            "last_block": int(blocks[-1]) if len(blocks) else None,
+            "tokens": per_token
+        }
+
+    def memory_usage(self) -> int:
+        """Estimate the memory held by the index in bytes."""
+        columns = self._block.nbytes + self._amount.nbytes + self._token.nbytes + self._order.nbytes
+        entries = sum(len(blocks) for blocks, _ in self._wallets.values())
+        return columns + entries * 16 + len(self._wallets) * 250 + len(self._pending) * 36
@@ -1,18 +1,40 @@
+import threading
+import time
 from datetime import datetime, UTC
-from typing import Optional, Dict, Any
+from functools import wraps
+from typing import Optional, Dict, Any, Mapping
 from loguru import logger
-import aiohttp
 
 from config import CONFIGS
 from .models import (
     WorkflowStatus,
     TransactionType,
     TransactionInput,
-    Node,
-    Edge,
-    LogType
+    LogType,
+    PatternKind
 )
+from .records import NodeRecord, EdgeRecord
+from .amounts import to_base_units
+from .graph_store import create_graph_store, parse_timestamp
+from .graph_index import GraphIndex
+from .taint import TaintEngine
+from .time_index import TimeIndex
+from .detectors import PatternDetector, Finding
+from .screening import get_screening
+from .entities import EntityClusters
 from .buffer import WorkflowBuffer
+from .activity_log import ActivityLog
+from .http_client import http_client
+from .snapshot import SnapshotCache
+from .metrics import ADD_TRANSACTION_SECONDS, BUFFER_FLUSH_ITEMS
+
+def synchronized(method):
+    """Run a Workflow method while holding the workflow's lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class Workflow:
     """
@@ -20,9 +42,17 @@ class Workflow:
     
     This class serves as a boilerplate for specific workflow implementations.
     It provides basic workflow functionality and status management.
+    
+    Concurrency model: every method that mutates the graph, the status or the
+    buffer holds the workflow's reentrant lock, so a workflow can be fed from
+    HTTP handlers, the change stream and worker threads at the same time.
+    `get_buffer` swaps in a fresh buffer under the lock and serializes the
+    old one outside of it, so readers never block ingestion for long and no
+    change is lost or delivered twice.
     """
     
-    def __init__(self, workflow_id: str, name: str, parameters: Optional[Dict[str, Any]] = None):
+    def __init__(self, workflow_id: str, name: str, parameters: Optional[Dict[str, Any]] = None,
+                 graph_store: Optional[str] = None, taint_policy: Optional[str] = None):
         """
         Initialize a new workflow instance.
         
@@ -30,7 +60,12 @@ class Workflow:
             workflow_id (str): Unique identifier for the workflow
             name (str): Name of the workflow
             parameters (Optional[Dict[str, Any]]): Optional parameters for the workflow
+            graph_store (Optional[str]): Graph store kind ("records" or "columnar"),
+                defaults to CONFIGS.WORKFLOW.GRAPH_STORE
+            taint_policy (Optional[str]): Taint policy ("haircut", "fifo" or "poison"),
+                defaults to CONFIGS.WORKFLOW.TAINT_POLICY
         """
+        self.lock = threading.RLock()
         self.workflow_id = workflow_id
         self.name = name
         self.parameters = parameters or {}
@@ -41,15 +76,37 @@ class Workflow:
         self.error: Optional[str] = None
         
         # Graph structure
-        self.nodes: Dict[int, Node] = {}
-        self.edges: Dict[int, Edge] = {}
+        self.store = create_graph_store(graph_store or CONFIGS.WORKFLOW.GRAPH_STORE)
+        self.nodes: Mapping[int, NodeRecord] = self.store.nodes
+        self.edges: Mapping[int, EdgeRecord] = self.store.edges
+        self.index = GraphIndex(self.nodes, self.edges)
+        self.taint = TaintEngine(taint_policy or CONFIGS.WORKFLOW.TAINT_POLICY)
+        self.timeline = TimeIndex()
+        self.detectors = PatternDetector(CONFIGS.DETECTORS) if CONFIGS.DETECTORS.ENABLED else None
+        self.screening = get_screening()
+        settings = CONFIGS.ENTITY_CLUSTERING
+        self.entities = EntityClusters(settings.GAS_TOPUP_MAX, settings.NATIVE_TOKEN) if settings.ENABLED else None
+        # Wallets screened so far, each is checked once; alerts raised on listed ones
+        self._screened: set = set()
+        self.alerts: list = []
         
-        # ID counters
-        self._next_node_id = 1
-        self._next_edge_id = 1
+        # Lookup indexes: first node created for each wallet, transaction edge for each hash.
+        # One transaction can move ETH and several tokens: token transfers are keyed
+        # "hash:log_index", and the first one of a hash stands in for it when the
+        # transaction moved no ETH
+        self._wallet_nodes: Dict[str, int] = {}
+        self._hash_edges: Dict[str, int] = {}
+        self._token_hash_edges: Dict[str, int] = {}
         
-        # Initialize buffer
+        # Incremented on every change; identifies cached snapshots
+        self.version = 0
+        self.last_activity = time.monotonic()
+        self.closed = False
+        self.snapshot_cache = SnapshotCache(self)
+        
+        # Initialize buffer; per-item activity is aggregated into periodic summaries
         self.buffer = WorkflowBuffer()
+        self.activity = ActivityLog(CONFIGS.WORKFLOW.LOG_SUMMARY_EVERY)
         
         logger.info(f"Created new workflow: {self.name} (ID: {self.workflow_id})")
         self.buffer.add_log(f"Created new workflow: {self.name} (ID: {self.workflow_id})", LogType.INFO)
@@ -70,24 +127,24 @@ class Workflow:
             return True
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # Send initial request to AI agent system
-                async with session.post(
-                    "http://localhost:8001/agent/start",
-                    json={
-                        "workflow_id": self.workflow_id,
-                        "input": input_data
-                    }
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise Exception(f"Failed to start AI agent process: {error_text}")
-                    
-                    # Update status to processing
-                    self.update_status(WorkflowStatus.PROCESSING)
-                    logger.info(f"Started workflow {self.workflow_id}")
-                    self.buffer.add_log(f"Started workflow {self.workflow_id}", LogType.INFO)
-                    return True
+            session = await http_client.get_session()
+            # Send initial request to AI agent system
+            async with session.post(
+                f"{CONFIGS.AI_AGENT.url}/agent/start",
+                json={
+                    "workflow_id": self.workflow_id,
+                    "input": input_data
+                }
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise Exception(f"Failed to start AI agent process: {error_text}")
+                
+                # Update status to processing
+                self.update_status(WorkflowStatus.PROCESSING)
+                logger.info(f"Started workflow {self.workflow_id}")
+                self.buffer.add_log(f"Started workflow {self.workflow_id}", LogType.INFO)
+                return True
             
         except Exception as e:
             self.error = str(e)
@@ -96,7 +153,9 @@ class Workflow:
             self.buffer.add_log(f"Failed to start workflow {self.workflow_id}: {str(e)}", LogType.ERROR)
             return False
     
-    def add_node(self, wallet: str, blockchain: str, link_etherscan: str) -> Node:
+    @synchronized
+    def add_node(self, wallet: str, blockchain: str, link_etherscan: str,
+                 label: Optional[Dict[str, str]] = None) -> NodeRecord:
         """
         Add a new node to the workflow graph.
         
@@ -104,26 +163,25 @@ class Workflow:
             wallet (str): Wallet address
             blockchain (str): Blockchain identifier
             link_etherscan (str): Etherscan link for the wallet
+            label (Optional[Dict[str, str]]): Category and name of a known wallet
             
         Returns:
-            Node: The created node
+            NodeRecord: The created node
         """
-        node = Node(
-            internal_id=self._next_node_id,
-            wallet=wallet,
-            blockchain=blockchain,
-            link_etherscan=link_etherscan
-        )
-        self.nodes[node.internal_id] = node
-        self._next_node_id += 1
-        logger.info(f"Added node to workflow {self.workflow_id}: {wallet} (ID: {node.internal_id})")
+        node = self.store.add_node(wallet, blockchain, link_etherscan, label)
+        self._wallet_nodes.setdefault(wallet, node.internal_id)
+        self.index.add_node(node)
+        self._touch()
+        self.activity.nodes += 1
+        logger.debug("Added node to workflow {}: {} (ID: {})", self.workflow_id, wallet, node.internal_id)
         self.buffer.add_node(node)
-        self.buffer.add_log(f"Added node to workflow {self.workflow_id}: {wallet} (ID: {node.internal_id})", LogType.INFO)
         return node
     
+    @synchronized
     def add_edge(self, from_node_id: int, to_node_id: int, sum: float, ticker_token: str,
-                 type: TransactionType, date: datetime, hash: str, etherscan_link: str,
-                 extra: Optional[Dict[str, Any]] = None) -> Edge:
+                 type: TransactionType, date: str, hash: str, etherscan_link: str,
+                 extra: Optional[Dict[str, Any]] = None, parent_edge_id: Optional[int] = None,
+                 value: int = 0, decimals: int = 18) -> EdgeRecord:
         """
         Add a new edge to the workflow graph.
         
@@ -133,13 +191,16 @@ class Workflow:
             sum (float): Transaction amount
             ticker_token (str): Token ticker
             type (TransactionType): Edge type (duplicate or transaction)
-            date (datetime): Transaction date
+            date (str): Transaction date
             hash (str): Transaction hash
             etherscan_link (str): Etherscan link for the transaction
             extra (Optional[Dict[str, Any]]): Additional edge data
+            parent_edge_id (Optional[int]): Transaction edge whose funds this edge spends
+            value (int): Exact amount in the token's base units
+            decimals (int): Decimals of the token
             
         Returns:
-            Edge: The created edge
+            EdgeRecord: The created edge
             
         Raises:
             ValueError: If either from_node_id or to_node_id doesn't exist
@@ -150,26 +211,26 @@ class Workflow:
         if to_node_id not in self.nodes:
             raise ValueError(f"Target node with ID {to_node_id} not found")
         
-        edge = Edge(
-            internal_id=self._next_edge_id,
-            from_node_id=from_node_id,
-            to_node_id=to_node_id,
-            sum=sum,
-            ticker_token=ticker_token,
-            type=type,
-            date=date,
-            hash=hash,
-            etherscan_link=etherscan_link,
-            extra=extra
-        )
-        self.edges[edge.internal_id] = edge
-        self._next_edge_id += 1
-        logger.info(f"Added edge to workflow {self.workflow_id}: {hash} (ID: {edge.internal_id})")
+        edge = self.store.add_edge(from_node_id, to_node_id, sum, ticker_token, type, date, hash,
+                                   etherscan_link, extra, self.index.child_depth(parent_edge_id),
+                                   value, decimals)
+        self.index.add_edge(edge, parent_edge_id)
+        self._touch()
+        if type == TransactionType.TRANSACTION:
+            log_index = extra.get("log_index") if extra else None
+            if log_index is None:
+                self._hash_edges.setdefault(hash, edge.internal_id)
+            else:
+                self._hash_edges.setdefault(f"{hash}:{log_index}", edge.internal_id)
+                self._token_hash_edges.setdefault(hash, edge.internal_id)
+        self.activity.edges += 1
+        logger.debug("Added edge to workflow {}: {} (ID: {})", self.workflow_id, hash, edge.internal_id)
         self.buffer.add_edge(edge)
-        self.buffer.add_log(f"Added edge to workflow {self.workflow_id}: {hash} (ID: {edge.internal_id})", LogType.INFO)
         return edge
     
-    def add_transaction(self, transaction: TransactionInput) -> Edge:
+    @ADD_TRANSACTION_SECONDS.time()
+    @synchronized
+    def add_transaction(self, transaction: TransactionInput) -> EdgeRecord:
         """
         Add a transaction to the workflow, creating necessary nodes if they don't exist.
         
@@ -177,55 +238,69 @@ class Workflow:
             transaction (TransactionInput): Transaction data
             
         Returns:
-            Edge: The created edge representing the transaction
+            EdgeRecord: The created edge representing the transaction
         """
+        prev_edge_id = None
+        from_label = transaction.from_label.model_dump() if transaction.from_label else None
+        to_label = transaction.to_label.model_dump() if transaction.to_label else None
         if transaction.prev_hash:
-            from_node_id = next((edge.to_node_id for edge in self.edges.values() if edge.hash == transaction.prev_hash), None)
+            prev_edge_id = self._find_transaction_edge(transaction.prev_hash, transaction.prev_log_index)
+            from_node_id = self.edges[prev_edge_id].to_node_id if prev_edge_id else None
             # Find or create source node
             from_node = self.nodes.get(from_node_id, None)
             if not from_node:
                 from_node = self.add_node(
                     wallet=transaction.from_wallet,
                     blockchain=transaction.from_blockchain,
-                    link_etherscan=f"https://etherscan.io/address/{transaction.from_wallet}"
+                    link_etherscan=f"https://etherscan.io/address/{transaction.from_wallet}",
+                    label=from_label
                 )
         else:
-            from_node = next(
-                (node for node in self.nodes.values() if node.wallet == transaction.from_wallet),
-                None
-            )
+            from_node = self.nodes.get(self._wallet_nodes.get(transaction.from_wallet))
             if not from_node:
                 from_node = self.add_node(
                     wallet=transaction.from_wallet,
                     blockchain=transaction.from_blockchain,
-                    link_etherscan=f"https://etherscan.io/address/{transaction.from_wallet}"
+                    link_etherscan=f"https://etherscan.io/address/{transaction.from_wallet}",
+                    label=from_label
                 )
         
         # Find or create target node
-        to_node = next(
-            (node for node in self.nodes.values() if node.wallet == transaction.to_wallet),
-            None
-        )
+        to_node = self.nodes.get(self._wallet_nodes.get(transaction.to_wallet))
         if not to_node:
             to_node = self.add_node(
                 wallet=transaction.to_wallet,
                 blockchain=transaction.to_blockchain,
-                link_etherscan=f"https://etherscan.io/address/{transaction.to_wallet}"
+                link_etherscan=f"https://etherscan.io/address/{transaction.to_wallet}",
+                label=to_label
             )
         else:
             to_node = self.add_node(
                 wallet=transaction.to_wallet,
                 blockchain=transaction.to_blockchain,
-                link_etherscan=f"https://etherscan.io/address/{transaction.to_wallet}"
+                link_etherscan=f"https://etherscan.io/address/{transaction.to_wallet}",
+                label=to_label
             )
             self.add_edge(
                 from_node_id=from_node.internal_id,
                 to_node_id=to_node.internal_id,
+                sum=0.0,
                 ticker_token=transaction.ticker_token,
                 type=TransactionType.DUPLICATE,
+                date=transaction.date,
+                hash=transaction.hash,
+                etherscan_link=f"https://etherscan.io/tx/{transaction.hash}",
+                parent_edge_id=prev_edge_id,
+                decimals=transaction.decimals
             )
         
-        # Create edge with transaction data
+        # Create edge with transaction data; older clients only send the float amount
+        value = transaction.value
+        if value is None:
+            value = to_base_units(transaction.sum, transaction.decimals)
+        transaction_extra = {"prev_hash": transaction.prev_hash}
+        if transaction.log_index is not None:
+            transaction_extra["log_index"] = transaction.log_index
         edge = self.add_edge(
             from_node_id=from_node.internal_id,
             to_node_id=to_node.internal_id,
@@ -235,13 +310,40 @@ class Workflow:
             date=transaction.date,
             hash=transaction.hash,
             etherscan_link=f"https://etherscan.io/tx/{transaction.hash}",
-            extra={"prev_hash": transaction.prev_hash}
+            extra=transaction_extra,
+            parent_edge_id=prev_edge_id,
+            value=value,
+            decimals=transaction.decimals
         )
+        # Within a known block arrival order is good enough; the date only orders transfers without one
+        block = transaction.block_number or 0
+        timestamp = 0 if block else parse_timestamp(transaction.date)
+        self.taint.add_transfer(edge.internal_id, transaction.from_wallet, transaction.to_wallet,
+                                transaction.ticker_token, value, transaction.decimals, block, timestamp,
+                                is_seed=transaction.prev_hash is None)
+        self.timeline.add_transfer(edge.internal_id, transaction.from_wallet, transaction.to_wallet,
+                                   transaction.ticker_token, transaction.decimals, transaction.sum, block, timestamp)
+        if self.detectors:
+            for finding in self.detectors.add_transfer(edge.internal_id, prev_edge_id, transaction.from_wallet,
+                                                       transaction.to_wallet, transaction.ticker_token,
+                                                       transaction.sum, block, timestamp):
+                self._report_finding(finding)
+        if self.entities:
+            self.entities.add_transfer(transaction.from_wallet, transaction.to_wallet, transaction.ticker_token,
+                                       transaction.sum, from_label, to_label)
+        for wallet, label, node in ((transaction.from_wallet, from_label, from_node),
+                                    (transaction.to_wallet, to_label, to_node)):
+            if wallet not in self._screened:
+                self._screened.add(wallet)
+                self._screen(wallet, label, node.internal_id, edge)
         
-        logger.info(f"Added transaction to workflow {self.workflow_id}: {transaction.hash}")
-        self.buffer.add_log(f"Added transaction to workflow {self.workflow_id}: {transaction.hash}", LogType.INFO)
+        self.activity.transactions += 1
+        logger.debug("Added transaction to workflow {}: {}", self.workflow_id, transaction.hash)
+        if self.activity.is_due():
+            self._log_activity()
         return edge
     
+    @synchronized
     def update_status(self, new_status: WorkflowStatus) -> None:
         """
         Update the workflow status and timestamp.
@@ -251,17 +353,103 @@ class Workflow:
         """
         self.status = new_status
         self.updated_at = datetime.now(UTC)
+        self._touch()
         logger.info(f"Workflow {self.workflow_id} status updated to: {new_status.value}")
         self.buffer.set_status(new_status)
         self.buffer.add_log(f"Workflow {self.workflow_id} status updated to: {new_status.value}", LogType.INFO)
     
+    @synchronized
+    def cancel(self, reason: str) -> None:
+        """
+        Cancel the workflow.
+        
+        Args:
+            reason (str): Why the workflow was canceled, stored as its error
+        """
+        self.error = reason
+        self.update_status(WorkflowStatus.CANCELED)
+        logger.warning(f"Canceled workflow {self.workflow_id}: {reason}")
+        self.buffer.add_log(f"Canceled workflow {self.workflow_id}: {reason}", LogType.WARNING)
+    
+    def close(self) -> None:
+        """
+        Mark the workflow as closed so open event streams terminate.
+        """
+        self.closed = True
+    
+    def age(self) -> float:
+        """Seconds since the workflow was created."""
+        return (datetime.now(UTC) - self.created_at).total_seconds()
+    
+    def idle_time(self) -> float:
+        """Seconds since the workflow last changed."""
+        return time.monotonic() - self.last_activity
+    
+    def memory_usage(self) -> int:
+        """
+        Estimate the memory held by the workflow's graph.
+        
+        Returns:
+            int: Approximate size in bytes of the graph store and traversal indexes
+        """
+        usage = self.store.memory_usage() + self.index.memory_usage() + self.taint.memory_usage()
+        usage += self.timeline.memory_usage()
+        if self.detectors:
+            usage += self.detectors.memory_usage()
+        if self.entities:
+            usage += self.entities.memory_usage()
+        return usage
+    
+    def _log_activity(self) -> None:
+        """Emit the aggregated activity since the last summary to the log and the buffer."""
+        message = self.activity.summary()
+        if message:
+            logger.info("Workflow {}: {}", self.workflow_id, message)
+            self.buffer.add_log(message, LogType.INFO)
+    
+    def _report_finding(self, finding: Finding) -> None:
+        """Emit a detected pattern to the log and the buffer so it shows up live."""
+        logger.info("Workflow {}: {}", self.workflow_id, finding.message)
+        self.buffer.add_log(finding.message, LogType.WARNING)
+    
+    def _screen(self, wallet: str, label: Optional[Dict[str, str]], node_id: int, edge: EdgeRecord) -> None:
+        """Check a wallet against the watchlists (and its sanctioned label) and raise an alert on a hit."""
+        listed = self.screening.check(wallet) if self.screening else None
+        if listed is None and label and label["category"] == "sanctioned":
+            listed = f"sanctioned label ({label['name']})"
+        if listed is None:
+            return
+        alert = {
+            "wallet": wallet,
+            "list": listed,
+            "node_id": node_id,
+            "edge_id": edge.internal_id,
+            "hash": edge.hash,
+            "timestamp": datetime.now(UTC).isoformat()
+        }
+        self.alerts.append(alert)
+        message = f"Screening hit: {wallet} is on {listed} (transaction {edge.hash})"
+        logger.warning("Workflow {}: {}", self.workflow_id, message)
+        self.buffer.add_alert(alert)
+        self.buffer.add_log(message, LogType.ERROR)
+    
+    def _touch(self) -> None:
+        """Record a change: bump the version and the activity timestamp."""
+        self.version += 1
+        self.last_activity = time.monotonic()
+    
     def get_buffer(self) -> dict:
         """
-        Get the workflow buffer.
+        Get the buffered changes and start a new buffer.
+        
+        The buffer is swapped atomically, so changes made while the old one is
+        being serialized land in the new buffer.
         """
-        result = self.buffer.to_dict()
-        self.buffer.clear()
-        return result
+        with self.lock:
+            self._log_activity()
+            buffer, self.buffer = self.buffer, WorkflowBuffer()
+        BUFFER_FLUSH_ITEMS.observe(len(buffer.new_nodes) + len(buffer.new_edges))
+        return buffer.to_dict()
 
     def has_changes(self) -> bool:
         """
@@ -272,45 +460,201 @@ class Workflow:
         """
         return self.buffer.has_changes()
 
-    def to_dict(self) -> Dict[str, Any]:
+    def get_transaction_edge_id(self, tx_hash: str) -> Optional[int]:
+        """
+        Get the internal ID of the transaction edge with the given hash.
+        
+        Args:
+            tx_hash (str): Transaction hash
+            
+        Returns:
+            Optional[int]: Edge ID if the transaction is in the workflow, None otherwise
+        """
+        return self._find_transaction_edge(tx_hash)
+
+    def _find_transaction_edge(self, tx_hash: str, log_index: Optional[int] = None) -> Optional[int]:
+        """
+        Find the transaction edge of a transfer.
+
+        Args:
+            tx_hash (str): Transaction hash
+            log_index (Optional[int]): Log index of a token transfer, None for the ETH transfer
+
+        Returns:
+            Optional[int]: Edge ID of the transfer; without a log index the ETH transfer of the
+                transaction, or its first token transfer if it moved no ETH
+        """
+        if log_index is not None:
+            edge_id = self._hash_edges.get(f"{tx_hash}:{log_index}")
+            if edge_id is not None:
+                return edge_id
+        edge_id = self._hash_edges.get(tx_hash)
+        return edge_id if edge_id is not None else self._token_hash_edges.get(tx_hash)
+
+    @synchronized
+    def node_taint(self, node_id: int) -> Dict[str, Any]:
+        """
+        Taint a node received and the tainted balance its wallet is left with.
+
+        Args:
+            node_id (int): Internal ID of the node
+
+        Returns:
+            Dict[str, Any]: Policy, taint of the node's incoming transfers and the wallet's balances per token
+        """
+        node = self.nodes[node_id]
+        received = {}
+        for edge_id in self.index.in_edges.get(node_id, ()):
+            edge = self.edges[edge_id]
+            if edge.type == TransactionType.TRANSACTION:
+                received[edge.hash] = {"ticker_token": edge.ticker_token, "sum": edge.sum,
+                                       **self.taint.edge_taint(edge_id)}
+        return {
+            "node_id": node_id,
+            "wallet": node.wallet,
+            "policy": self.taint.policy,
+            "received": received,
+            "wallet_balance": self.taint.wallet_taint(node.wallet)
+        }
+
+    @synchronized
+    def tainted_nodes(self, min_tainted: float = 0.0, limit: int = 1000) -> list:
+        """
+        Nodes that received at least `min_tainted` tainted tokens in one transfer, most tainted first.
+
+        Args:
+            min_tainted (float): Pruning threshold in whole tokens
+            limit (int): Maximum number of nodes returned
+
+        Returns:
+            list: Node id, wallet, transaction hash, token and tainted amount per entry
+        """
+        result = []
+        for edge_id in self.taint.tainted_edges(min_tainted):
+            edge = self.edges[int(edge_id)]
+            result.append({
+                "node_id": edge.to_node_id,
+                "wallet": self.nodes[edge.to_node_id].wallet,
+                "hash": edge.hash,
+                "ticker_token": edge.ticker_token,
+                **self.taint.edge_taint(int(edge_id))
+            })
+        result.sort(key=lambda entry: entry["tainted"], reverse=True)
+        return result[:limit]
+
+    @synchronized
+    def findings(self, kind: Optional[PatternKind] = None) -> list:
+        """
+        Patterns detected so far, in the order they were found.
+
+        Args:
+            kind (Optional[PatternKind]): Only return patterns of this kind
+
+        Returns:
+            list: Kind, wallet, token, transfer edge ids, block and details per finding
+        """
+        if not self.detectors:
+            return []
+        return [finding.to_dict() for finding in self.detectors.findings if kind is None or finding.kind == kind]
+
+    @synchronized
+    def node_entity(self, node_id: int) -> Dict[str, Any]:
+        """
+        Entity cluster of the wallet behind a node.
+
+        Args:
+            node_id (int): Internal ID of the node
+
+        Returns:
+            Dict[str, Any]: Entity id (None when entity clustering is off), member wallets and their node ids
+        """
+        wallet = self.nodes[node_id].wallet
+        entity_id = self.entities.cluster_id(wallet) if self.entities else None
+        wallets = self.entities.members(wallet) if self.entities else [wallet]
+        return {
+            "node_id": node_id,
+            "wallet": wallet,
+            "entity_id": entity_id,
+            "wallets": wallets,
+            "node_ids": [self._wallet_nodes[member] for member in wallets if member in self._wallet_nodes]
+        }
+
+    @synchronized
+    def entity_clusters(self, min_size: int = 2) -> list:
+        """
+        Entities of at least `min_size` wallets, largest first, for collapsing them in the graph.
+
+        Returns:
+            list: Entity id, member wallets and the first node id of each member per entity
+        """
+        if not self.entities:
+            return []
+        result = [
+            {
+                "entity_id": entity_id,
+                "wallets": wallets,
+                "node_ids": [self._wallet_nodes[wallet] for wallet in wallets if wallet in self._wallet_nodes]
+            }
+            for entity_id, wallets in self.entities.clusters(min_size).items()
+        ]
+        result.sort(key=lambda entity: len(entity["wallets"]), reverse=True)
+        return result
+
+    @synchronized
+    def time_slice(self, start_block: Optional[int] = None, end_block: Optional[int] = None,
+                   wallet: Optional[str] = None, window: Optional[int] = None, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Transfers within a block range, optionally of one wallet, with their per-token aggregates.
+
+        Args:
+            start_block (Optional[int]): First block, None for no lower bound
+            end_block (Optional[int]): Last block (inclusive), None for no upper bound
+            wallet (Optional[str]): Only transfers sent or received by this wallet
+            window (Optional[int]): Width in blocks of the sliding window reported as each token's peak
+            limit (int): Maximum number of edges returned; aggregates cover the whole range
+
+        Returns:
+            Dict[str, Any]: Count, block range and per-token totals, plus the edges in block order
+        """
+        edge_ids = self.timeline.transfers(start_block, end_block, wallet)
+        return {
+            **self.timeline.aggregate(edge_ids, window),
+            "edges": [self.edges[int(edge_id)].to_dict() for edge_id in edge_ids[:limit]]
+        }
+
+    def graph_stats(self) -> Dict[str, Any]:
+        """
+        Compute whole-graph statistics (total flow per token, degrees, depth distribution, time range).
+        
+        Returns:
+            Dict[str, Any]: Statistics computed by the workflow's graph store
+        """
+        return self.store.stats()
+
+    @synchronized
+    def to_dict(self, include_graph: bool = True) -> Dict[str, Any]:
         """
         Convert the workflow instance to a dictionary.
         
+        Args:
+            include_graph (bool): Include nodes, edges and the pending buffer
+        
         Returns:
             Dict[str, Any]: Dictionary representation of the workflow
         """
-        return {
+        data = {
             "workflow_id": self.workflow_id,
             "name": self.name,
             "parameters": self.parameters,
             "status": self.status.value,
+            "version": self.version,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
             "result": self.result,
-            "error": self.error,
-            "nodes": {
-                node_id: {
-                    "internal_id": node.internal_id,
-                    "wallet": node.wallet,
-                    "blockchain": node.blockchain,
-                    "link_etherscan": node.link_etherscan
-                }
-                for node_id, node in self.nodes.items()
-            },
-            "edges": {
-                edge_id: {
-                    "internal_id": edge.internal_id,
-                    "from_node_id": edge.from_node_id,
-                    "to_node_id": edge.to_node_id,
-                    "sum": edge.sum,
-                    "ticker_token": edge.ticker_token,
-                    "type": edge.type.value,
-                    "date": edge.date.isoformat(),
-                    "hash": edge.hash,
-                    "etherscan_link": edge.etherscan_link,
-                    "extra": edge.extra
-                }
-                for edge_id, edge in self.edges.items()
-            },
-            "buffer": self.buffer.to_dict()
+            "error": self.error
         }
+        if include_graph:
+            data["nodes"] = {node_id: node.to_dict() for node_id, node in self.nodes.items()}
+            data["edges"] = {edge_id: edge.to_dict() for edge_id, edge in self.edges.items()}
+            data["buffer"] = self.buffer.to_dict()
+        return data
@@ -1,7 +1,12 @@
+import asyncio
+import threading
 from typing import Dict, Optional, List, Any
 from loguru import logger
+from config import CONFIGS
 from .workflow import Workflow, WorkflowStatus
-from .models import TransactionInput
+from .models import TransactionInput, TransactionBatchInput
+from .metrics import TRANSACTIONS_TOTAL, INGEST_BATCHES_IN_PROGRESS
+from .profiler import span
 
 class WorkflowManager:
     """
@@ -11,11 +16,14 @@ class WorkflowManager:
     - Storing and tracking all running workflows
     - Updating workflow statuses based on events from the AI agent system
     - Providing access to workflow statuses and information
+    - Reaping workflows that exceed their duration, idle or memory limits
     """
     
     def __init__(self):
         """Initialize the workflow manager with an empty workflow store."""
         self._workflows: Dict[str, Workflow] = {}
+        self._lock = threading.Lock()
+        self._reaper_task: Optional[asyncio.Task] = None
         logger.info("Initialized WorkflowManager")
     
     def add_workflow(self, workflow: Workflow) -> None:
@@ -28,10 +36,11 @@ class WorkflowManager:
         Raises:
             ValueError: If a workflow with the same ID already exists
         """
-        if workflow.workflow_id in self._workflows:
-            raise ValueError(f"Workflow with ID {workflow.workflow_id} already exists")
-        
-        self._workflows[workflow.workflow_id] = workflow
+        with self._lock:
+            if workflow.workflow_id in self._workflows:
+                raise ValueError(f"Workflow with ID {workflow.workflow_id} already exists")
+            
+            self._workflows[workflow.workflow_id] = workflow
         logger.info(f"Added new workflow: {workflow.name} (ID: {workflow.workflow_id})")
     
     def get_workflow(self, workflow_id: str) -> Optional[Workflow]:
@@ -53,7 +62,8 @@ class WorkflowManager:
         Returns:
             List[Workflow]: List of all workflow instances
         """
-        return list(self._workflows.values())
+        with self._lock:
+            return list(self._workflows.values())
     
     def update_workflow_status(self, workflow_id: str, new_status: WorkflowStatus) -> bool:
         """
@@ -98,12 +108,102 @@ class WorkflowManager:
         Returns:
             bool: True if the workflow was removed, False if it was not found
         """
-        if workflow_id in self._workflows:
-            del self._workflows[workflow_id]
+        with self._lock:
+            workflow = self._workflows.pop(workflow_id, None)
+        if workflow is not None:
+            workflow.close()
             logger.info(f"Removed workflow: {workflow_id}")
             return True
         return False
     
+    def reap(self) -> Dict[str, List[str]]:
+        """
+        Enforce workflow lifecycle limits.
+        
+        - Running workflows older than MAX_DURATION or idle longer than
+          IDLE_TIMEOUT are canceled.
+        - Finished workflows are evicted RETENTION seconds after their last change.
+        - While the estimated graph memory of all workflows exceeds
+          MEMORY_BUDGET_MB, the least recently active workflows are evicted,
+          finished ones first; running ones are canceled before eviction.
+        
+        Returns:
+            Dict[str, List[str]]: IDs of the canceled and evicted workflows
+        """
+        config = CONFIGS.WORKFLOW
+        canceled: List[str] = []
+        evicted: List[str] = []
+        
+        for workflow in self.get_all_workflows():
+            if workflow.status.is_terminal:
+                if workflow.idle_time() > config.RETENTION:
+                    evicted.append(workflow.workflow_id)
+                continue
+            if workflow.age() > config.MAX_DURATION:
+                workflow.cancel(f"Exceeded maximum duration of {config.MAX_DURATION}s")
+                canceled.append(workflow.workflow_id)
+            elif workflow.idle_time() > config.IDLE_TIMEOUT:
+                workflow.cancel(f"No activity for {config.IDLE_TIMEOUT}s")
+                canceled.append(workflow.workflow_id)
+        
+        for workflow_id in evicted:
+            self.remove_workflow(workflow_id)
+        
+        budget = config.MEMORY_BUDGET_MB * 1024 * 1024
+        workflows = self.get_all_workflows()
+        usage = {workflow.workflow_id: workflow.memory_usage() for workflow in workflows}
+        total = sum(usage.values())
+        if total > budget:
+            candidates = sorted(
+                workflows,
+                key=lambda workflow: (not workflow.status.is_terminal, workflow.last_activity)
+            )
+            for workflow in candidates:
+                if total <= budget:
+                    break
+                if not workflow.status.is_terminal:
+                    workflow.cancel("Evicted to stay within the workflow memory budget")
+                    canceled.append(workflow.workflow_id)
+                total -= usage[workflow.workflow_id]
+                self.remove_workflow(workflow.workflow_id)
+                evicted.append(workflow.workflow_id)
+        
+        if canceled or evicted:
+            logger.info(f"Reaper canceled {len(canceled)} and evicted {len(evicted)} workflows")
+        return {"canceled": canceled, "evicted": evicted}
+    
+    def start_reaper(self, interval: Optional[float] = None) -> None:
+        """
+        Start the background task that periodically calls `reap`.
+        
+        Args:
+            interval (Optional[float]): Seconds between runs, defaults to WORKFLOW.REAPER_INTERVAL
+        """
+        if self._reaper_task is not None and not self._reaper_task.done():
+            return
+        interval = interval or CONFIGS.WORKFLOW.REAPER_INTERVAL
+        
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    self.reap()
+                except Exception as e:
+                    logger.error(f"Error in workflow reaper: {str(e)}")
+        
+        self._reaper_task = asyncio.create_task(run())
+        logger.info(f"Started workflow reaper (interval: {interval}s)")
+    
+    async def stop_reaper(self) -> None:
+        """Stop the background reaper task."""
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
+    
     async def start_workflow(self, workflow_id: str, input_data: Dict[str, Any]) -> bool:
         """
         Start a workflow by sending initial request to AI agent system.
@@ -139,12 +239,72 @@ class WorkflowManager:
             return None
             
         try:
-            edge = workflow.add_transaction(transaction)
-            return edge.model_dump()
+            with span("add_transaction"):
+                edge = workflow.add_transaction(transaction)
+            TRANSACTIONS_TOTAL.labels("single", "accepted").inc()
+            return edge.to_dict()
         except Exception as e:
+            TRANSACTIONS_TOTAL.labels("single", "rejected").inc()
             logger.error(f"Error adding transaction to workflow {workflow_id}: {str(e)}")
             return None
 
+    def add_transactions(self, workflow_id: str, batch: TransactionBatchInput) -> Optional[Dict]:
+        """
+        Add a batch of transactions to a workflow.
+        
+        Transactions are applied in order; a failing transaction is reported
+        in the acknowledgement and does not stop the rest of the batch.
+        
+        Args:
+            workflow_id (str): ID of the workflow to add the transactions to
+            batch (TransactionBatchInput): Batch of transaction data to add
+            
+        Returns:
+            Optional[Dict]: Acknowledgement with accepted count and rejected entries, None if workflow not found
+        """
+        workflow = self.get_workflow(workflow_id)
+        if not workflow:
+            logger.error(f"Workflow not found: {workflow_id}")
+            return None
+        
+        accepted = 0
+        rejected = []
+        for index, transaction in enumerate(batch.transactions):
+            try:
+                with span("add_transaction"):
+                    workflow.add_transaction(transaction)
+                accepted += 1
+            except Exception as e:
+                logger.error(f"Error adding transaction to workflow {workflow_id}: {str(e)}")
+                rejected.append({"index": index, "hash": transaction.hash, "error": str(e)})
+        TRANSACTIONS_TOTAL.labels("batch", "accepted").inc(accepted)
+        TRANSACTIONS_TOTAL.labels("batch", "rejected").inc(len(rejected))
+        
+        return {
+            "batch_id": batch.batch_id,
+            "accepted": accepted,
+            "rejected": rejected
+        }
+
+    async def add_transactions_async(self, workflow_id: str, batch: TransactionBatchInput) -> Optional[Dict]:
+        """
+        Add a batch of transactions without stalling the event loop.
+        
+        Batches of at least WORKFLOW.THREADED_BATCH_SIZE transactions are applied
+        on a worker thread; the workflow lock serializes them with other writers.
+        
+        Args:
+            workflow_id (str): ID of the workflow to add the transactions to
+            batch (TransactionBatchInput): Batch of transaction data to add
+            
+        Returns:
+            Optional[Dict]: Acknowledgement with accepted count and rejected entries, None if workflow not found
+        """
+        with INGEST_BATCHES_IN_PROGRESS.track_inprogress():
+            if len(batch.transactions) >= CONFIGS.WORKFLOW.THREADED_BATCH_SIZE:
+                return await asyncio.to_thread(self.add_transactions, workflow_id, batch)
+            return self.add_transactions(workflow_id, batch)
+
     async def add_transaction_event(self, event: Dict[str, Any]) -> Optional[Dict]:
         """
         Process a transaction event from the MongoDB change stream.
@@ -172,6 +332,11 @@ class WorkflowManager:
                 logger.warning("Transaction document has no workflow_id field")
                 return None
             
+            # Every worker sees every change event; only the owner of the workflow applies it
+            if workflow_id not in self._workflows:
+                logger.debug(f"Skipping transaction event for workflow {workflow_id} not held by this worker")
+                return None
+            
             # Convert MongoDB document to TransactionInput
             transaction = TransactionInput(
                 from_blockchain=document.get('from_blockchain'),
@@ -182,13 +347,20 @@ class WorkflowManager:
                 sum=document.get('sum'),
                 ticker_token=document.get('ticker_token'),
                 date=document.get('date'),
-                prev_hash=document.get('prev_hash')
+                prev_hash=document.get('prev_hash'),
+                log_index=document.get('log_index'),
+                prev_log_index=document.get('prev_log_index'),
+                value=document.get('value'),
+                decimals=document.get('decimals', 18),
+                block_number=document.get('block_number'),
+                from_label=document.get('from_label'),
+                to_label=document.get('to_label')
             )
             
             # Add the transaction to the workflow
             result = self.add_transaction(workflow_id, transaction)
             if result:
-                logger.info(f"Successfully processed transaction event for workflow {workflow_id}")
+                logger.debug("Processed transaction event for workflow {}", workflow_id)
             else:
                 logger.warning(f"Failed to process transaction event for workflow {workflow_id}")
             
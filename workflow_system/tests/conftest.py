@@ -0,0 +1,5 @@
+import os
+
+# config.py requires the MongoDB settings; tests never connect to it
+os.environ.setdefault("URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "workflow_test")
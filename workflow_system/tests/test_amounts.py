@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from src.amounts import COLUMN_LIMBS, COLUMN_LIMIT, exact_group_sums, limb_bytes, to_base_units, token_labels
+from src.models import TransactionInput
+
+
+def limbs_of(values):
+    return np.frombuffer(b"".join(limb_bytes(value) for value in values), dtype="<u4").reshape(-1, COLUMN_LIMBS)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_exact_group_sums_match_integer_sums(seed):
+    rng = random.Random(seed)
+    group_count = 7
+    # Wei-sized values, values near the column limit and small ones, so limb sums carry
+    values = [rng.choice([rng.randrange(10**24), COLUMN_LIMIT - 1 - rng.randrange(10**6), rng.randrange(100)])
+              for _ in range(5000)]
+    groups = np.array([rng.randrange(group_count - 1) for _ in values], dtype=np.int64)
+
+    expected = [0] * group_count
+    for value, group in zip(values, groups):
+        expected[group] += value
+
+    assert exact_group_sums(limbs_of(values), groups, group_count) == expected
+
+
+def test_exact_group_sums_without_rows():
+    assert exact_group_sums(np.zeros((0, COLUMN_LIMBS), dtype=np.uint32), np.zeros(0, dtype=np.int64), 3) == [0, 0, 0]
+
+
+def test_token_labels_name_precisions_only_when_ambiguous():
+    labels = token_labels([("ETH", 18), ("USDT", 6), ("USDT", 18)])
+    assert labels == {("ETH", 18): "ETH", ("USDT", 6): "USDT (6 decimals)", ("USDT", 18): "USDT (18 decimals)"}
+
+
+def test_to_base_units_keeps_exact_decimal_value():
+    assert to_base_units(0.1, 18) == 10**17
+    assert to_base_units(401346.7688584047, 18) == 401346768858404700000000
+
+
+def transaction(**fields):
+    return TransactionInput(from_blockchain="ethereum", from_wallet="0xa", to_blockchain="ethereum",
+                            to_wallet="0xb", hash="0x1", ticker_token="ETH", date="2024-01-01 00:00:00",
+                            **{"sum": 1.0, **fields})
+
+
+@pytest.mark.parametrize("fields", [{"sum": -1.0}, {"value": -1}, {"decimals": -1}])
+def test_negative_amounts_are_rejected(fields):
+    with pytest.raises(ValidationError):
+        transaction(**fields)
+
+
+def test_value_accepts_decimal_strings():
+    assert transaction(value=str(10**30)).value == 10**30
@@ -0,0 +1,187 @@
+import asyncio
+import socket
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+import src.cluster as cluster
+from src.cluster import ConsistentHashRing, WorkerRegistry
+from src.http_client import http_client
+
+
+class FakeDB:
+    """In-memory stand-in for the MongoDB connector, supporting the queries the registry makes."""
+
+    def __init__(self):
+        self.collections = {}
+
+    def _docs(self, collection):
+        return self.collections.setdefault(collection, {})
+
+    @staticmethod
+    def _matches(doc, query):
+        for key, condition in query.items():
+            if isinstance(condition, dict):
+                if "$gte" in condition and not doc.get(key, float("-inf")) >= condition["$gte"]:
+                    return False
+            elif doc.get(key) != condition:
+                return False
+        return True
+
+    async def find_one(self, collection, query):
+        return next((dict(doc) for doc in self._docs(collection).values() if self._matches(doc, query)), None)
+
+    async def find_many(self, collection, query, limit=0):
+        return [dict(doc) for doc in self._docs(collection).values() if self._matches(doc, query)]
+
+    async def update_one(self, collection, query, update, upsert=False):
+        docs = self._docs(collection)
+        doc = next((doc for doc in docs.values() if self._matches(doc, query)), None)
+        if doc is None:
+            if not upsert:
+                return False
+            doc = docs[query["_id"]] = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+        doc.update(update.get("$set", {}))
+        return True
+
+    async def delete_one(self, collection, query):
+        for key, doc in list(self._docs(collection).items()):
+            if self._matches(doc, query):
+                del self._docs(collection)[key]
+                return True
+        return False
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(cluster, "db", db)
+    return db
+
+
+def workers(*names, held=()):
+    registries = [WorkerRegistry(name, f"http://{name}:8000", virtual_nodes=16) for name in names]
+    for registry in registries:
+        registry._local_ids = lambda: held
+    return registries
+
+
+KEYS = [f"workflow-{i}" for i in range(10_000)]
+
+
+def test_ring_spreads_keys_over_workers():
+    assert ConsistentHashRing().get("workflow-1") is None
+    ring = ConsistentHashRing(["a", "b", "c", "d"])
+    counts = Counter(ring.get(key) for key in KEYS)
+    assert set(counts) == {"a", "b", "c", "d"}
+    assert all(1500 < count < 3500 for count in counts.values())
+    # Placement depends only on the set of workers
+    other = ConsistentHashRing(["d", "c", "b", "a", "a"])
+    assert all(ring.get(key) == other.get(key) for key in KEYS)
+    assert other.workers == ["a", "b", "c", "d"]
+
+
+def test_ring_only_moves_keys_of_a_changed_worker():
+    ring = ConsistentHashRing(["a", "b", "c"])
+    before = {key: ring.get(key) for key in KEYS}
+    ring.set_workers(["a", "b", "c", "d"])
+    moved = {key for key in KEYS if ring.get(key) != before[key]}
+    assert moved and all(ring.get(key) == "d" for key in moved)
+    ring.set_workers(["a", "b", "c"])
+    assert {key: ring.get(key) for key in KEYS} == before
+
+
+def test_claim_and_route_to_the_owner(fake_db):
+    async def scenario():
+        a, b = workers("a", "b", held=["w1"])
+        await a.heartbeat()
+        await b.heartbeat()
+        await a.heartbeat()
+        assert a.ring.workers == b.ring.workers == ["a", "b"]
+        assert a.assign("w1") == b.assign("w1")
+
+        assert await a.claim("w1")
+        assert not await b.claim("w1")
+        assert await a.remote_url("w1") is None
+        assert await b.remote_url("w1") == "http://a:8000"
+
+        # Released once the owner no longer holds the workflow
+        a._local_ids = lambda: ()
+        await a.heartbeat()
+        assert await fake_db.find_one(WorkerRegistry.OWNERS, {"_id": "w1"}) is None
+        assert await b.owner_of("w1", refresh=True) is None
+        assert "w1" not in b._owners
+
+    asyncio.run(scenario())
+
+
+def test_dead_owner_is_taken_over(fake_db):
+    async def scenario():
+        a, b = workers("a", "b", held=["w1"])
+        await a.heartbeat()
+        await b.heartbeat()
+        assert await a.claim("w1")
+        assert await b.owner_of("w1") == "a"
+
+        # a stops heartbeating
+        fake_db.collections[WorkerRegistry.WORKERS]["a"]["heartbeat"] -= 60
+        await b.heartbeat()
+        assert b.ring.workers == ["b"]
+        assert "w1" not in b._owners
+        assert await b.remote_url("w1") is None
+        assert await b.claim("w1")
+        assert await b.owner_of("w1") == "b"
+
+    asyncio.run(scenario())
+
+
+def test_stop_removes_the_worker_and_its_records(fake_db):
+    async def scenario():
+        a, b = workers("a", "b", held=["w1"])
+        await a.start(lambda: ["w1"])
+        await b.heartbeat()
+        assert await a.claim("w1")
+        await a.stop()
+        assert fake_db.collections[WorkerRegistry.OWNERS] == {}
+        await b.heartbeat()
+        assert b.ring.workers == ["b"]
+
+    asyncio.run(scenario())
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeWebSocket:
+    def __init__(self, path):
+        self.url = SimpleNamespace(path=path)
+        self.closed_with = None
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = (code, reason)
+
+
+def test_unreachable_owner_closes_the_socket_and_refreshes_the_owner(fake_db):
+    async def scenario():
+        a, b = workers("a", "b", held=["w1"])
+        await a.heartbeat()
+        await b.heartbeat()
+        assert await a.claim("w1")
+        assert await b.owner_of("w1") == "a"
+        # The record goes away while b still has the owner cached
+        await fake_db.delete_one(WorkerRegistry.OWNERS, {"_id": "w1"})
+
+        websocket = FakeWebSocket("/workflow/w1/ingest")
+        try:
+            await b.proxy_websocket(websocket, "w1", f"http://127.0.0.1:{closed_port()}")
+        finally:
+            await http_client.disconnect()
+        assert websocket.closed_with[0] == 4502
+        assert "w1" not in b._owners
+        assert await b.remote_url("w1") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+"""
+Concurrent ingestion into a single workflow.
+
+Producer threads add transactions to one workflow while a consumer thread
+keeps draining its buffer, as the SSE stream does. Afterwards the graph and
+everything the consumer received are checked for lost, duplicated or
+corrupted records.
+"""
+import threading
+import time
+
+import pytest
+
+from src.models import TransactionInput
+from src.workflow import Workflow
+
+PRODUCERS = 16
+TRANSACTIONS = 500  # per producer
+
+
+def produce(workflow: Workflow, producer: int, count: int, start: threading.Event) -> None:
+    start.wait()
+    for i in range(count):
+        # Chain each producer's transactions so prev_hash lookups race with inserts
+        workflow.add_transaction(TransactionInput(
+            from_blockchain="ethereum",
+            from_wallet=f"0xproducer{producer}",
+            to_blockchain="ethereum",
+            to_wallet=f"0xwallet{producer}_{i}",
+            hash=f"0x{producer:04x}{i:08x}",
+            sum=1.0,
+            ticker_token="ETH",
+            date="2025-03-03 16:43:23",
+            prev_hash=f"0x{producer:04x}{i - 1:08x}" if i else None
+        ))
+
+
+def consume(workflow: Workflow, received: dict, done: threading.Event) -> None:
+    while True:
+        finished = done.is_set()
+        if workflow.has_changes():
+            data = workflow.get_buffer()
+            received["nodes"] += [node["internal_id"] for node in data["new_nodes"]]
+            received["edges"] += [edge["internal_id"] for edge in data["new_edges"]]
+        if finished:
+            return
+        time.sleep(0.001)
+
+
+@pytest.mark.parametrize("store", ["records", "columnar"])
+def test_concurrent_producers_lose_nothing(store):
+    workflow = Workflow("stress-test", "Stress test", graph_store=store)
+    workflow.get_buffer()
+    received = {"nodes": [], "edges": []}
+    start, done = threading.Event(), threading.Event()
+    producers = [threading.Thread(target=produce, args=(workflow, p, TRANSACTIONS, start)) for p in range(PRODUCERS)]
+    consumer = threading.Thread(target=consume, args=(workflow, received, done))
+    for thread in producers + [consumer]:
+        thread.start()
+    start.set()
+    for thread in producers:
+        thread.join()
+    done.set()
+    consumer.join()
+
+    total = PRODUCERS * TRANSACTIONS
+    expected_nodes = PRODUCERS * (TRANSACTIONS + 1)
+    assert len(workflow.edges) == total
+    assert len(workflow.nodes) == expected_nodes
+    # Everything reached the buffer exactly once, and nothing is left in it
+    assert sorted(received["edges"]) == list(range(1, total + 1))
+    assert sorted(received["nodes"]) == list(range(1, expected_nodes + 1))
+    assert not workflow.has_changes()
+    for p in range(PRODUCERS):
+        edge_id = workflow.get_transaction_edge_id(f"0x{p:04x}{TRANSACTIONS - 1:08x}")
+        chain = workflow.index.ancestors(edge_id)
+        assert len(chain) == TRANSACTIONS - 1, f"producer {p} chain broken"
+        assert all(edge.from_node_id in workflow.nodes for edge in chain)
@@ -0,0 +1,129 @@
+import pytest
+
+from config import DetectorConfig
+from src.detectors import PatternDetector, _densest_window
+from src.models import PatternKind
+
+CONFIG = DetectorConfig(WINDOW_BLOCKS=10, PEEL_MIN_LENGTH=3, STRUCTURING_THRESHOLDS={"ETH": 10.0},
+                        STRUCTURING_MIN_COUNT=3, FAN_MIN_DEGREE=3, CYCLE_MAX_LENGTH=4)
+
+
+def run(transfers):
+    """Feed (edge id, parent, from, to, token, amount, block) transfers; return all findings."""
+    detector = PatternDetector(CONFIG)
+    found = []
+    for edge_id, parent, sender, receiver, token, amount, block in transfers:
+        found += detector.add_transfer(edge_id, parent, sender, receiver, token, amount, block, 0)
+    assert found == detector.findings
+    return found
+
+
+def kinds(found):
+    return [finding.kind for finding in found]
+
+
+def peel_chain(shares, token="ETH", first_token="ETH"):
+    transfers = [(1, None, "s", "w1", first_token, 100.0, 1)]
+    amount = 100.0
+    for i, share in enumerate(shares, start=2):
+        amount *= share
+        transfers.append((i, i - 1, f"w{i - 1}", f"w{i}", token, amount, i))
+    return transfers
+
+
+def test_peel_chain_is_reported_once():
+    found = run(peel_chain([0.9, 0.9, 0.9, 0.9]))
+    assert kinds(found) == [PatternKind.PEEL_CHAIN]
+    assert found[0].edge_ids == [2, 3, 4]
+    assert found[0].detail["hops"] == 3
+
+
+@pytest.mark.parametrize("shares", [
+    [0.9, 0.9],               # too short
+    [0.9, 1.0, 0.9],          # plain forwarding breaks the chain
+    [0.9, 0.4, 0.9],          # forwarding too little breaks it too
+])
+def test_peel_chain_near_misses(shares):
+    assert run(peel_chain(shares)) == []
+
+
+def test_peel_chain_needs_one_token():
+    # USDT outflows funded by an ETH transfer are not a peel of it
+    assert run(peel_chain([0.9, 0.9, 0.9], token="USDT")) == []
+    assert kinds(run(peel_chain([0.9, 0.9, 0.9, 0.9], token="USDT"))) == [PatternKind.PEEL_CHAIN]
+
+
+def structuring(amounts_and_blocks):
+    return [(i, None, "w", "r", "ETH", amount, block) for i, (amount, block) in enumerate(amounts_and_blocks, 1)]
+
+
+def test_structuring_at_the_window_edge_is_reported_once():
+    found = run(structuring([(9.5, 100), (9.0, 105), (9.99, 110), (9.5, 111)]))
+    assert kinds(found) == [PatternKind.STRUCTURING]
+    assert found[0].edge_ids == [1, 2, 3]
+    assert found[0].detail["blocks"] == 10
+
+
+@pytest.mark.parametrize("transfers", [
+    [(9.5, 100), (9.5, 105), (9.5, 111)],     # spread over more than the window
+    [(9.5, 100), (10.0, 101), (9.5, 102)],    # at the threshold, not below it
+    [(9.5, 100), (8.99, 101), (9.5, 102)],    # below the band
+])
+def test_structuring_near_misses(transfers):
+    assert run(structuring(transfers)) == []
+
+
+def test_structuring_out_of_order_blocks():
+    found = run(structuring([(9.5, 120), (9.5, 100), (9.5, 125), (9.5, 115)]))
+    assert kinds(found) == [PatternKind.STRUCTURING]
+    assert sorted(found[0].edge_ids) == [1, 3, 4]
+
+
+def test_fan_out_fan_in_and_mixer():
+    transfers = [(i, None, "hub", f"out{i}", "ETH", 1.0, 100 + i) for i in range(1, 4)]
+    transfers += [(i, None, f"in{i}", "hub", "ETH", 1.0, 100 + i) for i in range(4, 7)]
+    found = run(transfers)
+    assert kinds(found) == [PatternKind.FAN_OUT, PatternKind.FAN_IN, PatternKind.MIXER]
+    assert found[0].detail["counterparties"] == 3
+    assert found[2].detail == {"senders": 3, "receivers": 3}
+
+
+@pytest.mark.parametrize("transfers", [
+    # The same counterparty three times
+    [(i, None, "hub", "out", "ETH", 1.0, 100 + i) for i in range(1, 4)],
+    # Three counterparties, but never within one window
+    [(i, None, "hub", f"out{i}", "ETH", 1.0, 100 + 6 * i) for i in range(1, 4)],
+    # Three counterparties over two tokens
+    [(1, None, "hub", "a", "ETH", 1.0, 100), (2, None, "hub", "b", "ETH", 1.0, 101),
+     (3, None, "hub", "c", "USDT", 1.0, 102)],
+])
+def test_fan_near_misses(transfers):
+    assert run(transfers) == []
+
+
+def test_cycle_is_reported_once_per_wallet():
+    found = run([
+        (1, None, "a", "b", "ETH", 5.0, 1),
+        (2, 1, "b", "c", "ETH", 5.0, 2),
+        (3, 2, "c", "a", "ETH", 5.0, 3),
+        (4, 3, "a", "b", "ETH", 5.0, 4),
+        (5, 4, "b", "a", "ETH", 5.0, 5),
+    ])
+    assert kinds(found) == [PatternKind.CYCLE, PatternKind.CYCLE]
+    assert (found[0].wallet, found[0].edge_ids, found[0].detail) == ("a", [1, 2, 3], {"hops": 3})
+    assert found[1].wallet == "b"
+
+
+def test_cycle_longer_than_the_limit_is_ignored():
+    wallets = ["a", "b", "c", "d", "e", "a"]
+    transfers = [(i, i - 1 or None, wallets[i - 1], wallets[i], "ETH", 5.0, i) for i in range(1, 6)]
+    assert run(transfers) == []
+
+
+def test_densest_window_contains_the_position():
+    events = [(0, "a", 1), (1, "b", 2), (2, "c", 3), (20, "d", 4), (21, "e", 5), (30, "a", 6)]
+    assert _densest_window(events, 1, 5) == events[:3]
+    assert _densest_window(events, 21, 5) == events[3:5]
+    # The window of width 10 around block 30 reaches back to block 20, not to 19
+    assert _densest_window(events, 30, 10) == events[3:]
+    assert _densest_window([], 5, 5) == []
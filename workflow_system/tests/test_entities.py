@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+from src.entities import EntityClusters
+
+EXCHANGE = {"name": "Binance 14", "category": "exchange"}
+MIXER = {"name": "Tornado Cash", "category": "mixer"}
+DEFI = {"name": "Uniswap", "category": "defi"}
+
+
+def clusters_of(entities):
+    return sorted(sorted(members) for members in entities.clusters().values())
+
+
+def test_find_halves_paths():
+    entities = EntityClusters(initial_capacity=8)
+    for wallet in "abcdefgh":
+        entities._id(wallet)
+    # A chain 7 -> 6 -> ... -> 0
+    entities._parent[1:] = np.arange(7)
+    assert entities.find(7) == 0
+    # Every node on the path now points to its former grandparent
+    assert entities._parent.tolist() == [0, 0, 1, 1, 3, 3, 5, 5]
+    assert entities.find(7) == 0
+    assert entities._parent.tolist() == [0, 0, 1, 0, 3, 3, 5, 3]
+
+
+def test_union_by_size():
+    entities = EntityClusters()
+    a, b, c, d = (entities._id(wallet) for wallet in "abcd")
+    assert entities.union(a, b)
+    assert entities.union(c, a)
+    # The single wallet joins the larger cluster under its root
+    assert entities.find(c) == entities.find(a) == a
+    assert entities._size[a] == 3
+    assert not entities.union(b, c)
+    assert entities.merges == 2
+    assert entities.find(d) == d
+
+
+def test_roots_jump_pointers_to_the_root():
+    entities = EntityClusters(initial_capacity=64)
+    for i in range(64):
+        entities._id(f"w{i}")
+    entities._parent[1:] = np.arange(63)
+    roots = entities._roots()
+    assert roots.tolist() == [0] * 64
+    # The forest is left fully compressed
+    assert entities._parent.tolist() == [0] * 64
+    assert clusters_of(entities) == [sorted(f"w{i}" for i in range(64))]
+
+
+def test_arrays_grow_past_the_initial_capacity():
+    entities = EntityClusters(initial_capacity=2)
+    funders = [f"f{i}" for i in range(10)]
+    for i in range(300):
+        entities.add_transfer(funders[i % 10], f"w{i}", "ETH", 0.01)
+    assert len(entities._parent) >= len(entities.wallets) == 310
+    assert len(entities._parent) == len(entities._size) == len(entities._received)
+    clusters = clusters_of(entities)
+    assert len(clusters) == 10
+    assert sorted(f"w{i}" for i in range(3, 300, 10)) in clusters
+    assert entities.members("f0") == ["f0"]
+    assert entities.members("unknown") == ["unknown"]
+    assert entities.cluster_id("unknown") is None
+
+
+def test_deposit_address_merges_its_senders():
+    entities = EntityClusters()
+    entities.add_transfer("alice", "deposit", "USDT", 100.0)
+    entities.add_transfer("alice2", "deposit", "USDT", 50.0)
+    assert clusters_of(entities) == []
+    # The sweep into the exchange reveals the deposit address
+    entities.add_transfer("deposit", "binance", "USDT", 150.0, to_label=EXCHANGE)
+    assert entities.deposit_addresses() == {"deposit"}
+    assert clusters_of(entities) == [["alice", "alice2"]]
+    # Later deposits join the same customer
+    entities.add_transfer("alice3", "deposit", "USDT", 10.0)
+    assert sorted(entities.members("alice3")) == ["alice", "alice2", "alice3"]
+    # The deposit address itself is the exchange's, not the customer's
+    assert entities.members("deposit") == ["deposit"]
+
+
+def test_deposit_address_found_before_its_senders():
+    entities = EntityClusters()
+    entities.add_transfer("deposit", "binance", "ETH", 1.0, to_label=EXCHANGE)
+    entities.add_transfer("alice", "deposit", "ETH", 1.0)
+    assert clusters_of(entities) == []
+    entities.add_transfer("alice2", "deposit", "ETH", 1.0)
+    assert clusters_of(entities) == [["alice", "alice2"]]
+
+
+@pytest.mark.parametrize("label", [EXCHANGE, MIXER])
+def test_service_senders_do_not_merge_with_customers(label):
+    entities = EntityClusters()
+    entities.add_transfer("alice", "deposit", "ETH", 1.0)
+    entities.add_transfer("hot wallet", "deposit", "ETH", 1.0, from_label=label)
+    entities.add_transfer("deposit", "binance", "ETH", 2.0, to_label=EXCHANGE)
+    entities.add_transfer("hot wallet", "deposit", "ETH", 1.0, from_label=label)
+    assert clusters_of(entities) == []
+
+
+def test_labeled_wallets_are_not_deposit_addresses():
+    entities = EntityClusters()
+    entities.add_transfer("alice", "uniswap", "ETH", 1.0, to_label=DEFI)
+    entities.add_transfer("bob", "uniswap", "ETH", 1.0, to_label=DEFI)
+    entities.add_transfer("uniswap", "binance", "ETH", 2.0, from_label=DEFI, to_label=EXCHANGE)
+    assert entities.deposit_addresses() == set()
+    assert clusters_of(entities) == []
+
+
+def test_gas_funding_merges_wallets_topped_up_by_one_funder():
+    entities = EntityClusters(gas_topup_max=0.05)
+    entities.add_transfer("funder", "a", "ETH", 0.01)
+    entities.add_transfer("funder", "b", "ETH", 0.05)
+    entities.add_transfer("funder", "c", "ETH", 0.02)
+    assert clusters_of(entities) == [["a", "b", "c"]]
+    # The funder itself is not assumed to be the same entity
+    assert entities.members("funder") == ["funder"]
+
+
+@pytest.mark.parametrize("second", [
+    ("funder", "b", "ETH", 0.06, None),     # more than a top-up
+    ("funder", "b", "USDT", 0.01, None),    # not the native token
+    ("funder", "b", "ETH", 0.0, None),      # nothing transferred
+    ("funder", "a", "ETH", 0.01, None),     # the same wallet again
+    ("funder", "b", "ETH", 0.01, MIXER),    # topped up by a service
+])
+def test_gas_funding_near_misses(second):
+    entities = EntityClusters(gas_topup_max=0.05)
+    entities.add_transfer("funder", "a", "ETH", 0.01, from_label=second[4])
+    entities.add_transfer(*second[:4], from_label=second[4])
+    assert clusters_of(entities) == []
+
+
+def test_gas_funding_needs_the_first_inflow():
+    entities = EntityClusters(gas_topup_max=0.05)
+    entities.add_transfer("funder", "a", "ETH", 0.01)
+    entities.add_transfer("someone", "b", "ETH", 3.0)
+    entities.add_transfer("funder", "b", "ETH", 0.01)
+    assert clusters_of(entities) == []
@@ -0,0 +1,44 @@
+from src.graph_index import GraphIndex
+from src.graph_store import RecordGraphStore
+from src.models import TransactionType
+
+
+def build(transfers):
+    """Store and index with one edge per (sender, receiver, ticker, decimals, value, parent edge id)."""
+    store = RecordGraphStore()
+    index = GraphIndex(store.nodes, store.edges)
+    for wallet in ("a", "b", "c"):
+        index.add_node(store.add_node(wallet, "ethereum", ""))
+    for i, (sender, receiver, ticker, decimals, value, parent) in enumerate(transfers):
+        edge = store.add_edge(sender, receiver, value / 10**decimals, ticker, TransactionType.TRANSACTION,
+                              "2024-01-01 00:00:00", f"0x{i}", "", None, index.child_depth(parent), value, decimals)
+        index.add_edge(edge, parent)
+    return index
+
+
+def test_inflow_is_kept_per_token():
+    index = build([
+        (1, 2, "ETH", 18, 10**18, None),
+        (1, 2, "USDT", 6, 5000 * 10**6, None),
+        (1, 2, "USDT", 18, 7 * 10**18, None),
+        (1, 2, "ETH", 18, 10**17 + 1, None),
+    ])
+
+    summary = index.node_summary(2)
+    assert summary["inflow"] == {"ETH": 1.1, "USDT (6 decimals)": 5000.0, "USDT (18 decimals)": 7.0}
+    assert summary["inflow_value"]["ETH"] == str(11 * 10**17 + 1)
+    assert index.node_summary(1)["inflow"] == {}
+
+
+def test_flow_by_depth_and_lineage():
+    index = build([
+        (1, 2, "ETH", 18, 3 * 10**18, None),
+        (2, 3, "ETH", 18, 2 * 10**18, 1),
+        (2, 3, "USDT", 6, 10**6, 1),
+        (3, 1, "ETH", 18, 10**18, 2),
+    ])
+
+    assert index.value_at_depth(1) == {"ETH": 2 * 10**18, "USDT": 10**6}
+    assert index.flow_at_depth(2) == {"ETH": 1.0}
+    assert [edge.internal_id for edge in index.descendants(1)] == [2, 3, 4]
+    assert [edge.internal_id for edge in index.ancestors(4)] == [2, 1]
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from src.amounts import COLUMN_LIMIT, from_base_units
+from src.graph_store import ColumnarGraphStore, RecordGraphStore
+from src.models import TransactionType
+
+# (ticker, decimals): the same symbol with two precisions must not be summed together
+TOKENS = [("ETH", 18), ("USDT", 6), ("USDT", 18), ("WBTC", 8)]
+
+
+def fill(store, seed=0, count=2000):
+    rng = random.Random(seed)
+    for i in range(50):
+        store.add_node(f"0x{i:040x}", "ethereum", f"https://etherscan.io/address/0x{i:040x}")
+    for i in range(count):
+        ticker, decimals = rng.choice(TOKENS)
+        value = rng.choice([rng.randrange(10**decimals * 1000), rng.randrange(COLUMN_LIMIT, 2 * COLUMN_LIMIT)])
+        kind = TransactionType.DUPLICATE if rng.random() < 0.1 else TransactionType.TRANSACTION
+        tx_hash = f"0x{i:064x}"
+        store.add_edge(rng.randrange(1, 51), rng.randrange(1, 51), from_base_units(value, decimals), ticker, kind,
+                       f"2024-01-{rng.randrange(1, 29):02d} 12:00:00", tx_hash, f"https://etherscan.io/tx/{tx_hash}",
+                       {"prev_hash": None}, rng.randrange(6), value, decimals)
+    return store
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_columnar_store_matches_record_store(seed):
+    records = fill(RecordGraphStore(), seed)
+    columns = fill(ColumnarGraphStore(initial_capacity=16), seed)
+
+    assert columns.stats() == {**records.stats(), "store": columns.kind}
+    assert len(columns.edges) == len(records.edges)
+    for edge_id in (1, 2, len(records.edges) // 2, len(records.edges)):
+        assert columns.edges[edge_id] == records.edges[edge_id]
+    assert columns.nodes[7] == records.nodes[7]
+
+
+def test_stats_keep_precisions_of_one_ticker_apart():
+    store = fill(RecordGraphStore())
+    expected = {}
+    for edge in store.edges.values():
+        if edge.type == TransactionType.TRANSACTION:
+            expected[edge.ticker_token, edge.decimals] = expected.get((edge.ticker_token, edge.decimals), 0) + edge.value
+
+    stats = store.stats()
+    assert stats["total_value"] == {
+        "ETH": str(expected["ETH", 18]),
+        "USDT (6 decimals)": str(expected["USDT", 6]),
+        "USDT (18 decimals)": str(expected["USDT", 18]),
+        "WBTC": str(expected["WBTC", 8]),
+    }
+    assert stats["total_flow"]["USDT (6 decimals)"] == from_base_units(expected["USDT", 6], 6)
@@ -0,0 +1,120 @@
+import os
+import random
+
+import pytest
+
+from src.screening import ScreeningIndex, build_index
+
+
+def addresses(rng, count):
+    return [rng.randbytes(20) for _ in range(count)]
+
+
+def write_list(path, keys, template="0x{}\n"):
+    path.write_text("".join(template.format(key.hex()) for key in keys))
+    return path
+
+
+@pytest.fixture(scope="module")
+def large(tmp_path_factory):
+    rng = random.Random(48)
+    listed = addresses(rng, 200_000)
+    directory = tmp_path_factory.mktemp("screening")
+    index = ScreeningIndex([write_list(directory / "sdn.txt", listed)], directory / "screening.idx")
+    yield index, listed, set(listed), rng
+    index.close()
+
+
+def test_every_listed_address_is_found(large):
+    index, listed, _, _ = large
+    assert index.count == len(listed)
+    # The filter built with NumPy uint64 arithmetic agrees with the Python reads bit for bit
+    assert all(index._maybe_listed(key) for key in listed)
+    assert all(index.check("0x" + key.hex()) == "sdn.txt" for key in listed)
+
+
+def test_unlisted_addresses_are_never_reported(large):
+    index, _, listed, rng = large
+    probes = [key for key in addresses(rng, 100_000) if key not in listed]
+    assert [key for key in probes if index.check("0x" + key.hex())] == []
+    # Bloom positives are close to the configured rate, and each was rejected by the exact lookup
+    positives = sum(index._maybe_listed(key) for key in probes)
+    assert positives < 3 * 0.001 * len(probes)
+
+
+def test_bloom_positives_are_confirmed_exactly(tmp_path):
+    rng = random.Random(1)
+    listed = addresses(rng, 50)
+    # A filter this loose lets many unlisted addresses through to the exact lookup
+    index = ScreeningIndex([write_list(tmp_path / "list.txt", listed)], tmp_path / "screening.idx",
+                           false_positive_rate=0.3)
+    passed = [key for key in addresses(rng, 1000) if index._maybe_listed(key)]
+    assert len(passed) > 100
+    assert [key for key in passed if index.check(key.hex())] == []
+    assert index._find(listed[0]) == 0
+    index.close()
+
+
+def test_lists_are_parsed_leniently(tmp_path):
+    rng = random.Random(2)
+    first, second, both = addresses(rng, 3)
+    sdn = write_list(tmp_path / "sdn.csv", [first, both], 'name,"Digital Currency Address - ETH 0x{}"\n')
+    extra = tmp_path / "extra.txt"
+    extra.write_text(f"0x{both.hex().upper()} 0x{second.hex().upper()}")
+    index = ScreeningIndex([sdn, extra], tmp_path / "screening.idx")
+    assert index.lists == ["sdn.csv", "extra.txt"]
+    assert index.check("0x" + first.hex().upper()) == "sdn.csv"
+    assert index.check("0x" + second.hex()) == "extra.txt"
+    # An address on several lists is attributed to the first one
+    assert index.check("0x" + both.hex()) == "sdn.csv"
+    for malformed in ("0x" + first.hex()[:-2], "0x" + first.hex() + "00", "0xnot-hex", ""):
+        assert index.check(malformed) is None
+    index.close()
+
+
+def test_empty_list(tmp_path):
+    index = ScreeningIndex([write_list(tmp_path / "empty.txt", [])], tmp_path / "screening.idx")
+    assert index.count == 0
+    assert index.check("0x" + "11" * 20) is None
+    index.close()
+
+
+def test_index_is_rebuilt_when_a_list_is_newer(tmp_path):
+    rng = random.Random(3)
+    old, new = addresses(rng, 2)
+    lists = [write_list(tmp_path / "list.txt", [old])]
+    index_path = tmp_path / "screening.idx"
+    ScreeningIndex(lists, index_path).close()
+    built = index_path.stat().st_mtime
+
+    # A list older than the index is not recompiled
+    os.utime(lists[0], (built - 10, built - 10))
+    index = ScreeningIndex(lists, index_path)
+    assert index_path.stat().st_mtime == built
+    index.close()
+
+    write_list(lists[0], [new])
+    os.utime(lists[0], (built + 10, built + 10))
+    index = ScreeningIndex(lists, index_path)
+    assert index.check("0x" + new.hex()) == "list.txt"
+    assert index.check("0x" + old.hex()) is None
+    index.close()
+
+
+def test_build_index_replaces_the_file_atomically(tmp_path):
+    rng = random.Random(4)
+    index_path = tmp_path / "screening.idx"
+    index_path.write_bytes(b"stale")
+    assert build_index([write_list(tmp_path / "list.txt", addresses(rng, 10))], index_path) == 10
+    # No temporary file is left behind
+    assert sorted(os.listdir(tmp_path)) == ["list.txt", "screening.idx"]
+    assert ScreeningIndex([], index_path).count == 10
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    index_path = tmp_path / "screening.idx"
+    index_path.write_bytes(b"\0" * 64)
+    lists = [write_list(tmp_path / "list.txt", [])]
+    os.utime(lists[0], (0, 0))
+    with pytest.raises(ValueError):
+        ScreeningIndex(lists, index_path)
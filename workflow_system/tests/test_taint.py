@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from src.taint import TaintEngine
+
+# (edge id, from, to, value, block, is_seed): A gets tainted and clean funds, sends half of a
+# spend around the cycle A -> B -> A and then spends everything
+CYCLE = [
+    (1, "s", "a", 100, 1, True),
+    (2, "x", "a", 100, 2, False),
+    (3, "a", "b", 50, 3, False),
+    (4, "b", "a", 50, 4, False),
+    (5, "a", "c", 200, 5, False),
+]
+
+
+def engine_with(transfers, policy="haircut", refresh_each=False):
+    engine = TaintEngine(policy, initial_capacity=4)
+    for edge_id, sender, receiver, value, block, is_seed in transfers:
+        engine.add_transfer(edge_id, sender, receiver, "ETH", value, 18, block, 0, is_seed)
+        if refresh_each:
+            engine.refresh()
+    return engine
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("haircut", {3: 25, 4: 25, 5: 100}),
+    ("fifo", {3: 50, 4: 50, 5: 100}),
+    ("poison", {3: 50, 4: 50, 5: 200}),
+])
+def test_policies_on_a_cycle(policy, expected):
+    engine = engine_with(CYCLE, policy)
+    assert {edge_id: int(engine.edge_taint(edge_id)["tainted_value"]) for edge_id in expected} == expected
+    assert engine.edge_taint(2)["ratio"] == 0.0
+    assert engine.edge_taint(1)["ratio"] == 1.0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        TaintEngine("lifo")
+
+
+def random_transfers(seed, count=300):
+    rng = random.Random(seed)
+    wallets = [f"w{i}" for i in range(12)]
+    transfers = [(i + 1, "seed", rng.choice(wallets), rng.randrange(1, 10**20), 1, True) for i in range(3)]
+    for edge_id in range(4, count + 1):
+        sender, receiver = rng.sample(wallets, 2)
+        transfers.append((edge_id, sender, receiver, rng.randrange(1, 10**20), rng.randrange(2, 60), False))
+    return transfers
+
+
+@pytest.mark.parametrize("policy", ["haircut", "fifo", "poison"])
+@pytest.mark.parametrize("seed", range(3))
+def test_out_of_order_arrival_matches_block_order(policy, seed):
+    transfers = random_transfers(seed)
+    in_order = engine_with(sorted(transfers, key=lambda transfer: (transfer[4], transfer[0])), policy, True)
+    shuffled = transfers[:]
+    random.Random(seed).shuffle(shuffled)
+    out_of_order = engine_with(shuffled, policy, True)
+
+    for edge_id, *_ in transfers:
+        assert out_of_order.edge_taint(edge_id) == in_order.edge_taint(edge_id)
+    for wallet in {transfer[2] for transfer in transfers}:
+        assert out_of_order.wallet_taint(wallet) == in_order.wallet_taint(wallet)
+
+
+@pytest.mark.parametrize("policy", ["haircut", "fifo"])
+@pytest.mark.parametrize("seed", range(3))
+def test_taint_is_conserved(policy, seed):
+    transfers = random_transfers(seed)
+    engine = engine_with(transfers, policy)
+    engine.refresh()
+    received, sent = {}, {}
+    for edge_id, sender, receiver, value, _, is_seed in transfers:
+        tainted = int(engine.edge_taint(edge_id)["tainted_value"])
+        assert 0 <= tainted <= value
+        received[receiver] = received.get(receiver, 0) + tainted
+        if not is_seed:
+            sent[sender] = sent.get(sender, 0) + tainted
+
+    for wallet in received.keys() | sent.keys():
+        # Taint leaving a wallet never exceeds what it received, and the rest is still held
+        assert sent.get(wallet, 0) <= received.get(wallet, 0)
+        held = int(engine.wallet_taint(wallet).get("ETH", {}).get("tainted_value", 0))
+        assert received.get(wallet, 0) - sent.get(wallet, 0) == held
+    seeded = sum(transfer[3] for transfer in transfers if transfer[5])
+    assert sum(received.values()) - sum(sent.values()) == seeded
+
+
+def test_tokens_with_other_decimals_are_separate_pools():
+    engine = TaintEngine()
+    engine.add_transfer(1, "s", "a", "USDT", 100, 6, 1, 0, True)
+    engine.add_transfer(2, "x", "a", "USDT", 100, 18, 2, 0, False)
+    engine.add_transfer(3, "a", "b", "USDT", 100, 18, 3, 0, False)
+    assert engine.edge_taint(3)["tainted_value"] == "0"
+    assert set(engine.wallet_taint("a")) == {"USDT (6 decimals)", "USDT (18 decimals)"}
+    assert list(engine.tainted_edges(min_tainted=0.00005)) == [1]
@@ -0,0 +1,144 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.detectors import MERGE_BLOCK, SECONDS_PER_BLOCK, estimate_block
+from src.time_index import TimeIndex
+
+
+def build(transfers):
+    """Index (edge id, from, to, token, decimals, amount, block) transfers."""
+    index = TimeIndex(initial_capacity=2)
+    for edge_id, sender, receiver, token, decimals, amount, block in transfers:
+        index.add_transfer(edge_id, sender, receiver, token, decimals, amount, block, 0)
+    return index
+
+
+TRANSFERS = [
+    (0, "a", "b", "ETH", 18, 1.0, 100),
+    (1, "b", "c", "ETH", 18, 2.0, 105),
+    (2, "c", "d", "ETH", 18, 3.0, 105),
+    (3, "a", "d", "ETH", 18, 4.0, 110),
+    (4, "d", "a", "ETH", 18, 5.0, 120),
+]
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    (None, None, [0, 1, 2, 3, 4]),
+    (105, 110, [1, 2, 3]),   # both ends inclusive
+    (106, 109, []),
+    (None, 105, [0, 1, 2]),
+    (110, None, [3, 4]),
+    (121, None, []),
+])
+def test_transfers_bounds_are_inclusive(start, end, expected):
+    assert build(TRANSFERS).transfers(start, end).tolist() == expected
+
+
+@pytest.mark.parametrize("wallet, start, end, expected", [
+    ("a", None, None, [0, 3, 4]),
+    ("a", 101, 120, [3, 4]),
+    ("d", 105, 110, [2, 3]),
+    ("unknown", None, None, []),
+])
+def test_transfers_of_a_wallet(wallet, start, end, expected):
+    assert build(TRANSFERS).transfers(start, end, wallet).tolist() == expected
+
+
+def test_self_transfer_is_listed_once():
+    index = build([(0, "a", "a", "ETH", 18, 1.0, 100)])
+    assert index.transfers(wallet="a").tolist() == [0]
+
+
+def test_out_of_order_inserts_match_block_order():
+    rng = random.Random(7)
+    wallets = [f"w{i}" for i in range(6)]
+    transfers = [(i, rng.choice(wallets), rng.choice(wallets), "ETH", 18, 1.0, rng.randrange(1000))
+                 for i in range(300)]
+    shuffled = transfers[:]
+    rng.shuffle(shuffled)
+    index = TimeIndex(initial_capacity=2)
+    # Query between inserts so later ones are merged into an already sorted order
+    for count, (edge_id, sender, receiver, token, decimals, amount, block) in enumerate(shuffled):
+        index.add_transfer(edge_id, sender, receiver, token, decimals, amount, block, 0)
+        if count % 50 == 0:
+            index.transfers()
+
+    blocks = {edge_id: block for edge_id, *_, block in transfers}
+    ordered = index.transfers().tolist()
+    assert sorted(ordered) == list(range(300))
+    assert [blocks[edge_id] for edge_id in ordered] == sorted(blocks.values())
+    for start, end in ((0, 999), (250, 500), (500, 500)):
+        expected = {edge_id for edge_id, *_, block in transfers if start <= block <= end}
+        assert set(index.transfers(start, end).tolist()) == expected
+        for wallet in wallets:
+            got = index.transfers(start, end, wallet).tolist()
+            assert [blocks[edge_id] for edge_id in got] == sorted(blocks[edge_id] for edge_id in got)
+            assert set(got) == {edge_id for edge_id, sender, receiver, *_, block in transfers
+                                if wallet in (sender, receiver) and start <= block <= end}
+
+
+def test_aggregate_peak_window():
+    index = build(TRANSFERS)
+    result = index.aggregate(index.transfers(), window=6)
+    assert result["transfers"] == 5
+    assert (result["first_block"], result["last_block"]) == (100, 120)
+    eth = result["tokens"]["ETH"]
+    assert (eth["transfers"], eth["volume"]) == (5, 15.0)
+    # Blocks 105-110 move 9 tokens, more than any other 6 blocks (120 alone moves 5)
+    assert eth["peak_window"] == {"first_block": 105, "last_block": 110, "transfers": 3, "volume": 9.0}
+    assert "peak_window" not in index.aggregate(index.transfers())["tokens"]["ETH"]
+
+
+def test_aggregate_peak_window_matches_brute_force():
+    rng = random.Random(3)
+    transfers = [(i, "a", "b", "ETH", 18, float(rng.randrange(1, 100)), rng.randrange(500)) for i in range(200)]
+    index = build(transfers)
+    peak = index.aggregate(index.transfers(), window=20)["tokens"]["ETH"]["peak_window"]
+    best = max(sum(amount for *_, amount, block in transfers if start <= block < start + 20)
+               for start in range(500))
+    assert peak["volume"] == best
+    assert peak["last_block"] - peak["first_block"] < 20
+
+
+def test_aggregate_of_nothing():
+    index = build(TRANSFERS)
+    assert index.aggregate(index.transfers(200, 300), window=5) == {
+        "transfers": 0, "first_block": None, "last_block": None, "tokens": {}
+    }
+
+
+def test_tokens_are_told_apart_by_decimals():
+    index = build([
+        (0, "a", "b", "USDT", 6, 1.0, 100),
+        (1, "a", "b", "USDT", 18, 2.0, 101),
+        (2, "a", "b", "ETH", 18, 3.0, 102),
+    ])
+    tokens = index.aggregate(index.transfers())["tokens"]
+    assert {name: entry["volume"] for name, entry in tokens.items()} == {
+        "USDT (6 decimals)": 1.0, "USDT (18 decimals)": 2.0, "ETH": 3.0
+    }
+    # A range holding one of them names it by its ticker alone
+    assert list(index.aggregate(index.transfers(101, 101))["tokens"]) == ["USDT"]
+
+
+def test_transfers_without_a_block_share_the_block_axis():
+    merge_block, merge_time = MERGE_BLOCK
+    index = TimeIndex()
+    index.add_transfer(0, "a", "b", "ETH", 18, 1.0, 20_000_000, 0)
+    # One hour after block 20,000,000 (mined 300 slots after it at 12 seconds each)
+    timestamp = merge_time + (20_000_000 - merge_block) * SECONDS_PER_BLOCK + 3600
+    index.add_transfer(1, "a", "b", "ETH", 18, 1.0, 0, timestamp)
+    assert index.transfers(20_000_000, 20_000_300).tolist() == [0, 1]
+    assert index.transfers(wallet="a").tolist() == [0, 1]
+
+
+def test_estimate_block():
+    merge_block, merge_time = MERGE_BLOCK
+    assert estimate_block(merge_time) == merge_block
+    assert estimate_block(merge_time + 12 * 1000 + 11) == merge_block + 1000
+    # Before The Merge blocks are interpolated: block 12,000,000 was mined on 2021-03-08
+    assert abs(estimate_block(1615234816) - 12_000_000) < 500_000
+    assert estimate_block(0) == 0
+    assert np.all(np.diff([estimate_block(t) for t in range(1438269988, 1700000000, 10_000_000)]) > 0)